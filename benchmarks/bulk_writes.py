@@ -0,0 +1,46 @@
+"""
+Time seeding a catalog one document at a time against bulk_save, and upserting it again by label
+Run from the project root against a local mongod: python -m benchmarks.bulk_writes [count] [uri]
+or without a server, if mongomock is installed: python -m benchmarks.bulk_writes [count] mongomock
+"""
+import sys
+from time import perf_counter
+
+from src.db import session
+from src.db.model.collections import ItemCollection
+
+
+def catalog(count: int) -> list[dict]:
+    return [{'label': f'item {i}', 'type': 'usable item', 'description': f'a very common item, number {i}',
+             'actions': ['get', 'drop']} for i in range(count)]
+
+
+def main(count: int = 50_000, uri: str = 'mongodb://localhost:27017') -> None:
+    if uri == 'mongomock':
+        import mongomock
+        session.configure('mongodb://localhost', 'benchmark', client_class=mongomock.MongoClient)
+    else:
+        session.configure(uri, 'benchmark')
+
+    ItemCollection.delete()
+    start = perf_counter()
+    for item in catalog(count):
+        ItemCollection(item).save()
+    one_by_one = perf_counter()
+
+    ItemCollection.delete()
+    bulk_start = perf_counter()
+    ItemCollection.bulk_save(catalog(count))
+    bulk = perf_counter()
+    ItemCollection.bulk_save(catalog(count), key='label')
+    upsert = perf_counter()
+    ItemCollection.delete()
+
+    print(f'{count} documents')
+    print(f'save():             {one_by_one - start:8.2f} s')
+    print(f'bulk_save():        {bulk - bulk_start:8.2f} s')
+    print(f'bulk_save(label):   {upsert - bulk:8.2f} s')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) if i == 0 else arg for i, arg in enumerate(sys.argv[1:3])))
@@ -0,0 +1,54 @@
+"""
+Time resolving commands with the command table, and a whole scripted session through process_user_input
+without output
+Run from the project root: python -m benchmarks.command_dispatch [commands]
+"""
+import asyncio
+import sys
+from itertools import cycle, islice
+from time import perf_counter
+
+from src.assets.actor.player import Player
+from src.assets.input import COMMANDS, process_user_input
+from src.assets.map.maze import Maze
+from src.assets.output import NullRenderer, set_renderer
+from src.assets.prompt import ScriptedInput, set_input
+
+SCRIPT = ['inventory', 'check lantern', 'inspect chest', 'go', 'open door', 'drop sword', 'dance']
+
+
+class Level:
+    def __init__(self) -> None:
+        self.maze = Maze(5, 5, [], [])
+        self.player = Player()
+        self.complete = False
+
+    def print_maze_info(self, came_from=None) -> None:
+        pass
+
+
+async def replay(commands: int) -> None:
+    renderer = NullRenderer()
+    set_renderer(renderer)
+    set_input(ScriptedInput(islice(cycle(SCRIPT), commands)))
+    level = Level()
+    for _ in range(commands):
+        await process_user_input(level)
+        renderer.events.clear()
+
+
+def main(commands: int = 200_000) -> None:
+    start = perf_counter()
+    for command in islice(cycle(SCRIPT), commands):
+        COMMANDS.resolve(command)
+    resolved = perf_counter()
+    asyncio.run(replay(commands))
+    replayed = perf_counter()
+
+    print(f'{commands} commands')
+    print(f'Resolve: {resolved - start:8.2f} s, {commands / (resolved - start):12,.0f} commands/s')
+    print(f'Replay:  {replayed - resolved:8.2f} s, {commands / (replayed - resolved):12,.0f} commands/s')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
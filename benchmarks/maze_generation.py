@@ -0,0 +1,24 @@
+"""
+Time maze generation on large grids
+Run from the project root: python -m benchmarks.maze_generation [width] [height]
+"""
+import sys
+from time import perf_counter
+
+from src.assets.map.generators import recursive_backtracker, pack_walls
+
+
+def main(width: int = 2000, height: int = 2000) -> None:
+    start = perf_counter()
+    cells = recursive_backtracker(width, height)
+    carved = perf_counter()
+    pack_walls(cells)
+    packed = perf_counter()
+
+    print(f'{width}x{height} maze, {width * height} cells')
+    print(f'Carve:  {carved - start:8.2f} s')
+    print(f'Pack:   {packed - carved:8.2f} s')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,37 @@
+"""
+Compare the memory used by the old list-of-Cells maze layout and the packed wall array used by Maze
+Run from the project root: python -m benchmarks.maze_memory [width] [height]
+"""
+import sys
+import tracemalloc
+
+from src.assets.map.maze import Cell, new_wall_array
+
+
+def measure(build) -> int:
+    """
+    Measure the memory kept alive by the object a callable builds
+    :param build: callable, builds the maze layout
+    :return: int, bytes allocated
+    """
+    tracemalloc.start()
+    layout = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del layout
+    return size
+
+
+def main(width: int = 1000, height: int = 1000) -> None:
+    cells = width * height
+    old = measure(lambda: [[Cell(x, y) for y in range(height)] for x in range(width)])
+    new = measure(lambda: (new_wall_array(cells), {}, {}))
+
+    print(f'{width}x{height} maze, {cells} cells')
+    print(f'Cell grid:   {old / 2 ** 20:10.1f} MiB  {old / cells:8.1f} bytes/cell')
+    print(f'Wall array:  {new / 2 ** 20:10.1f} MiB  {new / cells:8.1f} bytes/cell')
+    print(f'Reduction:   {old / new:10.0f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -1,34 +1,35 @@
+import random
+
 from src.assets.actor import Actor
+from src.assets.dice import DEFAULT_FACES, FACE_NAMES
 from src.assets.inventory import Inventory
 from src.assets.map.directions import DIRECTIONS
+from src.assets.rng import GameRandom
 
 
 class Dice:
-    def __init__(self) -> None:
-        self.dice = [
-            'sword',
-            'sword',
-            'double sword',
-            'double sword',
-            'shield',
-            'double shield'
-        ]
+    def __init__(self, faces: tuple = DEFAULT_FACES, rng=None) -> None:
+        self.faces = tuple(faces)
+        # The random number generator of the player, the random module if the dice don't belong to anyone
+        self.rng = rng
+
+    @property
+    def dice(self) -> list:
+        return [FACE_NAMES[face] for face in self.faces]
 
     def __getitem__(self, dice_face):
-        return self.dice[dice_face]
+        return FACE_NAMES[self.faces[dice_face]]
 
     def roll(self) -> str:
         """
         Method to simulate the dices results
-        :return: list
+        :return: str
         """
-        import random
-
-        return random.choice(self.dice)
+        return FACE_NAMES[(self.rng or random).choice(self.faces)]
 
 
 class Player(Actor):
-    def __init__(self) -> None:
+    def __init__(self, rng=None) -> None:
         super().__init__(
             name='player',
             position=(0, 0),
@@ -39,7 +40,8 @@ class Player(Actor):
         )
         self.score = 0
         self.inventory = Inventory()
-        self.dices = [Dice(), Dice(), Dice(), Dice(), Dice(), Dice(), Dice(), Dice()]
+        self.rng = rng or GameRandom()
+        self.dices = [Dice(rng=self.rng) for _ in range(8)]
         self.alive = True
 
     def move(self, direction: str) -> None:
@@ -1,15 +1,24 @@
-import random
+from src.assets.commands import CommandTable
+from src.assets.dice import FACE_NAMES, battle_points, roll_faces
+from src.assets.map.directions import OPPOSITE_DIRECTIONS
+from src.assets.output import pause, say
+from src.assets.prompt import ask
 
+# Commands during a battle, handlers are called with the players current location, the direction the player
+# came from and the player
+BATTLE_COMMANDS = CommandTable()
 
-def print_battle_stats(current_location, player) -> None:
-    from time import sleep
 
-    sleep(1)
-    print(f'\n{player.name.upper()} STATS:\nAttack Points - {player.attack_points}\n'
-          f'Health Points - {player.health_points}\nDefend Points - {player.defend_points}\n\n'
-          f'{current_location.enemy.name.upper()} STATS:\nAttack Points - '
-          f'{current_location.enemy.attack_points}\nHealth Points - {current_location.enemy.health_points}\n')
-    sleep(2)
+def print_battle_stats(current_location, player) -> None:
+    pause(1)
+    say(f'\n{player.name.upper()} STATS:\nAttack Points - {player.attack_points}\n'
+        f'Health Points - {player.health_points}\nDefend Points - {player.defend_points}\n\n'
+        f'{current_location.enemy.name.upper()} STATS:\nAttack Points - '
+        f'{current_location.enemy.attack_points}\nHealth Points - {current_location.enemy.health_points}\n',
+        kind='battle_stats', attack_points=player.attack_points, defend_points=player.defend_points,
+        health_points=player.health_points, enemy_attack_points=current_location.enemy.attack_points,
+        enemy_health_points=current_location.enemy.health_points)
+    pause(2)
 
 
 def set_battle_stats(player) -> None:
@@ -18,25 +27,17 @@ def set_battle_stats(player) -> None:
     :param player: Player obj
     :return None
     """
-    player.attack_points = 0
-    player.defend_points = 0
+    faces = roll_faces(player.dices, player.rng)
 
-    print('\nYou roll the following dices:')
-    for dice in player.dices:
-        result = dice.roll()
-        print(f'* {result}')
-        match result:
-            case 'shield':
-                player.defend_points += 1 * 2 if player.inventory.item_in_inventory('shield') else 1
-            case 'double shield':
-                player.defend_points += 2 * 2 if player.inventory.item_in_inventory('shield') else 2
-            case 'sword':
-                player.attack_points += 1 * 2 if player.inventory.item_in_inventory('sword') else 1
-            case 'double sword':
-                player.attack_points += 2 * 2 if player.inventory.item_in_inventory('sword') else 2
+    say('\nYou roll the following dices:\n' + '\n'.join(f'* {FACE_NAMES[face]}' for face in faces),
+        kind='roll', faces=[FACE_NAMES[face] for face in faces])
 
+    player.attack_points, player.defend_points = battle_points(faces,
+                                                               player.inventory.item_in_inventory('sword'),
+                                                               player.inventory.item_in_inventory('shield'))
 
-def battle(current_location, last_direction: str, player) -> None:
+
+async def battle(current_location, last_direction: str, player) -> None:
     """
     Main battle method.
     :param current_location: Cell instance, the players current location
@@ -44,38 +45,78 @@ def battle(current_location, last_direction: str, player) -> None:
     :param player: Player instance
     return: None
     """
-    while player.in_battle(current_location):
-        command = input('\n>> ')
-        match command.lower().split():
-            case ['roll'] | ['roll', 'dice'] | ['roll', 'dices']:
-                set_battle_stats(player)
-                print_battle_stats(current_location, player)
-                battle_round(current_location, player)
-            case ['use', item]:
-                player.use_battle_item(item, current_location.enemy)
-                player.attack_points = 0
-                player.defend_points = 0
-                print_battle_stats(current_location, player)
-                battle_round(current_location, player)
-            case ['run'] | ['run', 'back'] | ['run', 'away'] | ['escape']:
-                escape_battle(last_direction, player)
-            case _:
-                print('I don\'t understand!')
+    # Escaping moves the player out of the cell, which ends the battle
+    position = player.position
+    while player.in_battle(current_location) and player.position == position:
+        command = await ask('\n>> ')
+        await BATTLE_COMMANDS.dispatch(command, current_location, last_direction, player)
+
+
+@BATTLE_COMMANDS.command('roll', 'roll dice', 'roll dices')
+async def roll(current_location, last_direction: str, player):
+    set_battle_stats(player)
+    print_battle_stats(current_location, player)
+    battle_round(current_location, player)
+
+
+@BATTLE_COMMANDS.command('use', arguments=1)
+async def use(current_location, last_direction: str, player, item):
+    use_item_in_battle(player, item, current_location.enemy)
+    player.attack_points = 0
+    player.defend_points = 0
+    print_battle_stats(current_location, player)
+    battle_round(current_location, player)
+
+
+@BATTLE_COMMANDS.command('run', 'run back', 'run away', 'escape')
+async def run(current_location, last_direction: str, player):
+    escape_battle(last_direction, player)
+
+
+@BATTLE_COMMANDS.fallback
+async def unknown(current_location, last_direction: str, player, command):
+    say('I don\'t understand!')
 
 
 def escape_battle(last_direction: str, player) -> None:
     """
     Method to escape the battle
-    :param last_direction: str, the direction where the player came from
+    :param last_direction: str, the direction the player moved in to get into the battle
     :param player: Player instance
     :return None
     """
-    from src.assets.game.level import OPPOSITE_DIRECTION
+    direction = OPPOSITE_DIRECTIONS[last_direction]
+    player.move(direction)
+    say(f'You escaped back {direction}')
+
+
+# Battle outcomes from battle_result
+WON, LOST = 'won', 'lost'
+
+
+def strike(health_points: int, attack_points: int) -> int:
+    """
+    The health points left after a strike, never below zero
+    :param health_points: int, health points before the strike
+    :param attack_points: int, attack points of the strike
+    :return: int
+    """
+    return health_points - attack_points if health_points - attack_points > 0 else 0
 
-    for direction in OPPOSITE_DIRECTION:
-        if last_direction == direction[0]:
-            player.move(direction[1])
-            print(f'You escaped back {direction[1]}')
+
+def battle_result(player_health_points: int, enemy_health_points: int):
+    """
+    The outcome of a battle after the player has struck. The enemy is checked first,
+    so a player without health points still wins if the enemy falls
+    :param player_health_points: int
+    :param enemy_health_points: int
+    :return: WON, LOST or None if the battle goes on
+    """
+    if enemy_health_points <= 0:
+        return WON
+    elif player_health_points <= 0:
+        return LOST
+    return None
 
 
 def battle_over(current_location, player) -> bool:
@@ -85,15 +126,18 @@ def battle_over(current_location, player) -> bool:
     :param player: Player obj
     :return: bool
     """
-    if current_location.enemy.health_points <= 0:
-        print(f'You defeated the {current_location.enemy.name}!')
-        player.score += (10 * current_location.enemy.level)
-        current_location.enemy = None
-        return True
-    elif player.health_points <= 0:
-        print(f'The {current_location.enemy.name} defeated you!\nGAME OVER!')
-        player.alive = False
-        return True
+    match battle_result(player.health_points, current_location.enemy.health_points):
+        case 'won':
+            say(f'You defeated the {current_location.enemy.name}!', kind='battle_won',
+                enemy=current_location.enemy.name)
+            player.score += (10 * current_location.enemy.level)
+            current_location.enemy = None
+            return True
+        case 'lost':
+            say(f'The {current_location.enemy.name} defeated you!\nGAME OVER!', kind='battle_lost',
+                enemy=current_location.enemy.name)
+            player.alive = False
+            return True
 
     return False
 
@@ -105,24 +149,25 @@ def battle_round(current_location, player) -> None:
     :param player: Player obj
     return: None
     """
-    current_location.enemy.health_points = current_location.enemy.health_points - player.attack_points\
-        if current_location.enemy.health_points - player.attack_points > 0 else 0
-    print(f'You strike the {current_location.enemy.name} with {player.attack_points} attack points! '
-          f'The enemy has {current_location.enemy.health_points} health points remaining')
+    current_location.enemy.health_points = strike(current_location.enemy.health_points, player.attack_points)
+    say(f'You strike the {current_location.enemy.name} with {player.attack_points} attack points! '
+        f'The enemy has {current_location.enemy.health_points} health points remaining',
+        kind='strike', attack_points=player.attack_points, enemy_health_points=current_location.enemy.health_points)
 
     if not battle_over(current_location, player):
-        player.health_points += player.defend_points
-        player.health_points = player.health_points - current_location.enemy.attack_points\
-            if player.health_points - current_location.enemy.attack_points > 0 else 0
+        player.health_points = strike(player.health_points + player.defend_points,
+                                      current_location.enemy.attack_points)
 
-        print(f'The {current_location.enemy.name} strikes back and attack you with '
-              f'{current_location.enemy.attack_points} attack points!')
+        say(f'The {current_location.enemy.name} strikes back and attack you with '
+            f'{current_location.enemy.attack_points} attack points!',
+            kind='strike_back', enemy_attack_points=current_location.enemy.attack_points)
         if player.defend_points > 0:
-            print(f'You block the attack with {player.defend_points} defend points!')
+            say(f'You block the attack with {player.defend_points} defend points!')
             if player.inventory.item_in_inventory('shield'):
-                print(f'And thanks to your {player.inventory.item_in_inventory("shield")}'
-                      f' you were able to block extra much!')
-        print(f'You have {player.health_points} health points remaining.')
+                say(f'And thanks to your {player.inventory.item_in_inventory("shield")}'
+                    f' you were able to block extra much!')
+        say(f'You have {player.health_points} health points remaining.', kind='health',
+            health_points=player.health_points)
 
 
 def use_item_in_battle(player, label: str, enemy):
@@ -136,26 +181,26 @@ def use_item_in_battle(player, label: str, enemy):
     if player.inventory.item_in_inventory(label):
         match label:
             case 'potion':
-                print(f'You drank the health potion and gained 10 health points!')
+                say(f'You drank the health potion and gained 10 health points!')
                 player.health_points += 10
                 player.inventory.remove_pouch_item(label)
 
             case 'pill':
-                effect = random.choice(['cursed', 'lucky'])
-                print(f'You consume the dark pill and you\'re {effect}!')
+                effect = player.rng.choice(['cursed', 'lucky'])
+                say(f'You consume the dark pill and you\'re {effect}!')
                 player.inventory.remove_pouch_item(label)
 
                 match effect:
                     case 'lucky':
-                        print('You gain 15 health points!')
+                        say('You gain 15 health points!')
                         player.health_points += 15
                     case 'cursed':
-                        print(f'You faint for a moment and the {enemy.name} takes advantage!\n'
-                              f'You lose {enemy.attack_points} health points!')
+                        say(f'You faint for a moment and the {enemy.name} takes advantage!\n'
+                            f'You lose {enemy.attack_points} health points!')
                         player.health_points -= enemy.attack_points
 
 
-def engaged_in_battle(direction: str, player, current_location) -> None:
+async def engaged_in_battle(direction: str, player, current_location) -> None:
     """
     Check if the player is engaged in battle after it's movement, aka if there's a enemy in the new cell
     :param direction: str, the direction the player moved
@@ -163,7 +208,7 @@ def engaged_in_battle(direction: str, player, current_location) -> None:
     :param current_location: Cell obj
     :return: None
     """
-    print(f'You bumped into a {current_location.enemy.name}'
-          f'\nTime to roll those dices!\nRemember: "Each SHIELD gets you 1 defend point and '
-          f'each SWORD gets you 1 attack point"', end='')
-    battle(current_location, direction, player)
+    say(f'You bumped into a {current_location.enemy.name}'
+        f'\nTime to roll those dices!\nRemember: "Each SHIELD gets you 1 defend point and '
+        f'each SWORD gets you 1 attack point"', end='')
+    await battle(current_location, direction, player)
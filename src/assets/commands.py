@@ -0,0 +1,86 @@
+"""
+Command registry shared by the main game loop, battles and open chests. Every table maps the words of a command
+to a handler, aliases included, so a command is resolved with a few dict lookups instead of walking a match
+statement. Tokenizing and resolving are cached, replayed sessions mostly repeat the same handful of commands
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def tokenize(command: str) -> tuple:
+    """
+    Split a command into lowercase words
+    :param command: str, the command as typed
+    :return: tuple of str
+    """
+    return tuple(command.lower().split())
+
+
+class Command:
+    __slots__ = ('handler', 'arguments')
+
+    def __init__(self, handler, arguments) -> None:
+        self.handler = handler
+        self.arguments = arguments
+
+    def accepts(self, args: tuple) -> bool:
+        return self.arguments is None or len(args) == self.arguments
+
+
+class CommandTable:
+    def __init__(self, cache_size: int = 1024) -> None:
+        # words of a phrase -> tuple of Command, a phrase can have a handler per number of arguments
+        self.phrases = {}
+        self.longest = 0
+        self.unknown = None
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def command(self, *phrases: str, arguments=0):
+        """
+        Decorator registering a coroutine function as the handler of one or more phrases.
+        The handler is called with the context passed to dispatch, followed by the words after the phrase
+        :param phrases: str, the verb and its aliases, like 'run', 'run away' and 'escape'
+        :param arguments: int, number of words the handler takes after the phrase, None for any number
+        """
+        def register(handler):
+            for phrase in phrases:
+                words = tokenize(phrase)
+                self.phrases[words] = self.phrases.get(words, ()) + (Command(handler, arguments),)
+                self.longest = max(self.longest, len(words))
+            self.resolve.cache_clear()
+            return handler
+        return register
+
+    def fallback(self, handler):
+        """
+        Decorator registering the coroutine function called for commands no phrase matches.
+        It is called with the context passed to dispatch, followed by the command as typed
+        """
+        self.unknown = handler
+        return handler
+
+    def _resolve(self, command: str) -> tuple:
+        """
+        Find the handler of a command, the longest matching phrase wins
+        :param command: str, the command as typed
+        :return: tuple, (handler, arguments), handler is None if nothing matches
+        """
+        words = tokenize(command)
+        for length in range(min(len(words), self.longest), 0, -1):
+            for found in self.phrases.get(words[:length], ()):
+                if found.accepts(words[length:]):
+                    return found.handler, words[length:]
+        return None, ()
+
+    def dispatch(self, command: str, *context):
+        """
+        Call the handler of a command. The handler's coroutine is returned as is, instead of being awaited in
+        another coroutine, saving a frame per command
+        :param command: str, the command as typed
+        :param context: passed on to the handler, like the level or the player
+        :return: coroutine, await it to run the handler
+        """
+        handler, args = self.resolve(command)
+        if handler is None:
+            return self.unknown(*context, command)
+        return handler(*context, *args)
@@ -0,0 +1,81 @@
+"""
+Batched dice rolling. Dice faces are integer codes with attack and defend weights, so a whole battle,
+or many battles at once, is rolled with one call to random.choices and summed with table lookups
+"""
+import random
+
+SWORD, DOUBLE_SWORD, SHIELD, DOUBLE_SHIELD = range(4)
+
+FACE_NAMES = ('sword', 'double sword', 'shield', 'double shield')
+FACE_ATTACK = (1, 2, 0, 0)
+FACE_DEFEND = (0, 0, 1, 2)
+
+# The faces painted on a new dice
+DEFAULT_FACES = (SWORD, SWORD, DOUBLE_SWORD, DOUBLE_SWORD, SHIELD, DOUBLE_SHIELD)
+
+# Attack in the low byte and defend in the high byte, summing packed faces sums both at once.
+# Holds for up to 127 dice per battle
+_PACKED_POINTS = tuple(attack | defend << 8 for attack, defend in zip(FACE_ATTACK, FACE_DEFEND))
+
+
+def shared_faces(dices):
+    """
+    The faces of a set of dice, if they all have the same faces
+    :param dices: list of Dice instances
+    :return: tuple, the faces, or None if the dice differ
+    """
+    faces = dices[0].faces if dices else ()
+    return faces if all(dice.faces == faces for dice in dices) else None
+
+
+def roll_faces(dices, rng=random) -> list[int]:
+    """
+    Roll a set of dice once
+    :param dices: list of Dice instances
+    :param rng: random.Random instance or the random module
+    :return: list[int], the face code of every dice
+    """
+    faces = shared_faces(dices)
+    if faces is not None:
+        return rng.choices(faces, k=len(dices))
+    return [rng.choice(dice.faces) for dice in dices]
+
+
+def battle_points(faces, sword: bool = False, shield: bool = False) -> tuple:
+    """
+    Sum the attack and defend points of a roll. A sword doubles the attack points and a shield the defend points
+    :param faces: list[int], face codes
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :return: tuple, (attack points, defend points)
+    """
+    attack = sum(map(FACE_ATTACK.__getitem__, faces))
+    defend = sum(map(FACE_DEFEND.__getitem__, faces))
+    return attack * (2 if sword else 1), defend * (2 if shield else 1)
+
+
+def roll_battles(dices, battles: int, sword: bool = False, shield: bool = False, rng=random) -> list[tuple]:
+    """
+    Roll a set of dice for many battle rounds at once
+    :param dices: list of Dice instances, the same dice are used every round
+    :param battles: int, number of rounds to roll
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :param rng: random.Random instance or the random module
+    :return: list[tuple], (attack points, defend points) for every round
+    """
+    count = len(dices)
+    faces = shared_faces(dices)
+    if faces is not None:
+        rolled = rng.choices([_PACKED_POINTS[face] for face in faces], k=battles * count)
+    else:
+        packed = [[_PACKED_POINTS[face] for face in dice.faces] for dice in dices]
+        rolled = [rng.choice(packed[i % count]) for i in range(battles * count)]
+
+    attack_multiplier, defend_multiplier = 2 if sword else 1, 2 if shield else 1
+    points = []
+    for start in range(0, battles * count, count):
+        total = sum(rolled[start:start + count])
+        points.append(((total & 0xFF) * attack_multiplier, (total >> 8) * defend_multiplier))
+
+    return points
@@ -1,16 +1,52 @@
+import asyncio
+from functools import partial
+
 from src.assets.actor.player import Player
 from src.assets.game.level import GameLevel
+from src.assets.rng import GameRandom
 
 
 class Game:
-    def __init__(self) -> None:
-        self.player = Player()
+    def __init__(self, level_pack=None, rng=None, autosave=None) -> None:
+        """
+        :param level_pack: LevelPack instance, levels to play instead of generated ones
+        :param rng: GameRandom instance, a new one with a random seed if None
+        :param autosave: Autosave instance, saves the game after every command, see src.assets.game.snapshot
+        """
+        self.rng = rng or GameRandom()
+        self.player = Player(self.rng.spawn('player'))
         self.game_level = None
         self.difficulty_level = 0
+        self.level_pack = level_pack
+        self.autosave = autosave
 
     def run(self) -> None:
+        asyncio.run(self.play())
+
+    async def play(self) -> None:
+        """
+        Play level after level until the player dies or quits. Everything the game needs lives on the Game, so
+        many games can be played at once, each in its own asyncio task
+        :return: None
+        """
+        # A loaded game carries on with the saved level before it gets new ones
+        if self.game_level is not None:
+            await self.game_level.play()
+            self.player.update_stats()
+
         while self.player.alive:
             self.difficulty_level += 1
-            self.game_level = GameLevel(self.difficulty_level, self.player)
-            self.game_level.run()
+            self.game_level = GameLevel(self.difficulty_level, self.player, level_pack=self.level_pack,
+                                        rng=self.rng.spawn('level', self.difficulty_level),
+                                        autosave=self.autosave_level())
+            if self.autosave:
+                # Save the new level and the stats the last one left the player with, before the first command
+                self.autosave.save(self)
+            await self.game_level.play()
             self.player.update_stats()
+
+    def autosave_level(self):
+        """
+        :return: callable that saves the game, for the level to call after every command, or None
+        """
+        return partial(self.autosave.save, self) if self.autosave else None
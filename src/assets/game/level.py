@@ -1,22 +1,50 @@
-import random
+import asyncio
 
 from src.assets.actor.enemy import Enemy
 from src.assets.input import process_user_input
 from src.assets.inventory import Item
 from src.assets.map.maze import Maze
+from src.assets.output import say
+from src.assets.rng import GameRandom
 
 import src.db.controller as controller
 
 
 class GameLevel:
-    def __init__(self, difficulty: int,  player) -> None:
+    def __init__(self, difficulty: int,  player, algorithm: str = 'backtracker', export_map: bool = False,
+                 level_pack=None, rng=None, maze=None, autosave=None) -> None:
         self.__maze_size = (5, 5)
         self.complete = False
         self.difficulty = difficulty
-        self.enemies = [Enemy(self.difficulty, **random.choice(controller.get_all_enemies())) for _ in range(self.maze_size[0])]
-        self.maze = Maze(*self.maze_size, self.level_items(), self.enemies)
+        self.rng = rng or GameRandom()
+        # Called after every command, like Autosave.save for the game
+        self.autosave = autosave
+        if maze is not None:
+            # A level loaded from a snapshot, the maze comes with its items and enemies
+            self.maze = maze
+            self.enemies = list(maze.cell_enemies.values())
+        else:
+            self.maze = self.create_maze(level_pack, algorithm)
         self.player = player
 
+        if export_map:
+            self.maze.export_map(background=True)
+
+    def create_maze(self, level_pack, algorithm: str) -> Maze:
+        """
+        Pick the enemies and items for the level and put them in a new maze
+        :param level_pack: LevelPack instance, or None to generate the maze
+        :param algorithm: str, generation algorithm, see src.assets.map.generators
+        :return: Maze instance
+        """
+        enemies = controller.get_all_enemies()
+        self.enemies = [Enemy(self.difficulty, **self.rng.choice(enemies)) for _ in range(self.maze_size[0])]
+        items = self.level_items(self.rng)
+        if level_pack:
+            # Levels are taken from the pack in order, starting over when the pack runs out
+            return level_pack.load((self.difficulty - 1) % len(level_pack), items, self.enemies, self.rng)
+        return Maze(*self.maze_size, items, self.enemies, algorithm=algorithm, rng=self.rng)
+
     @property
     def maze_size(self) -> tuple:
         if self.difficulty % 5 == 0:
@@ -31,39 +59,46 @@ class GameLevel:
             self.__maze_size = s
 
     @staticmethod
-    def level_items() -> list:
+    def level_items(rng) -> list:
         """
         Method to set which items to appear in the maze
+        :param rng: random.Random instance, picks the usable items
         :return: set
         """
         items = [Item(**item) for item in controller.get_all_items_from_type('usable item')]
-        level_items = {random.choice(items) for _ in range(3)}
+        level_items = {rng.choice(items) for _ in range(3)}
         level_items.update({Item(**item) for item in controller.get_all_items_from_type('key item')})
         return list(level_items)
 
-    def run(self):
+    def run(self) -> None:
+        asyncio.run(self.play())
+
+    async def play(self) -> None:
         self.print_maze_info()
         while not self.complete and self.player.alive:
-            process_user_input(self)
+            await process_user_input(self)
+            # A completed level is saved when the next one starts, a dead player is saved to end the save
+            if self.autosave and not self.complete:
+                self.autosave()
 
         if self.player.alive:
-            print(f'You enter a new maze. Your current score is {self.player.score}, well done!\n\n'
-                  f'FOR YOUR INFORMATION: You\'re pouch will lose it\'s belongings, but the items in your hands will'
-                  f' remain. You will also gain some extra health points for your journey. Good luck!\n')
+            say(f'You enter a new maze. Your current score is {self.player.score}, well done!\n\n'
+                f'FOR YOUR INFORMATION: You\'re pouch will lose it\'s belongings, but the items in your hands will'
+                f' remain. You will also gain some extra health points for your journey. Good luck!\n')
 
     def print_maze_info(self, came_from=None) -> None:
         if came_from:
-            print(f'You came from {came_from}')
+            say(f'You came from {came_from}')
 
         if self.player.inventory.item_in_inventory('lantern'):
-            print('You\'ve got the lantern. It lights up your surroundings.\nYou can go: ')
+            say('You\'ve got the lantern. It lights up your surroundings.\nYou can go: ')
             for direction in self.maze.get_cell(*self.player.position).walls:
                 if not self.maze.get_cell(*self.player.position).walls[direction]:
-                    print(f'* {direction}')
+                    say(f'* {direction}')
             if self.maze.get_cell(*self.player.position).got_item:
-                print(f'There is a '
-                      f'{self.maze.get_cell(*self.player.position).item.__dict__["description"]} here')
+                say(f'There is a '
+                    f'{self.maze.get_cell(*self.player.position).item.__dict__["description"]} here')
         else:
-            print('The area is very dark!')
+            say('The area is very dark!')
             if self.maze.get_cell(*self.player.position).got_item:
-                print('There is something in this room, maybe check it out?')
+                say('There is something in this room, maybe check it out?')
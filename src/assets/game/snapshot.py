@@ -0,0 +1,333 @@
+"""
+Save games as compact binary snapshots. A snapshot is a fixed size little-endian header, the state of the game and
+the player, a table of strings, the inventory and the entities of the maze as indices into the string table, and
+the packed wall array of the maze, exactly as Maze keeps it in memory. Items and enemies are stored by their
+catalog label or name and rebuilt from the catalogs when the game is loaded
+
+A delta is a snapshot whose walls are the byte runs that differ from a full snapshot it is based on, everything
+else is small enough to be written in full. Autosave writes a full snapshot when a level starts and a delta after
+every command, both through a WriteQueue, so the game only pays for encoding. A save whose player died or quit is
+over and isn't loaded
+"""
+import base64
+import struct
+
+from src.assets.actor.enemy import Enemy
+from src.assets.inventory import Item
+from src.assets.map.maze import Maze
+from src.assets.rng import GameRandom
+
+import src.db.controller as controller
+
+SNAPSHOT_MAGIC = b'SAVE'
+SNAPSHOT_VERSION = 1
+FULL, DELTA = 0, 1
+
+# magic, version, kind, snapshot id, id of the full snapshot a delta is based on
+HEADER = struct.Struct('<4sHBxII')
+# difficulty, width, height, start x, start y
+LEVEL = struct.Struct('<IIIII')
+# x, y, health, attack, defend, level, score, alive
+PLAYER = struct.Struct('<iiiiiiq?')
+# kind, flags, label, cell index, health, number of labels inside
+ENTITY = struct.Struct('<BBHIiH')
+# offset and length of a run of changed wall bytes
+WALL_RUN = struct.Struct('<II')
+
+ITEM, ENEMY = 0, 1
+OPEN = 1
+# Label of an empty hand
+NO_LABEL = 0xFFFF
+# Wall bytes compared at a time when looking for changes
+WALL_BLOCK = 64
+
+
+def _label(item) -> str:
+    # Items in the inventory are the dicts of the items, items in the maze and in chests are Item instances
+    return item['label'] if isinstance(item, dict) else item.__dict__['label']
+
+
+class _Strings:
+    """String table of a snapshot being written, every string is stored once"""
+    def __init__(self) -> None:
+        self.indices = {}
+
+    def __call__(self, string: str) -> int:
+        return self.indices.setdefault(string, len(self.indices))
+
+    def pack(self) -> bytes:
+        parts = [struct.pack('<H', len(self.indices))]
+        for string in self.indices:
+            encoded = string.encode()
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f'Can\'t save a string of {len(encoded)} bytes: {string[:40]}...')
+            parts.append(struct.pack('<H', len(encoded)) + encoded)
+        return b''.join(parts)
+
+
+def _wall_runs(base: bytes, walls) -> list[tuple]:
+    """
+    Find the runs of wall bytes that differ from the walls of a base snapshot, comparing a block at a time
+    :param base: bytes, walls of the base snapshot
+    :param walls: bytes-like, current walls
+    :return: list[tuple], (offset, bytes)
+    """
+    runs = []
+    for offset in range(0, len(walls), WALL_BLOCK):
+        block = bytes(walls[offset:offset + WALL_BLOCK])
+        if block != base[offset:offset + WALL_BLOCK]:
+            if runs and runs[-1][0] + len(runs[-1][1]) == offset:
+                runs[-1] = (runs[-1][0], runs[-1][1] + block)
+            else:
+                runs.append((offset, block))
+    return runs
+
+
+def encode(game, snapshot_id: int, base: bytes = None) -> bytes:
+    """
+    Write the state of a game as a snapshot
+    :param game: Game instance, playing a level
+    :param snapshot_id: int, id of the new snapshot
+    :param base: bytes, a full snapshot of the same level to write a delta against, a full snapshot if None
+    :return: bytes
+    """
+    level, player = game.game_level, game.player
+    maze = level.maze
+    strings = _Strings()
+    # Seeds can be ints, like the random ones, spawn joins them as strings so the levels come out the same
+    strings(str(game.rng.initial_seed))
+
+    inventory = player.inventory
+    hands = [strings(_label(hand)) if hand else NO_LABEL for hand in (inventory.right_hand, inventory.left_hand)]
+    pouch = [strings(_label(item)) for item in inventory.pouch]
+
+    entities = []
+    for index, item in maze.cell_items.items():
+        details = item.__dict__
+        contains = [strings(_label(inside)) for inside in details.get('contains', ())]
+        entities.append(ENTITY.pack(ITEM, OPEN if details.get('open') else 0, strings(details['label']), index, 0,
+                                    len(contains)))
+        entities.append(struct.pack(f'<{len(contains)}H', *contains))
+    for index, enemy in maze.cell_enemies.items():
+        entities.append(ENTITY.pack(ENEMY, 0, strings(enemy.__dict__['name']), index, enemy.health_points, 0))
+
+    parts = [
+        HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, FULL if base is None else DELTA, snapshot_id,
+                    snapshot_id if base is None else HEADER.unpack_from(base)[3]),
+        LEVEL.pack(level.difficulty, maze.num_of_cells_x, maze.num_of_cells_y, maze.start_x, maze.start_y),
+        PLAYER.pack(*player.position, player.health_points, player.attack_points, player.defend_points,
+                    player.level, player.score, player.alive),
+        None,
+        struct.pack(f'<HHB{len(pouch)}H', *hands, len(pouch), *pouch),
+        struct.pack('<I', len(maze.cell_items) + len(maze.cell_enemies)),
+        *entities,
+    ]
+
+    if base is None:
+        parts.append(bytes(maze.walls))
+    else:
+        runs = _wall_runs(base[-len(maze.walls):], maze.walls)
+        parts.append(struct.pack('<I', len(runs)))
+        for offset, run in runs:
+            parts.append(WALL_RUN.pack(offset, len(run)) + run)
+
+    # The string table is complete once the entities are written
+    parts[3] = strings.pack()
+    return b''.join(parts)
+
+
+class Snapshot:
+    """A decoded snapshot, the entities stay as (kind, flags, label, cell index, health, labels inside) tuples"""
+    def __init__(self, data: bytes, base: bytes = None) -> None:
+        """
+        :param data: bytes, a full snapshot or a delta
+        :param base: bytes, the full snapshot a delta is based on
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('Not a snapshot')
+        magic, version, kind, self.id, self.base_id = HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('Not a snapshot')
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported snapshot version {version}')
+
+        offset = HEADER.size
+        self.difficulty, self.width, self.height, self.start_x, self.start_y = LEVEL.unpack_from(data, offset)
+        offset += LEVEL.size
+        self.player = PLAYER.unpack_from(data, offset)
+        self.alive = self.player[-1]
+        offset += PLAYER.size
+
+        (count,) = struct.unpack_from('<H', data, offset)
+        offset += 2
+        strings = []
+        for _ in range(count):
+            (length,) = struct.unpack_from('<H', data, offset)
+            strings.append(data[offset + 2:offset + 2 + length].decode())
+            offset += 2 + length
+        self.strings = strings
+        self.seed = strings[0]
+
+        right, left, count = struct.unpack_from('<HHB', data, offset)
+        offset += 5
+        self.hands = tuple(None if hand == NO_LABEL else strings[hand] for hand in (right, left))
+        self.pouch = [strings[label] for label in struct.unpack_from(f'<{count}H', data, offset)]
+        offset += 2 * count
+
+        (count,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        self.entities = []
+        for _ in range(count):
+            entity_kind, flags, label, index, health, inside = ENTITY.unpack_from(data, offset)
+            offset += ENTITY.size
+            contains = [strings[i] for i in struct.unpack_from(f'<{inside}H', data, offset)]
+            offset += 2 * inside
+            self.entities.append((entity_kind, flags, strings[label], index, health, contains))
+
+        walls_size = (self.width * self.height + 1) // 2
+        if kind == FULL:
+            self.walls = bytearray(data[offset:offset + walls_size])
+        else:
+            if base is None or HEADER.unpack_from(base)[3] != self.base_id:
+                raise ValueError(f'Delta needs the full snapshot {self.base_id}')
+            self.walls = bytearray(base[-walls_size:])
+            (count,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            for _ in range(count):
+                run_offset, length = WALL_RUN.unpack_from(data, offset)
+                offset += WALL_RUN.size
+                self.walls[run_offset:run_offset + length] = data[offset:offset + length]
+                offset += length
+
+    def restore(self, game_class=None, **options):
+        """
+        Rebuild the game. The maze takes the wall array as it is, no cell is created
+        :param game_class: Game class, src.assets.game.Game if None
+        :param options: keyword arguments for the game, like level_pack or autosave
+        :return: Game instance, playing the saved level when it's played
+        """
+        from src.assets.game import Game
+        from src.assets.game.level import GameLevel
+
+        game = (game_class or Game)(rng=GameRandom(self.seed), **options)
+        player = game.player
+        x, y, player.health_points, player.attack_points, player.defend_points, player.level, player.score, \
+            player.alive = self.player
+        player.position = (0, 0)
+        player.position = (x, y)
+
+        inventory = player.inventory
+        inventory.right_hand, inventory.left_hand = (self._item(label).__dict__ if label else None
+                                                     for label in self.hands)
+        inventory.pouch = [self._item(label).__dict__ for label in self.pouch]
+
+        rng = game.rng.spawn('level', self.difficulty)
+        maze = Maze(self.width, self.height, [], [], self.start_x, self.start_y, walls=self.walls, rng=rng)
+        enemies = {enemy['name']: enemy for enemy in controller.get_all_enemies()}
+        for entity_kind, flags, label, index, health, contains in self.entities:
+            position = (index % self.width, index // self.width)
+            if entity_kind == ENEMY:
+                entity = Enemy(self.difficulty, **enemies[label])
+                entity.health_points = health
+                entity.pos = position
+            else:
+                entity = self._item(label)
+                if contains or 'contains' in entity.__dict__:
+                    entity.contains = [self._item(inside) for inside in contains]
+                if flags & OPEN:
+                    entity.open = True
+            entity.position = position
+            maze.place('item' if entity_kind == ITEM else 'enemy', index, entity)
+
+        game.difficulty_level = self.difficulty
+        game.game_level = GameLevel(self.difficulty, player, level_pack=game.level_pack, rng=rng, maze=maze,
+                                    autosave=game.autosave_level())
+        return game
+
+    @staticmethod
+    def _item(label: str) -> Item:
+        return Item(**controller.get_item(label=label))
+
+
+class Autosave:
+    """
+    Save a game into the SavedGame collection after every command. The full snapshot of the level is the document
+    named after the save, the latest delta is the document with '/delta' appended to the name
+    """
+    def __init__(self, name: str, queue=None, full_every: int = 256) -> None:
+        """
+        :param name: str, name of the save
+        :param queue: WriteQueue for SavedGame documents upserted by name, a new one if None
+        :param full_every: int, write a full snapshot after this many deltas, even on the same level
+        """
+        if queue is None:
+            from src.db.model.collections import SavedGame
+            from src.db.model.write_queue import WriteQueue
+            queue = WriteQueue(SavedGame, key='name')
+        self.name = name
+        self.queue = queue
+        self.full_every = full_every
+        self.snapshot_id = 0
+        self.base = None
+        self.level = None
+        self.deltas = 0
+
+    def save(self, game) -> bytes:
+        """
+        Snapshot the game and queue it to be written
+        :param game: Game instance
+        :return: bytes, the snapshot or delta that was queued
+        """
+        self.snapshot_id += 1
+        if self.base is None or self.level is not game.game_level or self.deltas >= self.full_every:
+            self.base = encode(game, self.snapshot_id)
+            self.level = game.game_level
+            self.deltas = 0
+            self.queue.put({'name': self.name, 'data': _text(self.base)})
+            return self.base
+
+        delta = encode(game, self.snapshot_id, self.base)
+        self.deltas += 1
+        self.queue.put({'name': self.name + '/delta', 'data': _text(delta)})
+        return delta
+
+    def load(self, game_class=None, **options):
+        """
+        Load the game saved under the name, with the latest delta applied if it belongs to the full snapshot
+        :param game_class: Game class, src.assets.game.Game if None
+        :param options: keyword arguments for the game
+        :return: Game instance, or None if nothing was saved under the name or the saved game is over
+        """
+        from src.db.model.collections import SavedGame
+
+        saved = {document['name']: _bytes(document['data'])
+                 for name in (self.name, self.name + '/delta')
+                 for document in SavedGame.raw({'name': name}, {'_id': False})}
+        if self.name not in saved:
+            return None
+
+        base, delta = saved[self.name], saved.get(self.name + '/delta')
+        snapshot = Snapshot(base)
+        if delta is not None and HEADER.unpack_from(delta)[4] == snapshot.id:
+            snapshot = Snapshot(delta, base)
+
+        self.snapshot_id = snapshot.id
+        if not snapshot.alive:
+            # The player died or quit, there is nothing to carry on with
+            return None
+        game = snapshot.restore(game_class, autosave=self, **options)
+        # Carry on with deltas against the saved full snapshot
+        self.base, self.level, self.deltas = base, game.game_level, 0
+        return game
+
+    def close(self) -> None:
+        self.queue.close()
+
+
+def _text(data: bytes) -> str:
+    # Not every backend stores binary fields, the SQLite one keeps documents as JSON
+    return base64.b64encode(data).decode()
+
+
+def _bytes(text: str) -> bytes:
+    return base64.b64decode(text)
@@ -1,30 +1,304 @@
 """
-This class is under construction and is not implemented in this version of the game
+High score leaderboard. Scores are kept in memory in a bucketed sorted list, so adding a score and asking for the
+rank of a score are O(log n) even with millions of entries, and persisted by a store: an append-only log file that
+is compacted now and then, or the HighScore collection
 """
+import os
+import struct
+from bisect import bisect_left, insort
 
-import pickle
+# Entries per bucket of the sorted index, a bucket is split when it grows to twice this size
+BUCKET_SIZE = 512
+
+# score, length of the name in bytes, followed by the name
+LOG_RECORD = struct.Struct('<qH')
+
+# Scores pushed off a full board before the store is compacted, or more if the board is bigger
+COMPACT_AFTER = 10000
+
+
+class ScoreIndex:
+    """
+    Sorted list of keys split into buckets, with a Fenwick tree over the bucket sizes to find positions.
+    Keys are (-score, entry number), the best score first and the oldest entry first among equal scores
+    """
+    def __init__(self, keys=()) -> None:
+        keys = sorted(keys)
+        self.buckets = [keys[i:i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE)] or [[]]
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self.maxes = [bucket[-1] for bucket in self.buckets if bucket]
+        # Fenwick tree built in place, every node adds itself to its parent
+        self.tree = [0] + [len(bucket) for bucket in self.buckets]
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def _update(self, bucket: int, change: int) -> None:
+        i = bucket + 1
+        while i < len(self.tree):
+            self.tree[i] += change
+            i += i & -i
+
+    def _before(self, bucket: int) -> int:
+        # Number of keys in the buckets before this one
+        total, i = 0, bucket
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def __len__(self) -> int:
+        return self._before(len(self.buckets))
+
+    def _bucket_of(self, key) -> int:
+        # The first bucket whose largest key isn't smaller than the key, or the last bucket
+        return min(bisect_left(self.maxes, key), len(self.buckets) - 1)
+
+    def add(self, key) -> None:
+        bucket = self._bucket_of(key)
+        insort(self.buckets[bucket], key)
+        if len(self.buckets[bucket]) >= 2 * BUCKET_SIZE:
+            full = self.buckets[bucket]
+            self.buckets[bucket:bucket + 1] = [full[:BUCKET_SIZE], full[BUCKET_SIZE:]]
+            self._rebuild()
+        else:
+            self.maxes[bucket:bucket + 1] = self.buckets[bucket][-1:]
+            self._update(bucket, 1)
+
+    def remove(self, key) -> None:
+        bucket = self._bucket_of(key)
+        keys = self.buckets[bucket]
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            raise KeyError(key)
+        del keys[i]
+        if not keys and len(self.buckets) > 1:
+            del self.buckets[bucket]
+            self._rebuild()
+        else:
+            self.maxes[bucket:bucket + 1] = keys[-1:]
+            self._update(bucket, -1)
+
+    def position(self, key) -> int:
+        """
+        Number of keys smaller than a key
+        :param key: the key, doesn't have to be in the index
+        :return: int
+        """
+        bucket = self._bucket_of(key)
+        return self._before(bucket) + bisect_left(self.buckets[bucket], key)
+
+    def __getitem__(self, position: int):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('position out of range')
+
+        # Walk down the Fenwick tree to the bucket holding the position
+        bucket, step = 0, 1 << (len(self.buckets)).bit_length()
+        while step:
+            if bucket + step < len(self.tree) and self.tree[bucket + step] <= position:
+                bucket += step
+                position -= self.tree[bucket]
+            step >>= 1
+        return self.buckets[bucket][position]
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
+
+
+class ScoreLog:
+    """Append-only file of scores, rewritten with only the live entries when it's compacted"""
+    def __init__(self, path: str = 'high_score.log') -> None:
+        self.path = path
+        self.file = None
+
+    def load(self):
+        """
+        :return: generator of tuple, (name, score) in the order they were written
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + LOG_RECORD.size <= len(data):
+            score, length = LOG_RECORD.unpack_from(data, offset)
+            offset += LOG_RECORD.size
+            if offset + length > len(data):
+                # A record cut short by a crash, everything before it is fine
+                break
+            yield data[offset:offset + length].decode(), score
+            offset += length
+
+    def append(self, name: str, score: int) -> None:
+        if self.file is None:
+            self.file = open(self.path, 'ab')
+        encoded = name.encode()
+        self.file.write(LOG_RECORD.pack(score, len(encoded)) + encoded)
+
+    def flush(self) -> None:
+        if self.file is not None:
+            self.file.flush()
+
+    def compact(self, entries) -> None:
+        """
+        Replace the log with the live entries. The new log is written next to the old one and swapped in,
+        so a crash during compaction leaves the old log as it was
+        :param entries: iterable of tuple, (name, score)
+        :return: None
+        """
+        self.close()
+        with open(self.path + '.compact', 'wb') as f:
+            for name, score in entries:
+                encoded = name.encode()
+                f.write(LOG_RECORD.pack(score, len(encoded)) + encoded)
+        os.replace(self.path + '.compact', self.path)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class CollectionScores:
+    """
+    Scores in the HighScore collection, written in the background in batches. Every document has an entry number,
+    to keep equal scores in the order they were added, and the generation of the collection it belongs to.
+    Compaction writes the live entries as the next generation before it deletes the older ones, so a crash in
+    between leaves both, and loading keeps the newest
+    """
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 1.0) -> None:
+        from src.db.model.collections import HighScore
+        from src.db.model.write_queue import WriteQueue
+
+        self.collection = HighScore
+        self.queue = WriteQueue(HighScore, batch_size=batch_size, flush_interval=flush_interval)
+        self.generation = 0
+        self.next_entry = 0
+        # Older generations found by load, left behind by an interrupted compaction
+        self.stale = set()
+
+    def load(self):
+        documents = list(self.collection.raw(projection={'_id': False}))
+        generations = {document.get('generation', 0) for document in documents}
+        self.generation = max(generations, default=0)
+        self.stale = generations - {self.generation}
+        current = sorted((document for document in documents if document.get('generation', 0) == self.generation),
+                         key=lambda document: document.get('entry', 0))
+        self.next_entry = current[-1].get('entry', 0) + 1 if current else 0
+        for document in current:
+            yield document['name'], document['score']
+
+    def append(self, name: str, score: int) -> None:
+        self.queue.put({'name': name, 'score': score, 'entry': self.next_entry, 'generation': self.generation})
+        self.next_entry += 1
+
+    def flush(self) -> None:
+        self.queue.flush()
+
+    def compact(self, entries) -> None:
+        self.queue.flush()
+        generation = self.generation + 1
+        saved = self.collection.bulk_save({'name': name, 'score': score, 'entry': entry, 'generation': generation}
+                                          for entry, (name, score) in enumerate(entries))
+        self.stale.add(self.generation)
+        self.generation, self.next_entry = generation, saved.inserted
+        for stale in sorted(self.stale):
+            self.collection.delete(generation=stale)
+        self.stale = set()
+
+    def close(self) -> None:
+        self.queue.close()
 
 
 class HighScoreBoard:
-    def __init__(self):
-        self.board = []
+    def __init__(self, store=None, capacity: int = None) -> None:
+        """
+        :param store: ScoreLog or CollectionScores, where the scores are kept, high_score.log if None
+        :param capacity: int, keep only this many of the best scores, every score if None
+        """
+        self.store = store if store is not None else ScoreLog()
+        self.capacity = capacity
+        self.index = ScoreIndex()
+        self.names = {}
+        self.next_entry = 0
+        # Entries in the store that are no longer on the board, the store is compacted when there are many
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
 
-    def load_high_score(self):
-        with open('high_score.taf', 'rb') as score_file:
-            loaded_data = pickle.load(score_file)
+    def load_high_score(self) -> None:
+        entries = list(self.store.load())
+        keys = []
+        for entry, (name, score) in enumerate(entries):
+            self.names[entry] = name
+            keys.append((-score, entry))
+        self.next_entry = len(entries)
+        self.index = ScoreIndex(keys)
+        self._trim()
 
-        for line in loaded_data:
-            self.board.append(line)
+    def save_high_score(self) -> None:
+        if self.dropped:
+            self.compact()
+        else:
+            self.store.flush()
 
-    def save_high_score(self):
-        with open('high_score.taf', 'wb') as score_file:
-            pickle.dump(self.board, score_file)
+    def compact(self) -> None:
+        self.store.compact((self.names[entry], -score) for score, entry in self.index)
+        self.dropped = 0
 
     def update_high_score(self, player_name: str, player_score: int):
-        score = {player_name: player_score}
-        for i in self.board:
-            if player_score > i[1]:
-                self.board.append(score)
-                self.board = sorted(self.board, key=int)
-                self.board.pop(-1)
-                break
+        """
+        Add a score to the board
+        :param player_name: str
+        :param player_score: int
+        :return: int, the rank of the score, 1 for the best, or None if it didn't make it onto a full board
+        """
+        key = (-player_score, self.next_entry)
+        if self.capacity is not None and len(self.index) >= self.capacity and key > self.index[-1]:
+            return None
+
+        self.names[self.next_entry] = player_name
+        self.next_entry += 1
+        self.index.add(key)
+        self.store.append(player_name, player_score)
+        self._trim()
+        if self.dropped > max(len(self.index), COMPACT_AFTER):
+            self.compact()
+        return self.index.position(key) + 1
+
+    def _trim(self) -> None:
+        while self.capacity is not None and len(self.index) > self.capacity:
+            key = self.index[-1]
+            self.index.remove(key)
+            del self.names[key[1]]
+            self.dropped += 1
+
+    def rank(self, score: int) -> int:
+        """
+        The rank a score would get, ties go after the scores already on the board
+        :param score: int
+        :return: int, 1 for the best
+        """
+        return self.index.position((-score, self.next_entry)) + 1
+
+    def top(self, count: int = 10, start: int = 0) -> list[tuple]:
+        """
+        The best scores
+        :param count: int, number of scores
+        :param start: int, rank - 1 of the first score
+        :return: list[tuple], (name, score), best first
+        """
+        end = min(start + count, len(self.index))
+        return [(self.names[entry], -score) for score, entry in (self.index[i] for i in range(start, end))]
+
+    def close(self) -> None:
+        self.save_high_score()
+        self.store.close()
@@ -1,69 +1,98 @@
 from src.assets.battle import engaged_in_battle
+from src.assets.commands import CommandTable
 from src.assets.inventory import drop_item, pick_up_item, open_chest, inspect_item
 from src.assets.map.directions import OPPOSITE_DIRECTIONS
+from src.assets.output import say
+from src.assets.prompt import ask
 
+# Commands in the maze, handlers are called with the level and the players current location
+COMMANDS = CommandTable()
 
-def process_user_input(level) -> None:
+
+async def process_user_input(level) -> None:
     """
-    Main method. Process the users input, and through a matching pattern decide what method(s) to call
+    Main method. Process the users input and run the matching command from COMMANDS
     :return: None
     """
-    came_from = None
     current_location = level.maze.get_cell(*level.player.position)
-    command = input('>> ')
-
-    match command.lower().split():
-        case ['go', direction] if direction in current_location.walls and not current_location.walls[direction]:
-            print('You go further in the maze!')
-            for key, value in OPPOSITE_DIRECTIONS.items():
-                if direction == key:
-                    came_from = value
-                    break
-            level.player.move(direction)
-            current_location = level.maze.get_cell(*level.player.position)
-
-            if current_location.enemy:
-                engaged_in_battle(direction, level.player, current_location)
-        case ['go', *bad_direction]:
-            print(f'You can\'t go in that direction: {" ".join(bad_direction)}')
-
-        case ['get', item]:
-            pick_up_item(level.player, item, current_location)
-        case ['drop', item]:
-            drop_item(level.player, item, current_location)
-        case ['check', item]:
-            if current_location.item and 'check' in current_location.item.__dict__['actions']:
-                print(f'You look at the {item}\nIt\'s a {current_location.item.__dict__["description"]}')
-            else:
-                print(f'You can\'t check that out.')
-        case ['inspect', item]:
-            print(f'{inspect_item(current_location, item)}')
-
-        case ['open', item]:
-            if not current_location.item or current_location.item.__dict__['label'] != item:
-                print('There is nothing to open here!')
-            elif item == current_location.item.__dict__['label']:
-                if level.player.inventory.item_in_inventory(current_location.item.__dict__['requirements']):
-                    match item:
-                        case 'chest':
-                            open_chest(level.player, current_location.item)
-                        case 'door':
-                            print('You open the door and move further!\n')
-                            level.complete = True
-                        case _:
-                            print(f'I can\'t understand "open {item}"')
-                else:
-                    print(f'The {item} is locked, you need something to unlock it with!')
-            else:
-                print(f'I can\'t understand "open {item}"')
-
-        case ['inventory']:
-            level.player.inventory.print_inventory()
-        case ['quit']:
-            level.player.alive = False
-
-        case _:
-            print(f'I don\'t understand {command}...')
+    command = await ask('>> ')
+    came_from = await COMMANDS.dispatch(command, level, current_location)
 
     if not level.complete and level.player.alive:
         level.print_maze_info(came_from)
+
+
+@COMMANDS.command('go', arguments=None)
+async def go(level, current_location, *direction):
+    """
+    Move the player, if there's no wall in the way
+    :return: str, the direction the player came from, None if the player didn't move
+    """
+    if len(direction) != 1 or direction[0] not in current_location.walls or current_location.walls[direction[0]]:
+        say(f'You can\'t go in that direction: {" ".join(direction)}')
+        return None
+
+    direction = direction[0]
+    say('You go further in the maze!')
+    level.player.move(direction)
+    current_location = level.maze.get_cell(*level.player.position)
+
+    if current_location.enemy:
+        await engaged_in_battle(direction, level.player, current_location)
+    return OPPOSITE_DIRECTIONS[direction]
+
+
+@COMMANDS.command('get', arguments=1)
+async def get(level, current_location, item):
+    await pick_up_item(level.player, item, current_location)
+
+
+@COMMANDS.command('drop', arguments=1)
+async def drop(level, current_location, item):
+    drop_item(level.player, item, current_location)
+
+
+@COMMANDS.command('check', arguments=1)
+async def check(level, current_location, item):
+    if current_location.item and 'check' in current_location.item.__dict__['actions']:
+        say(f'You look at the {item}\nIt\'s a {current_location.item.__dict__["description"]}')
+    else:
+        say(f'You can\'t check that out.')
+
+
+@COMMANDS.command('inspect', arguments=1)
+async def inspect(level, current_location, item):
+    say(f'{inspect_item(current_location, item)}')
+
+
+@COMMANDS.command('open', arguments=1)
+async def open_item(level, current_location, item):
+    details = current_location.item.__dict__ if current_location.item else None
+    if not details or details['label'] != item:
+        say('There is nothing to open here!')
+    elif level.player.inventory.item_in_inventory(details['requirements']):
+        match item:
+            case 'chest':
+                await open_chest(level.player, current_location, current_location.item)
+            case 'door':
+                say('You open the door and move further!\n')
+                level.complete = True
+            case _:
+                say(f'I can\'t understand "open {item}"')
+    else:
+        say(f'The {item} is locked, you need something to unlock it with!')
+
+
+@COMMANDS.command('inventory')
+async def inventory(level, current_location):
+    level.player.inventory.print_inventory()
+
+
+@COMMANDS.command('quit')
+async def quit_game(level, current_location):
+    level.player.alive = False
+
+
+@COMMANDS.fallback
+async def unknown(level, current_location, command):
+    say(f'I don\'t understand {command}...')
@@ -1,3 +1,8 @@
+from src.assets.commands import CommandTable
+from src.assets.output import say
+from src.assets.prompt import ask
+
+
 class Inventory:
     def __init__(self) -> None:
         self.pouch = []
@@ -18,27 +23,27 @@ class Inventory:
         :return: bool
         """
         if item['storage'] == 'pouch' and len(self.pouch) >= self.pouch_limit:
-            print(f'Your pouch is full.\n'
-                  f'You can\'t pick up {item["description"]} before you drop something from your pouch!')
+            say(f'Your pouch is full.\n'
+                f'You can\'t pick up {item["description"]} before you drop something from your pouch!')
             return True
         elif item['storage'] == 'hand' and hand:
             if self.left_hand and self.right_hand:
-                print(f'Your hands are full.\n'
-                      f'You can\'t pick up {item["description"]} before you drop something from your hands!')
+                say(f'Your hands are full.\n'
+                    f'You can\'t pick up {item["description"]} before you drop something from your hands!')
                 return True
             match hand:
                 case 'left' | 'left hand':
                     if self.left_hand:
-                        print(f'Your left hand is full!\nBut you can pick the {item["description"]} '
-                              f'up with your right hand or drop the item in your left hand.')
+                        say(f'Your left hand is full!\nBut you can pick the {item["description"]} '
+                            f'up with your right hand or drop the item in your left hand.')
                         return True
                 case 'right' | 'right hand':
                     if self.right_hand:
-                        print(f'Your right hand is full!\nBut you can pick the {item["description"]} '
-                              f'up with your left hand or drop the item in your right hand.')
+                        say(f'Your right hand is full!\nBut you can pick the {item["description"]} '
+                            f'up with your left hand or drop the item in your right hand.')
                         return True
                 case _:
-                    print('Invalid command')
+                    say('Invalid command')
                     return True
         return False
 
@@ -60,7 +65,7 @@ class Inventory:
 
         return False
 
-    def process_item_pickup(self, item, current_location, chest=None) -> None:
+    async def process_item_pickup(self, item, current_location, chest=None) -> None:
         """
         Process the pickup method
         :param item: Item instance, the item to pick up
@@ -69,10 +74,10 @@ class Inventory:
         :return None
         """
         if 'get' not in item['actions']:
-            print(f'It seems impossible to pick up the {item["description"]}')
+            say(f'It seems impossible to pick up the {item["description"]}')
 
         elif item['storage'] == 'pouch' and not self.inventory_full(item):
-            print(f'You pick up the {item["description"]}!')
+            say(f'You pick up the {item["description"]}!')
             self.pouch.append(item)
 
             if chest:
@@ -82,10 +87,10 @@ class Inventory:
                 current_location.got_item = False
 
         elif item['storage'] == 'hand':
-            hand = input(f'Which hand do you want to pick up the {item["description"]} with?\n>> ')
+            hand = await ask(f'Which hand do you want to pick up the {item["description"]} with?\n>> ')
 
             if not self.inventory_full(item, hand):
-                print(f'You pick up the {item["description"]} in your {hand} hand!')
+                say(f'You pick up the {item["description"]} in your {hand} hand!')
                 if hand == 'right' or hand == 'right hand':
                     self.right_hand = item
                 elif hand == 'left' or hand == 'left hand':
@@ -97,7 +102,7 @@ class Inventory:
                     current_location.item = None
                     current_location.got_item = False
         else:
-            print('Your inventory is full!')
+            say('Your inventory is full!')
 
     def print_inventory(self) -> None:
         """
@@ -105,25 +110,25 @@ class Inventory:
         return: None
         """
         if len(self.pouch) == 0 and not self.right_hand and not self.left_hand:
-            print('Yor inventory is empty')
+            say('Yor inventory is empty')
         else:
-            print(f'\tINVENTORY')
+            say(f'\tINVENTORY')
             if len(self.pouch) == 0:
-                print('Your pouch is empty\n')
+                say('Your pouch is empty\n')
             else:
                 for item in sorted(self.pouch, key=lambda i: i['description']):
-                    print(f'* {item["description"]}')
-                print()
+                    say(f'* {item["description"]}')
+                say()
 
             if self.right_hand:
-                print(f'Right hand:  {self.right_hand["description"]}')
+                say(f'Right hand:  {self.right_hand["description"]}')
             else:
-                print(f'Right hand:  {self.right_hand}')
+                say(f'Right hand:  {self.right_hand}')
 
             if self.left_hand:
-                print(f'Left hand:  {self.left_hand["description"]}')
+                say(f'Left hand:  {self.left_hand["description"]}')
             else:
-                print(f'Left hand:  {self.left_hand}')
+                say(f'Left hand:  {self.left_hand}')
 
     def remove_pouch_item(self, label: str) -> None:
         """
@@ -147,7 +152,7 @@ class Item:
         object.__setattr__(self, key, value)
 
 
-def open_chest(player, current_location, chest):
+async def open_chest(player, current_location, chest):
     """
     Method to open a chest
     :param chest: Item instance
@@ -155,20 +160,33 @@ def open_chest(player, current_location, chest):
     """
     if chest.__dict__['label'] == 'chest':
         chest.__dict__['open'] = True
-        print(f'The {chest.__dict__["description"]} is open and contains the following: ')
+        say(f'The {chest.__dict__["description"]} is open and contains the following: ')
         for i in chest.__dict__['contains']:
-            print(f'* {i.__dict__["description"]}')
+            say(f'* {i.__dict__["description"]}')
 
     while chest.__dict__['open']:
-        command = input('>> ')
-        match command.lower().split():
-            case ['get', item]:
-                player.inventory.pick_up_item(item, current_location, chest)
-            case ['close'] | ['close', 'chest']:
-                print(f'You close the {chest.__dict__["description"]}')
-                chest.__dict__['open'] = False
-            case _:
-                print(f'I don\'t understand {command}...')
+        command = await ask('>> ')
+        await CHEST_COMMANDS.dispatch(command, player, current_location, chest)
+
+
+# Commands while a chest is open, handlers are called with the player, the players current location and the chest
+CHEST_COMMANDS = CommandTable()
+
+
+@CHEST_COMMANDS.command('get', arguments=1)
+async def get_from_chest(player, current_location, chest, item):
+    await pick_up_item(player, item, current_location, chest)
+
+
+@CHEST_COMMANDS.command('close', 'close chest')
+async def close_chest(player, current_location, chest):
+    say(f'You close the {chest.__dict__["description"]}')
+    chest.__dict__['open'] = False
+
+
+@CHEST_COMMANDS.fallback
+async def unknown(player, current_location, chest, command):
+    say(f'I don\'t understand {command}...')
 
 
 def inspect_item(current_location, label: str) -> str:
@@ -189,7 +207,7 @@ def inspect_item(current_location, label: str) -> str:
         return 'There is nothing to investigate here!'
 
 
-def pick_up_item(player, label: str, current_location, chest=None) -> None:
+async def pick_up_item(player, label: str, current_location, chest=None) -> None:
     """
     Pick up an item from the current location, or from a chest, and append it to the players inventory
     :param label: str, label of the item to get
@@ -200,15 +218,15 @@ def pick_up_item(player, label: str, current_location, chest=None) -> None:
     if chest:
         for item in chest.__dict__['contains']:
             if label == item.__dict__['label']:
-                player.inventory.process_item_pickup(item.__dict__, current_location, chest)
+                await player.inventory.process_item_pickup(item.__dict__, current_location, chest)
             else:
-                print(f'There is no {label} in the chest')
+                say(f'There is no {label} in the chest')
 
     elif not current_location.item or label != current_location.item.__dict__['label']:
-        print(f'There is no {label} here')
+        say(f'There is no {label} here')
 
     elif label == current_location.item.__dict__['label']:
-        player.inventory.process_item_pickup(current_location.item.__dict__, current_location)
+        await player.inventory.process_item_pickup(current_location.item.__dict__, current_location)
 
 
 def drop_item(player, label: str, current_location) -> None:
@@ -225,12 +243,12 @@ def drop_item(player, label: str, current_location) -> None:
                 found_item = item
                 break
     else:
-        print(f'This space isn\'t empty! You can\'t drop the {label}')
+        say(f'This space isn\'t empty! You can\'t drop the {label}')
 
     if found_item and 'drop' in found_item.__dict__['actions']:
-        print(f'You drop the {label}')
+        say(f'You drop the {label}')
         player.inventory.pouch.remove(found_item)
         current_location.item = found_item
         current_location.got_item = True
     else:
-        print(f'You can\'t drop the {label}, you should have thought of this earlier')
+        say(f'You can\'t drop the {label}, you should have thought of this earlier')
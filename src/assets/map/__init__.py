@@ -1,46 +1,57 @@
-def write_map(maze, out_file: str):
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from src.assets.map.generators import unpack_walls
+from src.assets.map.stream import SvgRowWriter, open_map_file
+
+# Background map exports run one at a time, off the game loop
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='map-export')
+
+
+def write_walls(cells, num_of_cells_x: int, num_of_cells_y: int, out_file: str, compress: bool = False) -> None:
+    """
+    Render the wall bits of a maze as an SVG image in memory and write it to disk in a single write
+    :param cells: bytes-like, the wall bits of every cell, one byte per cell
+    :param num_of_cells_x: int, number of cells in a row
+    :param num_of_cells_y: int, number of rows
+    :param out_file: str, the file name for the output file, without extension
+    :param compress: bool, write a gzip compressed .svgz file
+    :return None
+    """
+    buffer = io.StringIO()
+    writer = SvgRowWriter(buffer, num_of_cells_x, num_of_cells_y)
+    for y in range(num_of_cells_y):
+        writer.write_row(y, cells[y * num_of_cells_x:(y + 1) * num_of_cells_x])
+    writer.finish()
+
+    with open_map_file(out_file, SvgRowWriter.extension, compress) as f:
+        f.write(buffer.getvalue())
+
+
+def write_map(maze, out_file: str, compress: bool = False) -> None:
     """
     Write an map as an SVG (Scalable Vector Graphics) image of the map
     :param maze: Maze instance, the maze to write to SVG
     :param out_file: str, the file name for the output file
+    :param compress: bool, write a gzip compressed .svgz file
     :return None
     """
+    cells = unpack_walls(maze.walls, maze.num_of_cells_x * maze.num_of_cells_y)
+    write_walls(cells, maze.num_of_cells_x, maze.num_of_cells_y, out_file, compress)
+
+
+def export_map(maze, out_file: str = 'maze', compress: bool = False, background: bool = False):
+    """
+    Export the map when it's asked for. In the background the walls are copied first, so the maze can change
+    while the image is written
+    :param maze: Maze instance, the maze to export
+    :param out_file: str, the file name for the output file
+    :param compress: bool, write a gzip compressed .svgz file
+    :param background: bool, write the file in a background thread
+    :return: Future if the export runs in the background, otherwise None
+    """
+    if not background:
+        return write_map(maze, out_file, compress)
 
-    def write_wall(wall_f, wall_x1, wall_y1, wall_x2, wall_y2):
-        print('<line x1="{}" y1="{}" x2="{}" y2="{}"/>'
-              .format(wall_x1, wall_y1, wall_x2, wall_y2), file=wall_f)
-
-    aspect_ratio = maze.num_of_cells_x / maze.num_of_cells_y
-    padding = 10
-    height = 500
-    width = int(height * aspect_ratio)  # Height and width of the map image in pixels
-    scale_y, scale_x = height / maze.num_of_cells_y, width / maze.num_of_cells_x  # Scaling the map coordinates
-
-    with open(out_file + '.svg', 'w') as f:
-        # SVG preamble and styles.
-        print('<?xml version="1.0" encoding="utf-8"?>', file=f)
-        print('<svg xmlns="http://www.w3.org/2000/svg"', file=f)
-        print('    xmlns:xlink="http://www.w3.org/1999/xlink"', file=f)
-        print('    width="{:d}" height="{:d}" viewBox="{} {} {} {}">'
-              .format(width + 2 * padding, height + 2 * padding,
-                      -padding, -padding, width + 2 * padding, height + 2 * padding),
-              file=f)
-        print('<defs>\n<style type="text/css"><![CDATA[', file=f)
-        print('line {', file=f)
-        print('    stroke: #000000;\n    stroke-linecap: square;', file=f)
-        print('    stroke-width: 5;\n}', file=f)
-        print(']]></style>\n</defs>', file=f)
-        # Draw the "South" and "East" walls of each cell,
-        # these are the "North" and "West" walls of the neighbouring cell
-        for x in range(maze.num_of_cells_x):
-            for y in range(maze.num_of_cells_y):
-                if maze.get_cell(x, y).walls['south']:
-                    x1, y1, x2, y2 = x * scale_x, (y + 1) * scale_y, (x + 1) * scale_x, (y + 1) * scale_y
-                    write_wall(f, x1, y1, x2, y2)
-                if maze.get_cell(x, y).walls['east']:
-                    x1, y1, x2, y2 = (x + 1) * scale_x, y * scale_y, (x + 1) * scale_x, (y + 1) * scale_y
-                    write_wall(f, x1, y1, x2, y2)
-        # Draw the North and West map border
-        print('<line x1="0" y1="0" x2="{}" y2="0"/>'.format(width), file=f)
-        print('<line x1="0" y1="0" x2="0" y2="{}"/>'.format(height), file=f)
-        print('</svg>', file=f)
+    cells = unpack_walls(maze.walls, maze.num_of_cells_x * maze.num_of_cells_y)
+    return _export_executor.submit(write_walls, cells, maze.num_of_cells_x, maze.num_of_cells_y, out_file, compress)
@@ -11,3 +11,13 @@ DIRECTIONS = {
     'east': (1, 0),
     'west': (-1, 0)
 }
+
+# One bit per wall, a cell's walls fit in a nibble
+WALL_BITS = {
+    'north': 1,
+    'south': 2,
+    'east': 4,
+    'west': 8
+}
+
+ALL_WALLS = 15
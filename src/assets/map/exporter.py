@@ -0,0 +1,184 @@
+"""
+Map exporters for other formats than the SVG from write_map:
+ASCII art, PNG images and the compact binary .maze format
+
+The .maze format is a fixed size little-endian header followed by the packed wall array of the maze,
+exactly as Maze keeps it in memory (4 bits per cell, two cells per byte, cells in row-major order).
+Since the header has a fixed size, any cell can be read straight from a memory map of the file
+"""
+import mmap
+import struct
+import zlib
+
+from src.assets.map import write_map
+from src.assets.map.directions import WALL_BITS
+from src.assets.map.generators import unpack_walls
+from src.assets.map.stream import TextRowWriter, open_map_file
+
+MAZE_MAGIC = b'MAZE'
+MAZE_VERSION = 1
+
+# magic, version, header size, width, height, start x, start y
+MAZE_HEADER = struct.Struct('<4sHHIIII')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_BLACK, _WHITE = 0, 255
+
+# Map the wall bits of a cell to the grayscale value of the pixel east or south of it
+_EAST_PIXEL = bytes(_BLACK if value & WALL_BITS['east'] else _WHITE for value in range(256))
+_SOUTH_PIXEL = bytes(_BLACK if value & WALL_BITS['south'] else _WHITE for value in range(256))
+
+
+def _rows(maze):
+    """
+    Iterate over the rows of a maze, one byte of wall bits per cell
+    :param maze: Maze instance
+    :return: generator of bytearray
+    """
+    cells = unpack_walls(maze.walls, maze.num_of_cells_x * maze.num_of_cells_y)
+    for y in range(maze.num_of_cells_y):
+        yield cells[y * maze.num_of_cells_x:(y + 1) * maze.num_of_cells_x]
+
+
+def write_ascii(maze, out_file: str, compress: bool = False) -> None:
+    """
+    Write the maze as ASCII art
+    :param maze: Maze instance, the maze to write
+    :param out_file: str, the file name for the output file, without extension
+    :param compress: bool, write a gzip compressed file
+    :return: None
+    """
+    with open_map_file(out_file, TextRowWriter.extension, compress) as f:
+        writer = TextRowWriter(f, maze.num_of_cells_x, maze.num_of_cells_y)
+        for y, row in enumerate(_rows(maze)):
+            writer.write_row(y, row)
+        writer.finish()
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def write_png(maze, out_file: str) -> None:
+    """
+    Write the maze as a grayscale PNG image with one pixel per wall unit. Cell (x, y) is the white pixel at
+    (2x + 1, 2y + 1), the pixels between cells are black where there is a wall
+    :param maze: Maze instance, the maze to write
+    :param out_file: str, the file name for the output file, without extension
+    :return: None
+    """
+    width, height = 2 * maze.num_of_cells_x + 1, 2 * maze.num_of_cells_y + 1
+    compressor = zlib.compressobj(6)
+
+    with open(out_file + '.png', 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)))
+
+        # Every scanline starts with filter type 0, the first one is the north border
+        data = [compressor.compress(b'\x00' + bytes(width))]
+        cell_line, wall_line = bytearray(width + 1), bytearray(width + 1)
+        cell_line[2::2] = bytes([_WHITE]) * maze.num_of_cells_x
+        for row in _rows(maze):
+            cell_line[3::2] = row.translate(_EAST_PIXEL)
+            wall_line[2::2] = row.translate(_SOUTH_PIXEL)
+            data.append(compressor.compress(cell_line))
+            data.append(compressor.compress(wall_line))
+
+            if len(data) > 256:
+                f.write(_png_chunk(b'IDAT', b''.join(data)))
+                data.clear()
+
+        data.append(compressor.flush())
+        f.write(_png_chunk(b'IDAT', b''.join(data)))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def write_record(f, maze) -> int:
+    """
+    Write one .maze record, header and packed walls, at the current position of a binary file
+    :param f: binary file object
+    :param maze: Maze instance, or anything with the same size, start and walls attributes
+    :return: int, number of bytes written
+    """
+    f.write(MAZE_HEADER.pack(MAZE_MAGIC, MAZE_VERSION, MAZE_HEADER.size, maze.num_of_cells_x,
+                             maze.num_of_cells_y, maze.start_x, maze.start_y))
+    f.write(maze.walls)
+    return MAZE_HEADER.size + len(maze.walls)
+
+
+def write_binary(maze, out_file: str) -> None:
+    """
+    Write the maze in the binary .maze format
+    :param maze: Maze instance, the maze to write
+    :param out_file: str, the file name for the output file, without extension
+    :return: None
+    """
+    with open(out_file + '.maze', 'wb') as f:
+        write_record(f, maze)
+
+
+def read_header(buffer, offset: int = 0) -> tuple:
+    """
+    Read and check the header of a .maze record
+    :param buffer: bytes-like, the file contents
+    :param offset: int, where the record starts
+    :return: tuple, (header size, width, height, start x, start y)
+    """
+    if len(buffer) < offset + MAZE_HEADER.size:
+        raise ValueError('Not a .maze file')
+
+    magic, version, header_size, *header = MAZE_HEADER.unpack_from(buffer, offset)
+    if magic != MAZE_MAGIC:
+        raise ValueError('Not a .maze file')
+    if version > MAZE_VERSION:
+        raise ValueError(f'Unsupported .maze version {version}')
+    return header_size, *header
+
+
+class MazeFile:
+    """
+    Read only access to a .maze file through a memory map. Cells are decoded when they are asked for,
+    so opening a file costs the same however big the maze is
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_size, self.num_of_cells_x, self.num_of_cells_y, self.start_x, self.start_y = read_header(self.map)
+        walls_size = (self.num_of_cells_x * self.num_of_cells_y + 1) // 2
+        self.walls = memoryview(self.map)[header_size:header_size + walls_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_walls(self, x: int, y: int) -> int:
+        index = y * self.num_of_cells_x + x
+        return self.walls[index >> 1] >> ((index & 1) << 2) & 0x0F
+
+    def close(self) -> None:
+        self.walls.release()
+        self.map.close()
+
+
+EXPORTERS = {
+    'svg': write_map,
+    'txt': write_ascii,
+    'png': write_png,
+    'maze': write_binary
+}
+
+
+def export(maze, out_file: str, file_format: str = 'svg') -> None:
+    """
+    Write the maze in one of the supported formats
+    :param maze: Maze instance, the maze to write
+    :param out_file: str, the file name for the output file, without extension
+    :param file_format: str, one of EXPORTERS
+    :return: None
+    """
+    if file_format not in EXPORTERS:
+        raise ValueError(f'Unknown map format "{file_format}", choose one of: {", ".join(EXPORTERS)}')
+    EXPORTERS[file_format](maze, out_file)
@@ -0,0 +1,369 @@
+import random
+from array import array
+
+from src.assets.map.directions import WALL_BITS, OPPOSITE_DIRECTIONS, DIRECTIONS, ALL_WALLS
+from src.assets.rng import coins
+
+# Moving nibbles in and out of place when packing two cells into one byte
+_HIGH_NIBBLE = bytes((value << 4) & 0xFF for value in range(256))
+_LOW_HALF = bytes(value & 0x0F for value in range(256))
+_HIGH_HALF = bytes(value >> 4 for value in range(256))
+
+
+def neighbour_table(width: int) -> list[tuple]:
+    """
+    Precompute the moves available from a cell, grouped by which borders of the maze the cell touches
+    The table is indexed by border flags (1 west, 2 east, 4 north, 8 south), every move is
+    (index offset, wall bit, opposite wall bit)
+    :param width: int, number of cells in a row
+    :return: list[tuple], 16 tuples of moves
+    """
+    offsets = {direction: dy * width + dx for direction, (dx, dy) in DIRECTIONS.items()}
+    blocked_by = {'west': 1, 'east': 2, 'north': 4, 'south': 8}
+
+    return [tuple((offsets[direction], WALL_BITS[direction], WALL_BITS[OPPOSITE_DIRECTIONS[direction]])
+                  for direction in DIRECTIONS if not borders & blocked_by[direction])
+            for borders in range(16)]
+
+
+def recursive_backtracker(width: int, height: int, start: int = 0, rng=random) -> bytearray:
+    """
+    Carve a perfect maze with a randomized depth-first search. Every step moves to a random unvisited neighbour,
+    and when the current cell is a dead end the search backtracks to the last cell with unvisited neighbours
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param start: int, index of the cell to start carving from
+    :param rng: random.Random instance or the random module
+    :return: bytearray, the wall bits of every cell, one byte per cell
+    """
+    total_cells = width * height
+    walls = bytearray([ALL_WALLS]) * total_cells
+    visited = bytearray((total_cells + 7) >> 3)
+    moves = neighbour_table(width)
+    last_x, last_y = width - 1, height - 1
+    candidates = [None] * 4
+    cell_stack = array('l')
+    rand = rng.random
+
+    current = start
+    visited[current >> 3] |= 1 << (current & 7)
+    created_cells = 1
+
+    while created_cells < total_cells:
+        y, x = divmod(current, width)
+        count = 0
+        for move in moves[(x == 0) | (x == last_x) << 1 | (y == 0) << 2 | (y == last_y) << 3]:
+            neighbour = current + move[0]
+            if not visited[neighbour >> 3] & 1 << (neighbour & 7):
+                candidates[count] = move
+                count += 1
+
+        if not count:
+            current = cell_stack.pop()
+            continue
+
+        offset, wall, opposite = candidates[int(rand() * count)]
+        walls[current] &= ~wall
+        cell_stack.append(current)
+        current += offset
+        walls[current] &= ~opposite
+        visited[current >> 3] |= 1 << (current & 7)
+        created_cells += 1
+
+    return walls
+
+
+def wilson(width: int, height: int, start: int = 0, rng=random) -> bytearray:
+    """
+    Carve a uniform spanning tree with loop-erased random walks. Each walk starts from a cell outside the maze and
+    wanders until it hits the maze, remembering only the last move out of every cell so loops erase themselves
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param start: int, index of the first cell in the maze
+    :param rng: random.Random instance or the random module
+    :return: bytearray, the wall bits of every cell, one byte per cell
+    """
+    total_cells = width * height
+    walls = bytearray([ALL_WALLS]) * total_cells
+    in_maze = bytearray(total_cells)
+    moves = neighbour_table(width)
+    last_x, last_y = width - 1, height - 1
+    choice = rng.choice
+
+    in_maze[start] = 1
+    for first in range(total_cells):
+        if in_maze[first]:
+            continue
+
+        last_move = {}
+        current = first
+        while not in_maze[current]:
+            y, x = divmod(current, width)
+            move = choice(moves[(x == 0) | (x == last_x) << 1 | (y == 0) << 2 | (y == last_y) << 3])
+            last_move[current] = move
+            current += move[0]
+
+        current = first
+        while not in_maze[current]:
+            offset, wall, opposite = last_move[current]
+            in_maze[current] = 1
+            walls[current] &= ~wall
+            current += offset
+            walls[current] &= ~opposite
+
+    return walls
+
+
+def kruskal(width: int, height: int, start: int = 0, rng=random) -> bytearray:
+    """
+    Carve a maze by removing the walls in random order, skipping any wall whose two cells are already connected.
+    Connected cells are tracked with a union-find over cell indices
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param start: int, unused, every cell ends up in the same tree
+    :param rng: random.Random instance or the random module
+    :return: bytearray, the wall bits of every cell, one byte per cell
+    """
+    total_cells = width * height
+    walls = bytearray([ALL_WALLS]) * total_cells
+    parent = array('l', range(total_cells))
+    east, west, south, north = WALL_BITS['east'], WALL_BITS['west'], WALL_BITS['south'], WALL_BITS['north']
+
+    # Edge 2 * cell is the wall east of the cell, 2 * cell + 1 the wall south of it
+    edges = [cell << 1 for cell in range(total_cells) if cell % width != width - 1]
+    edges += [cell << 1 | 1 for cell in range(total_cells - width)]
+    rng.shuffle(edges)
+
+    joined = 1
+    for edge in edges:
+        cell = edge >> 1
+        other = cell + (width if edge & 1 else 1)
+
+        root = cell
+        while parent[root] != root:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        other_root = other
+        while parent[other_root] != other_root:
+            parent[other_root] = parent[parent[other_root]]
+            other_root = parent[other_root]
+        if root == other_root:
+            continue
+
+        parent[other_root] = root
+        if edge & 1:
+            walls[cell] &= ~south
+            walls[other] &= ~north
+        else:
+            walls[cell] &= ~east
+            walls[other] &= ~west
+
+        joined += 1
+        if joined == total_cells:
+            break
+
+    return walls
+
+
+def eller_rows(width: int, height: int, rng=random):
+    """
+    Eller's algorithm. Carve the maze one row at a time, only keeping track of which set every cell of the current
+    row belongs to. Memory use is O(width) no matter how tall the maze is
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param rng: random.Random instance or the random module
+    :return: generator of bytearray, the wall bits of every row, one byte per cell
+    """
+    east, west, south, north = WALL_BITS['east'], WALL_BITS['west'], WALL_BITS['south'], WALL_BITS['north']
+    sets = [0] * width
+    open_north = bytearray(width)
+    next_set = 1
+
+    for y in range(height):
+        last_row = y == height - 1
+        row = bytearray([ALL_WALLS]) * width
+        for x in range(width):
+            if open_north[x]:
+                row[x] &= ~north
+            if not sets[x]:
+                sets[x] = next_set
+                next_set += 1
+
+        # Join neighbouring cells of different sets, every join merges the two sets
+        merged = {}
+        join = coins(rng, width)
+        for x in range(width - 1):
+            left, right = sets[x], sets[x + 1]
+            while left in merged:
+                left = merged[left]
+            while right in merged:
+                right = merged[right]
+            if left != right and (last_row or join[x]):
+                row[x] &= ~east
+                row[x + 1] &= ~west
+                merged[right] = left
+        for x in range(width):
+            while sets[x] in merged:
+                sets[x] = merged[sets[x]]
+
+        if last_row:
+            yield row
+            return
+
+        # Every set continues downwards through at least one of its cells
+        members = {}
+        for x in range(width):
+            members.setdefault(sets[x], []).append(x)
+        open_north = bytearray(width)
+        go_down = coins(rng, width)
+        for columns in members.values():
+            down = [x for x in columns if go_down[x]] or [rng.choice(columns)]
+            for x in down:
+                row[x] &= ~south
+                open_north[x] = 1
+        sets = [sets[x] if open_north[x] else 0 for x in range(width)]
+
+        yield row
+
+
+def binary_tree_rows(width: int, height: int, rng=random):
+    """
+    Every cell opens either its south or its east wall. Cells on the south or east border only have one choice
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param rng: random.Random instance or the random module
+    :return: generator of bytearray, the wall bits of every row, one byte per cell
+    """
+    east, west, south, north = WALL_BITS['east'], WALL_BITS['west'], WALL_BITS['south'], WALL_BITS['north']
+    open_north = bytearray(width)
+
+    for y in range(height):
+        row = bytearray([ALL_WALLS]) * width
+        next_open_north = bytearray(width)
+        go_south = coins(rng, width)
+        for x in range(width):
+            if open_north[x]:
+                row[x] &= ~north
+            can_go_south, can_go_east = y < height - 1, x < width - 1
+            if can_go_south and (not can_go_east or go_south[x]):
+                row[x] &= ~south
+                next_open_north[x] = 1
+            elif can_go_east:
+                row[x] &= ~east
+                row[x + 1] &= ~west
+        open_north = next_open_north
+
+        yield row
+
+
+def sidewinder_rows(width: int, height: int, rng=random):
+    """
+    Carve runs of cells eastwards and close every run by opening the south wall of one random cell in it.
+    The last row is one long run, since it can't go further south
+    :param width: int, number of cells in a row
+    :param height: int, number of rows
+    :param rng: random.Random instance or the random module
+    :return: generator of bytearray, the wall bits of every row, one byte per cell
+    """
+    east, west, south, north = WALL_BITS['east'], WALL_BITS['west'], WALL_BITS['south'], WALL_BITS['north']
+    open_north = bytearray(width)
+
+    for y in range(height):
+        row = bytearray([ALL_WALLS]) * width
+        next_open_north = bytearray(width)
+        go_east = coins(rng, width)
+        last_row = y == height - 1
+        run_start = 0
+        for x in range(width):
+            if open_north[x]:
+                row[x] &= ~north
+            if last_row or (x < width - 1 and go_east[x]):
+                if x < width - 1:
+                    row[x] &= ~east
+                    row[x + 1] &= ~west
+            else:
+                down = rng.randrange(run_start, x + 1)
+                row[down] &= ~south
+                next_open_north[down] = 1
+                run_start = x + 1
+        open_north = next_open_north
+
+        yield row
+
+
+def _whole_maze(rows):
+    """
+    Turn a row-by-row generator into a generator with the same signature as recursive_backtracker
+    :param rows: callable, generator function yielding the rows of the maze
+    :return: callable
+    """
+    def generate(width: int, height: int, start: int = 0, rng=random) -> bytearray:
+        return bytearray().join(rows(width, height, rng))
+
+    generate.__name__ = rows.__name__.removesuffix('_rows')
+    generate.__doc__ = rows.__doc__
+    return generate
+
+
+eller = _whole_maze(eller_rows)
+binary_tree = _whole_maze(binary_tree_rows)
+sidewinder = _whole_maze(sidewinder_rows)
+
+# Generators for a whole maze, called as generator(width, height, start, rng)
+GENERATORS = {
+    'backtracker': recursive_backtracker,
+    'wilson': wilson,
+    'kruskal': kruskal,
+    'eller': eller,
+    'binary_tree': binary_tree,
+    'sidewinder': sidewinder
+}
+
+# Generators yielding the maze one row at a time, called as generator(width, height, rng)
+ROW_GENERATORS = {
+    'eller': eller_rows,
+    'binary_tree': binary_tree_rows,
+    'sidewinder': sidewinder_rows
+}
+
+
+def get_generator(name: str, rows: bool = False):
+    """
+    Look up a maze generation algorithm by name
+    :param name: str, name of the algorithm
+    :param rows: bool, only accept algorithms that can generate the maze one row at a time
+    :return: callable
+    """
+    registry = ROW_GENERATORS if rows else GENERATORS
+    if name not in registry:
+        raise ValueError(f'Unknown maze algorithm "{name}", choose one of: {", ".join(registry)}')
+    return registry[name]
+
+
+def pack_walls(cells) -> bytearray:
+    """
+    Pack one-byte-per-cell wall bits into the two-cells-per-byte layout used by Maze
+    :param cells: bytes-like, wall bits of every cell
+    :return: bytearray
+    """
+    if len(cells) & 1:
+        cells = bytes(cells) + bytes([ALL_WALLS])
+
+    low = int.from_bytes(cells[0::2], 'little')
+    high = int.from_bytes(bytes(cells[1::2]).translate(_HIGH_NIBBLE), 'little')
+    return bytearray((low | high).to_bytes(len(cells) >> 1, 'little'))
+
+
+def unpack_walls(packed, num_of_cells: int) -> bytearray:
+    """
+    Unpack the two-cells-per-byte layout used by Maze into one byte per cell
+    :param packed: bytes-like, packed wall bits
+    :param num_of_cells: int, total number of cells in the maze
+    :return: bytearray
+    """
+    packed = bytes(packed)
+    cells = bytearray(len(packed) << 1)
+    cells[0::2] = packed.translate(_LOW_HALF)
+    cells[1::2] = packed.translate(_HIGH_HALF)
+    del cells[num_of_cells:]
+    return cells
@@ -1,6 +1,23 @@
 import random
-from src.assets.map import write_map
-from src.assets.map.directions import OPPOSITE_DIRECTIONS, DIRECTIONS
+from collections.abc import MutableMapping
+from functools import cached_property
+
+from src.assets.map import export_map
+from src.assets.map.exporter import MazeFile
+from src.assets.map.directions import OPPOSITE_DIRECTIONS, WALL_BITS, ALL_WALLS
+from src.assets.map.generators import get_generator, pack_walls
+from src.assets.map.pathfinding import distance_field
+from src.assets.map.spatial import SpatialIndex
+
+
+def new_wall_array(num_of_cells: int) -> bytearray:
+    """
+    Create the wall storage for a maze, every cell starts with all four walls up
+    Two cells share each byte, the even cell in the low nibble and the odd cell in the high nibble
+    :param num_of_cells: int, total number of cells in the maze
+    :return: bytearray
+    """
+    return bytearray([ALL_WALLS | ALL_WALLS << 4]) * ((num_of_cells + 1) // 2)
 
 
 class Cell:
@@ -51,76 +68,252 @@ class Cell:
                 self.enemy = enemy
 
 
+class CellWalls(MutableMapping):
+    """Dict-like view of the walls of one cell, backed by the maze wall array"""
+    __slots__ = ('maze', 'index')
+
+    def __init__(self, maze, index: int) -> None:
+        self.maze = maze
+        self.index = index
+
+    def __getitem__(self, direction: str) -> bool:
+        return bool(self.maze.get_walls(self.index) & WALL_BITS[direction])
+
+    def __setitem__(self, direction: str, value: bool) -> None:
+        walls = self.maze.get_walls(self.index)
+        if value:
+            self.maze.set_walls(self.index, walls | WALL_BITS[direction])
+        else:
+            self.maze.set_walls(self.index, walls & ~WALL_BITS[direction])
+
+    def __delitem__(self, direction: str) -> None:
+        raise TypeError('Walls can be raised or removed, but not deleted')
+
+    def __iter__(self):
+        return iter(WALL_BITS)
+
+    def __len__(self) -> int:
+        return len(WALL_BITS)
+
+
+class MazeCell:
+    """
+    Lightweight view of a cell in a Maze, handed out by Maze.get_cell
+    Walls live in the maze wall array and items/enemies in the sparse maze dicts, so the view holds no state of its own
+    """
+    __slots__ = ('maze', 'x', 'y', 'index')
+
+    def __init__(self, maze, x: int, y: int) -> None:
+        self.maze = maze
+        self.x, self.y = x, y
+        self.index = maze.cell_index(x, y)
+
+    @property
+    def walls(self) -> CellWalls:
+        return CellWalls(self.maze, self.index)
+
+    @property
+    def item(self):
+        return self.maze.cell_items.get(self.index)
+
+    @item.setter
+    def item(self, item) -> None:
+        self.maze.place('item', self.index, item)
+
+    @property
+    def got_item(self) -> bool:
+        return self.index in self.maze.cell_items
+
+    @got_item.setter
+    def got_item(self, got_item: bool) -> None:
+        if not got_item:
+            self.maze.place('item', self.index, None)
+
+    @property
+    def enemy(self):
+        return self.maze.cell_enemies.get(self.index)
+
+    @enemy.setter
+    def enemy(self, enemy) -> None:
+        self.maze.place('enemy', self.index, enemy)
+
+    def surrounded_by_walls(self) -> bool:
+        return self.maze.get_walls(self.index) == ALL_WALLS
+
+    def remove_wall(self, other_cell, wall: str):
+        """
+        Method to remove the wall between two cells
+        :param other_cell: MazeCell instance
+        :param wall: str, the wall-direction to remove
+        return: None
+        """
+        self.walls[wall] = False
+        other_cell.walls[OPPOSITE_DIRECTIONS[wall]] = False
+
+    def set_item(self, items: list):
+        """
+        Set item to the cell with the same position
+        :param items: list, list of maze items
+        :return: None
+        """
+        for item in items:
+            if item.__dict__['position'] == (self.x, self.y):
+                self.item = item
+
+    def set_enemy(self, enemies: list):
+        """
+        Set enemy to the cell with the same position
+        :param enemies: list, list of enemies for current maze
+        :return: None
+        """
+        for enemy in enemies:
+            if enemy.__dict__['pos'] == (self.x, self.y):
+                self.enemy = enemy
+
+
 class Maze:
-    def __init__(self, num_of_cells_x, num_of_cells_y, items, enemies, start_cell_x=0, start_cell_y=0):
+    def __init__(self, num_of_cells_x, num_of_cells_y, items, enemies, start_cell_x=0, start_cell_y=0,
+                 algorithm='backtracker', walls=None, rng=random):
         self.num_of_cells_x, self.num_of_cells_y = num_of_cells_x, num_of_cells_y
         self.start_x, self.start_y = start_cell_x, start_cell_y
+        self.algorithm = algorithm
+        self.rng = rng
         self.maze_end = (self.num_of_cells_x - 1, self.num_of_cells_y - 1)
-        self.maze = [[Cell(x, y) for y in range(num_of_cells_y)] for x in range(num_of_cells_x)]
-        self.create_maze()
+        self.cell_items = {}
+        self.cell_enemies = {}
+        self.spatial = SpatialIndex(num_of_cells_x, num_of_cells_y)
+        # The MazeFile the walls are mapped from, closed with the maze
+        self.maze_file = None
+        # Walls of an already generated maze are used as they are, a memory map is only read when a cell is needed
+        if walls is None:
+            self.walls = new_wall_array(num_of_cells_x * num_of_cells_y)
+            self.create_maze()
+        else:
+            self.walls = walls
         self.set_item_and_enemies_in_location(self.generate_locations(items, enemies), items, enemies)
-        write_map(self, 'maze')
 
-    def get_cell(self, x: int, y: int) -> Cell:
-        return self.maze[x][y]
+    @classmethod
+    def from_file(cls, path: str, items: list, enemies: list, rng=random):
+        """
+        Load a maze from a binary .maze file, the walls are read from a memory map of the file
+        :param path: str, path to the .maze file
+        :param items: list, items for the maze
+        :param enemies: list, enemies for the maze
+        :param rng: random.Random instance or the random module, places the items and enemies
+        :return: Maze instance, close it, or use it as a context manager, to unmap the file
+        """
+        maze_file = MazeFile(path)
+        try:
+            maze = cls(maze_file.num_of_cells_x, maze_file.num_of_cells_y, items, enemies,
+                       maze_file.start_x, maze_file.start_y, walls=maze_file.walls, rng=rng)
+        except BaseException:
+            maze_file.close()
+            raise
+        maze.maze_file = maze_file
+        return maze
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file a maze from Maze.from_file reads its walls from, the walls can't be read afterwards.
+        Does nothing for other mazes
+        :return: None
+        """
+        if self.maze_file is not None:
+            self.maze_file.close()
+            self.maze_file = None
+
+    def export_map(self, out_file: str = 'maze', compress: bool = False, background: bool = False):
+        """
+        Write the maze as an SVG image, the map is only written when asked for
+        :param out_file: str, the file name for the output file
+        :param compress: bool, write a gzip compressed .svgz file
+        :param background: bool, write the file in a background thread
+        :return: Future if the export runs in the background, otherwise None
+        """
+        return export_map(self, out_file, compress, background)
 
-    def get_valid_neighbours(self, cell: Cell) -> list[tuple]:
+    def place(self, kind: str, index: int, entity) -> None:
         """
-        Checks the current cells neighbours by decrement or increment it's x and y value
-        If the neighbouring cell is inside the map, it appends to the neighbour list
-        :param cell: Cell instance, current cell
-        :return: list[tuple], list of neighbours
+        Put an item or an enemy in a cell, or clear the cell with None. Keeps the spatial index up to date
+        :param kind: str, 'item' or 'enemy'
+        :param index: int, cell index
+        :param entity: Item or Enemy instance, or None
+        :return: None
         """
-        neighbours = []
+        cells = self.cell_items if kind == 'item' else self.cell_enemies
+        if entity is None:
+            cells.pop(index, None)
+            self.spatial.remove(kind, index)
+        else:
+            cells[index] = entity
+            self.spatial.add(kind, index, entity)
 
-        for direction, value in DIRECTIONS.items():
-            neighbour_x, neighbour_y = cell.x + value[0], cell.y + value[1]
-            if 0 <= neighbour_x < self.num_of_cells_x and 0 <= neighbour_y < self.num_of_cells_y:
-                neighbour = self.get_cell(neighbour_x, neighbour_y)
-                if neighbour.surrounded_by_walls():
-                    neighbours.append((direction, neighbour))
+    @cached_property
+    def distance_to_exit(self):
+        """
+        Number of steps from every cell to the maze end, indexed by cell index. Computed once per maze
+        :return: array of int32
+        """
+        return distance_field(self, *self.maze_end)
 
-        return neighbours
+    def cell_index(self, x: int, y: int) -> int:
+        return y * self.num_of_cells_x + x
 
-    def create_maze(self) -> None:
+    def get_walls(self, index: int) -> int:
         """
-        The method checks the neighbouring cells and moves in random direction by removing the wall between the current
-        and the next cell. If the neighbouring cell is a dead end, it backtracks to the last "unvisited" neighbour
-        :return None
+        Read the wall bits of a cell
+        :param index: int, cell index
+        :return: int, the WALL_BITS that are up for the cell
         """
-        total_cells = self.num_of_cells_x * self.num_of_cells_y
-        cell_stack = []
-        current_cell = self.get_cell(self.start_x, self.start_y)
-        created_cells = 1
+        return self.walls[index >> 1] >> ((index & 1) << 2) & ALL_WALLS
 
-        while created_cells < total_cells:
-            neighbours = self.get_valid_neighbours(current_cell)
+    def set_walls(self, index: int, walls: int) -> None:
+        """
+        Overwrite the wall bits of a cell, leaving the neighbour sharing the byte untouched
+        :param index: int, cell index
+        :param walls: int, the WALL_BITS that should be up for the cell
+        :return: None
+        """
+        shift = (index & 1) << 2
+        self.walls[index >> 1] = self.walls[index >> 1] & (ALL_WALLS << (4 - shift)) | walls << shift
 
-            if not neighbours:
-                current_cell = cell_stack.pop()
-                continue
+    def get_cell(self, x: int, y: int) -> MazeCell:
+        return MazeCell(self, x, y)
 
-            direction, next_cell = random.choice(neighbours)
-            current_cell.remove_wall(next_cell, direction)
-            cell_stack.append(current_cell)
-            current_cell = next_cell
-            created_cells += 1
+    def create_maze(self) -> None:
+        """
+        Carve the maze with the generation algorithm chosen for it, see src.assets.map.generators
+        :return None
+        """
+        generate = get_generator(self.algorithm)
+        start = self.cell_index(self.start_x, self.start_y)
+        self.walls = pack_walls(generate(self.num_of_cells_x, self.num_of_cells_y, start, self.rng))
 
     def generate_locations(self, items: list, enemies: list) -> list[tuple]:
         """
-        Method to generate random locations for items and enemies
+        Method to generate random locations for items and enemies. The locations are sampled without replacement
+        among the cell indices, so the cost depends on the number of entities and not on the size of the maze
         :param items: set, items for the current maze
         :param enemies: set, enemies in the current maze
         :return: list[tuple], locations for items and enemies
         """
-        locations = []
-        for _ in range(len(enemies) + len(items)):
-            (x, y) = (random.randrange(0, self.num_of_cells_x), random.randrange(0, self.num_of_cells_y))
-            while (x, y) in locations or (x, y) == self.maze_end or (x, y) == (self.start_x, self.start_y):
-                (x, y) = (random.randrange(0, self.num_of_cells_x), random.randrange(0, self.num_of_cells_y))
-            locations.append((x, y))
+        total_cells = self.num_of_cells_x * self.num_of_cells_y
+        reserved = {self.cell_index(*self.maze_end), self.cell_index(self.start_x, self.start_y)}
+        count = len(enemies) + len(items)
 
-        return locations
+        # Draw a few spare indices to make up for the reserved cells, and drop the reserved ones
+        sample = self.rng.sample(range(total_cells), min(count + len(reserved), total_cells))
+        indices = [index for index in sample if index not in reserved][:count]
+        if len(indices) < count:
+            raise ValueError(f'A {self.num_of_cells_x}x{self.num_of_cells_y} maze has no room for {count} entities')
+
+        return [(index % self.num_of_cells_x, index // self.num_of_cells_x) for index in indices]
 
     def set_item_and_enemies_in_location(self, locations: list, items: list, enemies: list) -> None:
         """
@@ -135,6 +328,7 @@ class Maze:
         for enemy in enemies:
             enemy.position = locations[cnt]
             enemy.pos = locations[cnt]
+            self.place('enemy', self.cell_index(*locations[cnt]), enemy)
             cnt += 1
 
         for item in items:
@@ -143,8 +337,4 @@ class Maze:
             else:
                 item.position = locations[cnt]
                 cnt += 1
-
-        for line in self.maze:
-            for cell in line:
-                cell.set_item(list(items))
-                cell.set_enemy(list(enemies))
+            self.place('item', self.cell_index(*item.position), item)
@@ -0,0 +1,152 @@
+"""
+Level packs, many pre-generated mazes in one file
+
+A pack starts with a small header, followed by one .maze record (see src.assets.map.exporter) per level.
+The offsets of the records are stored in a table at the end of the file, so a pack can be written one maze
+at a time. Opening a pack memory maps the file and reads nothing but the trailer,
+and a level is decoded cell by cell when the game asks for it
+"""
+import argparse
+import mmap
+import random
+import struct
+from collections import namedtuple
+
+from src.assets.map.exporter import read_header, write_record
+from src.assets.map.generators import get_generator, pack_walls
+from src.assets.map.maze import Maze
+
+PACK_MAGIC = b'MZPK'
+PACK_VERSION = 1
+
+# magic, version, reserved
+PACK_HEADER = struct.Struct('<4sHH')
+# offset of the record table, number of levels, magic
+PACK_TRAILER = struct.Struct('<QI4s')
+
+# The attributes of a Maze that end up in a .maze record
+MazeRecord = namedtuple('MazeRecord', ['num_of_cells_x', 'num_of_cells_y', 'start_x', 'start_y', 'walls'])
+
+
+def write_pack(path: str, mazes) -> int:
+    """
+    Write a level pack
+    :param path: str, the file name of the pack
+    :param mazes: iterable of Maze or MazeRecord instances, the levels in order
+    :return: int, number of levels written
+    """
+    offsets = []
+    with open(path, 'wb') as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0))
+        position = PACK_HEADER.size
+        for maze in mazes:
+            offsets.append(position)
+            position += write_record(f, maze)
+
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        f.write(PACK_TRAILER.pack(position, len(offsets), PACK_MAGIC))
+
+    return len(offsets)
+
+
+def generate_pack(path: str, levels: int, num_of_cells_x: int, num_of_cells_y: int,
+                  algorithm: str = 'backtracker', rng=random) -> int:
+    """
+    Generate a level pack, only one maze is kept in memory at a time
+    :param path: str, the file name of the pack
+    :param levels: int, number of levels to generate
+    :param num_of_cells_x: int, number of cells in a row
+    :param num_of_cells_y: int, number of rows
+    :param algorithm: str, a generator from src.assets.map.generators.GENERATORS
+    :param rng: random.Random instance or the random module
+    :return: int, number of levels written
+    """
+    generate = get_generator(algorithm)
+    return write_pack(path, (MazeRecord(num_of_cells_x, num_of_cells_y, 0, 0,
+                                        pack_walls(generate(num_of_cells_x, num_of_cells_y, 0, rng)))
+                             for _ in range(levels)))
+
+
+class LevelPack:
+    """
+    Memory mapped level pack, levels are loaded as Mazes reading their walls straight from the map.
+    The walls of those mazes are views into the map, a maze loaded from the pack must not be used after the pack
+    is closed
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Views of the walls handed out, released when the pack is closed so the map can be unmapped
+        self.views = []
+
+        magic, version, _ = PACK_HEADER.unpack_from(self.map)
+        table_offset, levels, trailer_magic = PACK_TRAILER.unpack_from(self.map, len(self.map) - PACK_TRAILER.size)
+        if magic != PACK_MAGIC or trailer_magic != PACK_MAGIC:
+            self.map.close()
+            raise ValueError('Not a level pack')
+        if version > PACK_VERSION:
+            self.map.close()
+            raise ValueError(f'Unsupported level pack version {version}')
+
+        self.table_offset, self.levels = table_offset, levels
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the walls of every level loaded from the pack and unmap the file
+        :return: None
+        """
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.map.close()
+
+    def __len__(self) -> int:
+        return self.levels
+
+    def record(self, level: int) -> MazeRecord:
+        """
+        Read the header of a level, the walls are a view into the memory map
+        :param level: int, index of the level in the pack
+        :return: MazeRecord
+        """
+        if not 0 <= level < self.levels:
+            raise IndexError(f'Level {level} is not in the pack')
+
+        offset, = struct.unpack_from('<Q', self.map, self.table_offset + 8 * level)
+        header_size, num_of_cells_x, num_of_cells_y, start_x, start_y = read_header(self.map, offset)
+        start = offset + header_size
+        walls = memoryview(self.map)[start:start + (num_of_cells_x * num_of_cells_y + 1) // 2]
+        self.views.append(walls)
+        return MazeRecord(num_of_cells_x, num_of_cells_y, start_x, start_y, walls)
+
+    def load(self, level: int, items: list, enemies: list, rng=random) -> Maze:
+        """
+        Load a level as a Maze, with the items and enemies placed in it
+        :param level: int, index of the level in the pack
+        :param items: list, items for the maze
+        :param enemies: list, enemies for the maze
+        :param rng: random.Random instance or the random module, places the items and enemies
+        :return: Maze instance, its walls can be read until the pack is closed
+        """
+        record = self.record(level)
+        return Maze(record.num_of_cells_x, record.num_of_cells_y, items, enemies, record.start_x, record.start_y,
+                    walls=record.walls, rng=rng)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a pack of levels')
+    parser.add_argument('path')
+    parser.add_argument('levels', type=int)
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--algorithm', default='backtracker')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    generate_pack(args.path, args.levels, args.width, args.height, args.algorithm, random.Random(args.seed))
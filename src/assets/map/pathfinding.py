@@ -0,0 +1,135 @@
+"""
+Pathfinding over a Maze. Distance fields are flat int32 arrays with one entry per cell index,
+-1 for cells that can't be reached
+"""
+import heapq
+from array import array
+
+from src.assets.map.directions import DIRECTIONS, WALL_BITS
+from src.assets.map.generators import unpack_walls
+
+UNREACHABLE = -1
+
+
+def _moves(maze) -> list[tuple]:
+    """
+    The moves out of a cell as (direction, wall bit, index offset)
+    :param maze: Maze instance
+    :return: list[tuple]
+    """
+    return [(direction, WALL_BITS[direction], dy * maze.num_of_cells_x + dx)
+            for direction, (dx, dy) in DIRECTIONS.items()]
+
+
+def distance_field(maze, x: int, y: int) -> array:
+    """
+    Breadth-first search from one cell, one frontier at a time. Walls are unpacked once up front,
+    since the border walls are always up no bounds checks are needed
+    :param maze: Maze instance
+    :param x: int, x of the cell to measure from
+    :param y: int, y of the cell to measure from
+    :return: array of int32, the number of steps from the cell to every cell in the maze
+    """
+    walls = unpack_walls(maze.walls, maze.num_of_cells_x * maze.num_of_cells_y)
+    distances = array('i', [UNREACHABLE]) * len(walls)
+    moves = [(bit, offset) for _, bit, offset in _moves(maze)]
+
+    frontier = [maze.cell_index(x, y)]
+    distances[frontier[0]] = 0
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for cell in frontier:
+            cell_walls = walls[cell]
+            for bit, offset in moves:
+                if not cell_walls & bit and distances[cell + offset] == UNREACHABLE:
+                    distances[cell + offset] = distance
+                    next_frontier.append(cell + offset)
+        frontier = next_frontier
+
+    return distances
+
+
+def path_down_field(maze, distances: array, x: int, y: int) -> list[tuple]:
+    """
+    Follow a distance field downhill from a cell to the cell the field was measured from
+    :param maze: Maze instance
+    :param distances: array, distance field from distance_field
+    :param x: int, x of the cell to start from
+    :param y: int, y of the cell to start from
+    :return: list[tuple], the cells on the way, both ends included. Empty if the cell can't be reached
+    """
+    cell = maze.cell_index(x, y)
+    if distances[cell] == UNREACHABLE:
+        return []
+
+    moves = _moves(maze)
+    path = [(x, y)]
+    while distances[cell]:
+        cell_walls = maze.get_walls(cell)
+        for _, bit, offset in moves:
+            if not cell_walls & bit and distances[cell + offset] == distances[cell] - 1:
+                cell += offset
+                break
+        path.append((cell % maze.num_of_cells_x, cell // maze.num_of_cells_x))
+
+    return path
+
+
+def shortest_path(maze, start: tuple, goal: tuple) -> list[tuple]:
+    """
+    A* search between two cells, with the Manhattan distance as heuristic. Only the cells it visits are decoded
+    :param maze: Maze instance
+    :param start: tuple, (x, y) of the first cell
+    :param goal: tuple, (x, y) of the last cell
+    :return: list[tuple], the cells on the way, both ends included. Empty if there is no way
+    """
+    width = maze.num_of_cells_x
+    goal_x, goal_y = goal
+    goal_cell = maze.cell_index(*goal)
+    moves = _moves(maze)
+
+    start_cell = maze.cell_index(*start)
+    came_from = {start_cell: None}
+    steps = {start_cell: 0}
+    queue = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start_cell)]
+
+    while queue:
+        _, cell_steps, cell = heapq.heappop(queue)
+        if cell == goal_cell:
+            path = []
+            while cell is not None:
+                path.append((cell % width, cell // width))
+                cell = came_from[cell]
+            return path[::-1]
+        if cell_steps > steps[cell]:
+            continue
+
+        cell_walls = maze.get_walls(cell)
+        for _, bit, offset in moves:
+            neighbour = cell + offset
+            if not cell_walls & bit and cell_steps + 1 < steps.get(neighbour, cell_steps + 2):
+                steps[neighbour] = cell_steps + 1
+                came_from[neighbour] = cell
+                estimate = abs(neighbour % width - goal_x) + abs(neighbour // width - goal_y)
+                heapq.heappush(queue, (cell_steps + 1 + estimate, cell_steps + 1, neighbour))
+
+    return []
+
+
+def hint(maze, x: int, y: int):
+    """
+    The direction to go from a cell to get closer to the exit, based on the cached distance to exit field
+    :param maze: Maze instance
+    :param x: int, x of the cell
+    :param y: int, y of the cell
+    :return: str, the direction, or None at the exit
+    """
+    distances = maze.distance_to_exit
+    cell = maze.cell_index(x, y)
+    cell_walls = maze.get_walls(cell)
+    for direction, bit, offset in _moves(maze):
+        if not cell_walls & bit and distances[cell + offset] == distances[cell] - 1:
+            return direction
+    return None
@@ -0,0 +1,122 @@
+"""
+Spatial index of the entities in a maze, a uniform grid of square buckets over the cells.
+Distances are Manhattan distances on the grid, walls are not taken into account
+"""
+
+
+def _ring(center_x: int, center_y: int, ring: int):
+    """
+    The buckets on the square ring at a distance from a center bucket
+    :return: generator of tuple
+    """
+    if not ring:
+        yield center_x, center_y
+        return
+
+    for bx in range(center_x - ring, center_x + ring + 1):
+        yield bx, center_y - ring
+        yield bx, center_y + ring
+    for by in range(center_y - ring + 1, center_y + ring):
+        yield center_x - ring, by
+        yield center_x + ring, by
+
+
+class SpatialIndex:
+    def __init__(self, num_of_cells_x: int, num_of_cells_y: int, bucket_size: int = 8) -> None:
+        self.num_of_cells_x, self.num_of_cells_y = num_of_cells_x, num_of_cells_y
+        self.bucket_size = bucket_size
+        self.buckets_x = (num_of_cells_x + bucket_size - 1) // bucket_size
+        self.buckets_y = (num_of_cells_y + bucket_size - 1) // bucket_size
+        # kind -> bucket -> {cell index: entity}
+        self.kinds = {}
+
+    def bucket(self, index: int) -> tuple:
+        y, x = divmod(index, self.num_of_cells_x)
+        return x // self.bucket_size, y // self.bucket_size
+
+    def add(self, kind: str, index: int, entity) -> None:
+        """
+        Add an entity, replacing whatever entity of the same kind is already in the cell
+        :param kind: str, kind of entity, like 'item' or 'enemy'
+        :param index: int, cell index
+        :param entity: the entity
+        :return: None
+        """
+        self.kinds.setdefault(kind, {}).setdefault(self.bucket(index), {})[index] = entity
+
+    def remove(self, kind: str, index: int) -> None:
+        """
+        Remove the entity of a kind from a cell, if there is one
+        :param kind: str, kind of entity
+        :param index: int, cell index
+        :return: None
+        """
+        buckets = self.kinds.get(kind, {})
+        key = self.bucket(index)
+        if key in buckets:
+            buckets[key].pop(index, None)
+            if not buckets[key]:
+                del buckets[key]
+
+    def _entities_in_buckets(self, kind: str, keys):
+        buckets = self.kinds.get(kind, {})
+        for key in keys:
+            for index, entity in buckets.get(key, {}).items():
+                y, x = divmod(index, self.num_of_cells_x)
+                yield x, y, entity
+
+    def in_region(self, kind: str, x1: int, y1: int, x2: int, y2: int) -> list[tuple]:
+        """
+        All entities of a kind inside a rectangle of cells, corners included
+        :param kind: str, kind of entity
+        :param x1: int, west edge of the region
+        :param y1: int, north edge of the region
+        :param x2: int, east edge of the region
+        :param y2: int, south edge of the region
+        :return: list[tuple], (x, y, entity)
+        """
+        size = self.bucket_size
+        keys = ((bx, by) for bx in range(max(x1, 0) // size, min(x2, self.num_of_cells_x - 1) // size + 1)
+                for by in range(max(y1, 0) // size, min(y2, self.num_of_cells_y - 1) // size + 1))
+        return [(x, y, entity) for x, y, entity in self._entities_in_buckets(kind, keys)
+                if x1 <= x <= x2 and y1 <= y <= y2]
+
+    def within(self, kind: str, x: int, y: int, radius: int) -> list[tuple]:
+        """
+        All entities of a kind within a distance of a cell, closest first
+        :param kind: str, kind of entity
+        :param x: int, x of the cell
+        :param y: int, y of the cell
+        :param radius: int, the largest distance to include
+        :return: list[tuple], (distance, x, y, entity)
+        """
+        found = [(abs(ex - x) + abs(ey - y), ex, ey, entity)
+                 for ex, ey, entity in self.in_region(kind, x - radius, y - radius, x + radius, y + radius)]
+        return sorted((entry for entry in found if entry[0] <= radius), key=lambda entry: entry[0])
+
+    def nearest(self, kind: str, x: int, y: int, radius: int = None):
+        """
+        The closest entity of a kind. Buckets are searched in rings around the cell, until no bucket further out
+        can hold anything closer than what has been found
+        :param kind: str, kind of entity
+        :param x: int, x of the cell
+        :param y: int, y of the cell
+        :param radius: int, the largest distance to search, the whole maze if None
+        :return: tuple, (distance, x, y, entity), or None if nothing was found
+        """
+        size = self.bucket_size
+        center_x, center_y = x // size, y // size
+        best = None
+
+        for ring in range(max(self.buckets_x, self.buckets_y)):
+            # Every cell in this ring is at least this far away
+            closest_possible = (ring - 1) * size + 1 if ring else 0
+            if (best and best[0] <= closest_possible) or (radius is not None and closest_possible > radius):
+                break
+
+            for ex, ey, entity in self._entities_in_buckets(kind, _ring(center_x, center_y, ring)):
+                distance = abs(ex - x) + abs(ey - y)
+                if (radius is None or distance <= radius) and (not best or distance < best[0]):
+                    best = (distance, ex, ey, entity)
+
+        return best
@@ -0,0 +1,209 @@
+"""
+Streaming map export. Rows come straight from a row-by-row generator and are written to disk as soon as they are
+carved, so the whole maze never has to be in memory. Peak memory is O(width) however tall the maze is
+"""
+import argparse
+import gzip
+import random
+from abc import ABC, abstractmethod
+from array import array
+
+from src.assets.map.directions import WALL_BITS
+from src.assets.map.generators import get_generator
+
+# Size of the write buffer for the output file
+BUFFER_SIZE = 1 << 20
+
+COMPRESSED_EXTENSIONS = {
+    '.svg': '.svgz',
+    '.txt': '.txt.gz'
+}
+
+
+def open_map_file(out_file: str, extension: str, compress: bool = False):
+    """
+    Open a map file for writing text, gzip compressed if asked for
+    :param out_file: str, the file name for the output file, without extension
+    :param extension: str, the extension of the uncompressed format
+    :param compress: bool, write a gzip compressed file
+    :return: text file object
+    """
+    if compress:
+        return gzip.open(out_file + COMPRESSED_EXTENSIONS[extension], 'wt', compresslevel=6)
+    return open(out_file + extension, 'w', buffering=BUFFER_SIZE)
+
+
+def _coordinate(value: float) -> str:
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+class RowWriter(ABC):
+    """Base class for writers that get the maze one row at a time, from north to south"""
+    extension = ''
+
+    def __init__(self, file, num_of_cells_x: int, num_of_cells_y: int) -> None:
+        self.file = file
+        self.num_of_cells_x, self.num_of_cells_y = num_of_cells_x, num_of_cells_y
+        self.write_header()
+
+    def write_header(self) -> None:
+        pass
+
+    @abstractmethod
+    def write_row(self, y: int, row) -> None:
+        """
+        Write one row of the maze
+        :param y: int, the row number
+        :param row: bytes-like, the wall bits of every cell in the row, one byte per cell
+        :return: None
+        """
+
+    def finish(self) -> None:
+        """
+        Write whatever has to come after the last row, the file is left open
+        :return: None
+        """
+        pass
+
+
+class SvgRowWriter(RowWriter):
+    """
+    Write the maze as an SVG image. Without a cell size the image gets the same geometry as write_map,
+    500 pixels high with the width following the aspect ratio of the maze.
+    Walls are joined into long runs, horizontal runs within a row and vertical runs down a column,
+    and every row is written as one <path> element
+    """
+    extension = '.svg'
+    padding = 10
+
+    def __init__(self, file, num_of_cells_x: int, num_of_cells_y: int, cell_size: float = None) -> None:
+        if cell_size:
+            self.width, self.height = num_of_cells_x * cell_size, num_of_cells_y * cell_size
+        else:
+            self.height = 500
+            self.width = int(self.height * num_of_cells_x / num_of_cells_y)
+        self.scale_x, self.scale_y = self.width / num_of_cells_x, self.height / num_of_cells_y
+        # The row where the east wall of every column started, or -1 if the column has no open run
+        self.run_start = array('l', [-1]) * num_of_cells_x
+        super().__init__(file, num_of_cells_x, num_of_cells_y)
+
+    def write_header(self) -> None:
+        full_width, full_height = self.width + 2 * self.padding, self.height + 2 * self.padding
+        self.file.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg"\n'
+            '    xmlns:xlink="http://www.w3.org/1999/xlink"\n'
+            f'    width="{_coordinate(full_width)}" height="{_coordinate(full_height)}" '
+            f'viewBox="{-self.padding} {-self.padding} {_coordinate(full_width)} {_coordinate(full_height)}">\n'
+            '<defs>\n<style type="text/css"><![CDATA[\n'
+            'path {\n'
+            '    stroke: #000000;\n    stroke-linecap: square;\n'
+            '    stroke-width: 5;\n    fill: none;\n}\n'
+            ']]></style>\n</defs>\n'
+            # The North and West map border
+            f'<path d="M0 {_coordinate(self.height)}V0H{_coordinate(self.width)}"/>\n'
+        )
+
+    def vertical_run(self, x: int, y: int) -> str:
+        """
+        Close the run of east walls in a column
+        :param x: int, the column
+        :param y: int, the row below the last wall in the run
+        :return: str, path data for the run
+        """
+        start, self.run_start[x] = self.run_start[x], -1
+        return (f'M{_coordinate((x + 1) * self.scale_x)} {_coordinate(start * self.scale_y)}'
+                f'V{_coordinate(y * self.scale_y)}')
+
+    def write_row(self, y: int, row) -> None:
+        # Only the "South" and "East" walls are drawn, they are the "North" and "West" walls of the neighbouring cell
+        south, east = WALL_BITS['south'], WALL_BITS['east']
+        bottom = _coordinate((y + 1) * self.scale_y)
+        run_start = self.run_start
+        segments = []
+        south_start = -1
+
+        for x, walls in enumerate(row):
+            if walls & south:
+                if south_start < 0:
+                    south_start = x
+            elif south_start >= 0:
+                segments.append(f'M{_coordinate(south_start * self.scale_x)} {bottom}H{_coordinate(x * self.scale_x)}')
+                south_start = -1
+
+            if walls & east:
+                if run_start[x] < 0:
+                    run_start[x] = y
+            elif run_start[x] >= 0:
+                segments.append(self.vertical_run(x, y))
+
+        if south_start >= 0:
+            segments.append(f'M{_coordinate(south_start * self.scale_x)} {bottom}H{_coordinate(self.width)}')
+        if segments:
+            self.file.write(f'<path d="{"".join(segments)}"/>\n')
+
+    def finish(self) -> None:
+        segments = [self.vertical_run(x, self.num_of_cells_y)
+                    for x in range(self.num_of_cells_x) if self.run_start[x] >= 0]
+        if segments:
+            self.file.write(f'<path d="{"".join(segments)}"/>\n')
+        self.file.write('</svg>\n')
+
+
+class TextRowWriter(RowWriter):
+    """Write the maze as ASCII art, every cell is drawn as +---+ with | for the side walls"""
+    extension = '.txt'
+
+    def write_header(self) -> None:
+        self.file.write('+' + '---+' * self.num_of_cells_x + '\n')
+
+    def write_row(self, y: int, row) -> None:
+        south, east = WALL_BITS['south'], WALL_BITS['east']
+        self.file.write('|' + ''.join('   |' if walls & east else '    ' for walls in row) + '\n'
+                        '+' + ''.join('---+' if walls & south else '   +' for walls in row) + '\n')
+
+
+WRITERS = {
+    'svg': SvgRowWriter,
+    'txt': TextRowWriter
+}
+
+
+def stream_maze(num_of_cells_x: int, num_of_cells_y: int, out_file: str, algorithm: str = 'eller',
+                file_format: str = 'svg', rng=random, compress: bool = False, **writer_options) -> None:
+    """
+    Generate a maze one row at a time and write every row to disk as soon as it is carved
+    :param num_of_cells_x: int, number of cells in a row
+    :param num_of_cells_y: int, number of rows
+    :param out_file: str, the file name for the output file, without extension
+    :param algorithm: str, a row-by-row algorithm from src.assets.map.generators.ROW_GENERATORS
+    :param file_format: str, one of WRITERS
+    :param rng: random.Random instance or the random module
+    :param compress: bool, write a gzip compressed file
+    :return: None
+    """
+    rows = get_generator(algorithm, rows=True)
+    writer_class = WRITERS[file_format]
+
+    with open_map_file(out_file, writer_class.extension, compress) as f:
+        writer = writer_class(f, num_of_cells_x, num_of_cells_y, **writer_options)
+        for y, row in enumerate(rows(num_of_cells_x, num_of_cells_y, rng)):
+            writer.write_row(y, row)
+        writer.finish()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a maze straight to disk, one row at a time')
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('out_file', help='output file name, without extension')
+    parser.add_argument('--algorithm', default='eller')
+    parser.add_argument('--format', dest='file_format', choices=WRITERS, default='svg')
+    parser.add_argument('--cell-size', type=float, default=10, help='SVG pixels per cell')
+    parser.add_argument('--compress', action='store_true', help='write a gzip compressed file')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    options = {'cell_size': args.cell_size} if args.file_format == 'svg' else {}
+    stream_maze(args.width, args.height, args.out_file, args.algorithm, args.file_format, random.Random(args.seed),
+                args.compress, **options)
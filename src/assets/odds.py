@@ -0,0 +1,146 @@
+"""
+Exact battle odds, computed instead of sampled. The dice of a loadout are convolved into a distribution of
+attack and defend points per round, and the fight is solved as a Markov chain over
+(player health points, enemy health points), following the rules of battle_round and battle_over
+
+Defend points can leave the player with more health points than at the start of the fight, so the player health
+points are capped. The cap leaves room for the largest possible gain in every round it takes to bring the enemy
+down, only fights with long runs of rolls without a single sword get near it
+"""
+from collections import Counter
+from functools import lru_cache
+
+from src.assets.actor.player import Dice
+from src.assets.dice import FACE_ATTACK, FACE_DEFEND
+from src.assets.simulation import enemy_stats
+
+# Stop solving the rounds where the enemy isn't hurt when no probability moves more than this
+TOLERANCE = 1e-12
+MAX_ITERATIONS = 10_000
+
+
+class BattleOdds:
+    def __init__(self, win: float, loss: float, rounds: float) -> None:
+        self.win = win
+        self.loss = loss
+        self.rounds = rounds
+
+    def __repr__(self):
+        return f'win {self.win:.4%}, loss {self.loss:.4%}, {self.rounds:.3f} rounds'
+
+
+def loadout(dices) -> tuple:
+    """
+    The faces of a set of dice, in a form that can be cached
+    :param dices: list of Dice instances
+    :return: tuple
+    """
+    return tuple(dice.faces for dice in dices)
+
+
+@lru_cache(maxsize=256)
+def roll_distribution(dice_loadout: tuple, sword: bool = False, shield: bool = False) -> tuple:
+    """
+    The distribution of attack and defend points of one roll, with the sword and shield doubling from
+    set_battle_stats
+    :param dice_loadout: tuple, the faces of every dice, see loadout()
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :return: tuple, (attack points, defend points, probability) for every possible roll
+    """
+    distribution = {(0, 0): 1.0}
+    for faces in dice_loadout:
+        face_probabilities = [(face, count / len(faces)) for face, count in Counter(faces).items()]
+        rolled = Counter()
+        for (attack, defend), probability in distribution.items():
+            for face, face_probability in face_probabilities:
+                rolled[attack + FACE_ATTACK[face], defend + FACE_DEFEND[face]] += probability * face_probability
+        distribution = rolled
+
+    attack_multiplier, defend_multiplier = 2 if sword else 1, 2 if shield else 1
+    return tuple(sorted((attack * attack_multiplier, defend * defend_multiplier, probability)
+                        for (attack, defend), probability in distribution.items()))
+
+
+@lru_cache(maxsize=4096)
+def battle_odds(player_health_points: int, enemy_attack_points: int, enemy_health_points: int,
+                dice_loadout: tuple, sword: bool = False, shield: bool = False) -> BattleOdds:
+    """
+    Solve a fight exactly
+    :param player_health_points: int, player health points at the start of the fight
+    :param enemy_attack_points: int
+    :param enemy_health_points: int
+    :param dice_loadout: tuple, the faces of every dice, see loadout()
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :return: BattleOdds
+    """
+    rolls = roll_distribution(dice_loadout, sword, shield)
+    max_gain = max(max(defend for _, defend, _ in rolls) - enemy_attack_points, 0)
+    cap = player_health_points + max_gain * (enemy_health_points + 1)
+
+    # win[e][p], loss[e][p] and rounds[e][p] for enemy health points e and player health points p
+    win = [[1.0] * (cap + 1)]
+    loss = [[0.0] * (cap + 1)]
+    rounds = [[0.0] * (cap + 1)]
+
+    for enemy in range(1, enemy_health_points + 1):
+        finishing = sum(probability for attack, _, probability in rolls if attack >= enemy)
+        hurting = [(enemy - attack, defend - enemy_attack_points, probability)
+                   for attack, defend, probability in rolls if 0 < attack < enemy]
+        missing = [(defend - enemy_attack_points, probability) for attack, defend, probability in rolls if not attack]
+
+        # A player without health points loses, unless the enemy falls in the same round
+        enemy_win, enemy_loss, enemy_rounds = [finishing] * (cap + 1), [1 - finishing] * (cap + 1), [1.0] * (cap + 1)
+        for player in range(1, cap + 1):
+            w, l, r = finishing, 0.0, 1.0
+            for enemy_left, change, probability in hurting:
+                player_left = min(max(player + change, 0), cap)
+                w += probability * win[enemy_left][player_left]
+                l += probability * loss[enemy_left][player_left]
+                r += probability * rounds[enemy_left][player_left]
+            enemy_win[player], enemy_loss[player], enemy_rounds[player] = w, l, r
+
+        # Rounds where the enemy isn't hurt keep the enemy health points, solve them by iterating
+        if missing:
+            base_win, base_loss, base_rounds = enemy_win[:], enemy_loss[:], enemy_rounds[:]
+            for _ in range(MAX_ITERATIONS):
+                moved = 0.0
+                for player in range(1, cap + 1):
+                    w, l, r = base_win[player], base_loss[player], base_rounds[player]
+                    for change, probability in missing:
+                        player_left = min(max(player + change, 0), cap)
+                        w += probability * enemy_win[player_left]
+                        l += probability * enemy_loss[player_left]
+                        r += probability * enemy_rounds[player_left]
+                    moved = max(moved, abs(w - enemy_win[player]), abs(l - enemy_loss[player]))
+                    enemy_win[player], enemy_loss[player], enemy_rounds[player] = w, l, r
+                if moved < TOLERANCE:
+                    break
+            else:
+                enemy_rounds = [float('inf')] * (cap + 1)
+
+        win.append(enemy_win)
+        loss.append(enemy_loss)
+        rounds.append(enemy_rounds)
+
+    return BattleOdds(win[enemy_health_points][player_health_points],
+                      loss[enemy_health_points][player_health_points],
+                      rounds[enemy_health_points][player_health_points])
+
+
+def enemy_odds(enemy: dict, maze_level: int = 1, player_health_points: int = 20, dices: list = None,
+               sword: bool = False, shield: bool = False) -> BattleOdds:
+    """
+    Exact odds of a fight against an enemy from the enemies collection
+    :param enemy: dict, enemy document
+    :param maze_level: int, the difficulty of the maze, makes the enemy stronger
+    :param player_health_points: int, player health points at the start of the fight
+    :param dices: list of Dice instances, eight new dice if None
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :return: BattleOdds
+    """
+    enemy_attack_points, enemy_health_points = enemy_stats(enemy, maze_level)
+    dices = dices or [Dice() for _ in range(8)]
+    return battle_odds(player_health_points, enemy_attack_points, enemy_health_points, loadout(dices), sword, shield)
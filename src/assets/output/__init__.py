@@ -0,0 +1,120 @@
+"""
+Presentation layer for the game output. Game code calls say() and pause() and the current renderer decides what
+happens: printing with pauses for a player at the console, printing without pauses, or only collecting the output
+as structured events for simulations and tests.
+The current renderer is held in a context variable, so every thread or asyncio task can have its own
+"""
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import sleep
+
+# What the game said, kind tells what kind of message it is and data holds the numbers behind it
+Event = namedtuple('Event', ['kind', 'text', 'data'])
+
+
+class Renderer(ABC):
+    """Base class for the ways the game output can be presented"""
+    @abstractmethod
+    def say(self, text: str = '', kind: str = 'message', end: str = '\n', **data) -> None:
+        """
+        Present a message of the game
+        :param text: str, the message
+        :param kind: str, what kind of message it is, like 'message' or 'roll'
+        :param end: str, appended to the text, like print
+        :param data: the numbers behind the message
+        :return: None
+        """
+
+    def pause(self, seconds: float) -> None:
+        pass
+
+
+class InteractiveRenderer(Renderer):
+    """Print the output, pausing where the game wants the player to take it in"""
+    def __init__(self, pacing: float = 1.0, file=None) -> None:
+        self.pacing = pacing
+        self.file = file
+
+    def say(self, text: str = '', kind: str = 'message', end: str = '\n', **data) -> None:
+        print(text, end=end, file=self.file)
+
+    def pause(self, seconds: float) -> None:
+        if self.pacing > 0:
+            sleep(seconds * self.pacing)
+
+
+class FastRenderer(InteractiveRenderer):
+    """Print the output without any pauses"""
+    def __init__(self, file=None) -> None:
+        super().__init__(0, file)
+
+
+class StreamRenderer(Renderer):
+    """
+    Write the output to an asyncio stream, like a TCP or telnet connection. Never pauses, sleeping would hold up
+    every other game in the process
+    """
+    def __init__(self, writer) -> None:
+        self.writer = writer
+
+    def say(self, text: str = '', kind: str = 'message', end: str = '\n', **data) -> None:
+        self.writer.write(f'{text}{end}'.replace('\n', '\r\n').encode())
+
+
+class NullRenderer(Renderer):
+    """Print nothing, only collect the output as events"""
+    def __init__(self) -> None:
+        self.events = []
+
+    def say(self, text: str = '', kind: str = 'message', end: str = '\n', **data) -> None:
+        self.events.append(Event(kind, text, data))
+
+
+_renderer = ContextVar('renderer', default=InteractiveRenderer())
+
+
+def get_renderer() -> Renderer:
+    return _renderer.get()
+
+
+def set_renderer(renderer: Renderer):
+    """
+    Use a renderer in the current context
+    :param renderer: Renderer instance
+    :return: Token, to restore the previous renderer with reset_renderer
+    """
+    return _renderer.set(renderer)
+
+
+def reset_renderer(token) -> None:
+    _renderer.reset(token)
+
+
+@contextmanager
+def rendering(renderer: Renderer):
+    """
+    Use a renderer for the duration of a with block
+    :param renderer: Renderer instance
+    """
+    token = set_renderer(renderer)
+    try:
+        yield renderer
+    finally:
+        reset_renderer(token)
+
+
+def say(text: str = '', kind: str = 'message', end: str = '\n', **data) -> None:
+    """
+    Present a message with the current renderer
+    :param text: str, the message
+    :param kind: str, what kind of message it is, for renderers that keep events
+    :param end: str, appended to the text when it is printed
+    :return: None
+    """
+    _renderer.get().say(text, kind, end, **data)
+
+
+def pause(seconds: float) -> None:
+    _renderer.get().pause(seconds)
@@ -0,0 +1,101 @@
+"""
+Input side of the game. Game code awaits ask() for the next command and the current input stream decides where it
+comes from: the console for a single player, or a network connection when many games share one process.
+Like the renderer, the current input stream is held in a context variable, so every asyncio task has its own
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class InputStream(ABC):
+    """Base class for the places the player commands can come from"""
+    @abstractmethod
+    async def read(self, prompt: str) -> str:
+        """
+        Show a prompt and wait for the next line
+        :param prompt: str, the prompt
+        :return: str, the line without the line ending
+        :raise EOFError: when there is nothing more to read
+        """
+
+
+class ConsoleInput(InputStream):
+    """Read from the console. Blocks the event loop while waiting, only one game runs at the console"""
+    async def read(self, prompt: str) -> str:
+        return input(prompt)
+
+
+class StreamInput(InputStream):
+    """Read from an asyncio stream, like a TCP or telnet connection"""
+    def __init__(self, reader, writer, timeout: float = None) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+
+    async def read(self, prompt: str) -> str:
+        self.writer.write(prompt.replace('\n', '\r\n').encode())
+        await self.writer.drain()
+
+        if self.timeout:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        else:
+            line = await self.reader.readline()
+        if not line:
+            raise EOFError('connection closed')
+        return line.decode(errors='replace').rstrip('\r\n')
+
+
+class ScriptedInput(InputStream):
+    """Read from a list of commands, for tests and replays"""
+    def __init__(self, commands) -> None:
+        self.commands = iter(commands)
+
+    async def read(self, prompt: str) -> str:
+        try:
+            return next(self.commands)
+        except StopIteration:
+            raise EOFError('no more commands') from None
+
+
+_input = ContextVar('input', default=ConsoleInput())
+
+
+def get_input() -> InputStream:
+    return _input.get()
+
+
+def set_input(stream: InputStream):
+    """
+    Use an input stream in the current context
+    :param stream: InputStream instance
+    :return: Token, to restore the previous input stream with reset_input
+    """
+    return _input.set(stream)
+
+
+def reset_input(token) -> None:
+    _input.reset(token)
+
+
+@contextmanager
+def reading(stream: InputStream):
+    """
+    Use an input stream for the duration of a with block
+    :param stream: InputStream instance
+    """
+    token = set_input(stream)
+    try:
+        yield stream
+    finally:
+        reset_input(token)
+
+
+async def ask(prompt: str = '>> ') -> str:
+    """
+    Wait for the next command from the current input stream
+    :param prompt: str, shown before reading
+    :return: str, the command
+    """
+    return await _input.get().read(prompt)
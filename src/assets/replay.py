@@ -0,0 +1,210 @@
+"""
+Record and replay game sessions for load tests. A recording is the seed of the game's random number generator and
+every command the player typed, gzipped, one command per line after the seed. Replaying starts a game with the same
+seed and feeds the commands back through the game with no console output, timing how long every command takes
+
+Record at the console:      python -m src.assets.replay record session.replay --seed 42
+Replay, four at a time:     python -m src.assets.replay run *.replay --workers 4
+"""
+import argparse
+import asyncio
+import gzip
+from concurrent.futures import ProcessPoolExecutor
+from secrets import randbits
+from time import perf_counter, perf_counter_ns
+
+from src.assets.output import NullRenderer, rendering
+from src.assets.prompt import InputStream, get_input, reading
+from src.assets.rng import GameRandom
+
+# Latencies are counted in buckets of powers of two nanoseconds, bucket n holds latencies below 2 ** n ns
+HISTOGRAM_BUCKETS = 48
+
+
+class ReplayLog:
+    def __init__(self, seed, commands: list = None) -> None:
+        # Kept as a string, GameRandom(7) and GameRandom('7') give different games
+        self.seed = str(seed)
+        self.commands = commands if commands is not None else []
+
+    def save(self, path: str) -> None:
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write('\n'.join([self.seed, *self.commands]))
+
+    @classmethod
+    def load(cls, path: str):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            seed, *commands = f.read().split('\n')
+        return cls(seed, commands)
+
+
+class RecordingInput(InputStream):
+    """Pass the commands of another input stream on, keeping a copy of every one"""
+    def __init__(self, stream: InputStream, log: ReplayLog) -> None:
+        self.stream = stream
+        self.log = log
+
+    async def read(self, prompt: str) -> str:
+        command = await self.stream.read(prompt)
+        self.log.commands.append(command)
+        return command
+
+
+class ReplayStats:
+    """Throughput and latency of replayed commands"""
+    def __init__(self) -> None:
+        self.commands = 0
+        self.seconds = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def __repr__(self):
+        return (f'{self.commands} commands in {self.seconds:.2f} s, {self.commands_per_second:,.0f} commands/s, '
+                f'median {self.percentile(50) / 1000:.1f} us, 99th percentile {self.percentile(99) / 1000:.1f} us')
+
+    @property
+    def commands_per_second(self) -> float:
+        return self.commands / self.seconds if self.seconds else 0.0
+
+    def add(self, nanoseconds: int) -> None:
+        self.commands += 1
+        self.histogram[min(nanoseconds.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, percent: float) -> int:
+        """
+        The latency below which a percentage of the commands finished
+        :param percent: float, between 0 and 100
+        :return: int, nanoseconds, the upper bound of the histogram bucket
+        """
+        wanted, seen = self.commands * percent / 100, 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= wanted:
+                return 2 ** bucket
+        return 0
+
+    def merge(self, other):
+        self.commands += other.commands
+        self.seconds += other.seconds
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        return self
+
+
+class TimedInput(InputStream):
+    """Feed recorded commands, timing each one from when it is handed out until the game asks for the next one"""
+    def __init__(self, commands, stats: ReplayStats) -> None:
+        self.commands = iter(commands)
+        self.stats = stats
+        self.handed_out = None
+
+    def done(self) -> None:
+        if self.handed_out is not None:
+            self.stats.add(perf_counter_ns() - self.handed_out)
+            self.handed_out = None
+
+    async def read(self, prompt: str) -> str:
+        self.done()
+        try:
+            command = next(self.commands)
+        except StopIteration:
+            raise EOFError('end of the recording') from None
+        self.handed_out = perf_counter_ns()
+        return command
+
+
+def new_game(rng):
+    from src.assets.game import Game
+    return Game(rng=rng)
+
+
+async def record(seed, stream: InputStream = None, game_factory=new_game) -> ReplayLog:
+    """
+    Play a game, recording the commands
+    :param seed: int or str, seeds the random number generator of the game
+    :param stream: InputStream instance to read the commands from, the current input stream if None
+    :param game_factory: callable taking a GameRandom and returning an object with a play() coroutine,
+    a new Game by default
+    :return: ReplayLog
+    """
+    log = ReplayLog(seed)
+    with reading(RecordingInput(stream or get_input(), log)):
+        try:
+            await game_factory(GameRandom(log.seed)).play()
+        except EOFError:
+            pass
+    return log
+
+
+def replay(log: ReplayLog, game_factory=new_game) -> ReplayStats:
+    """
+    Play a recorded game again, without output
+    :param log: ReplayLog
+    :param game_factory: callable taking a GameRandom and returning an object with a play() coroutine,
+    a new Game by default
+    :return: ReplayStats
+    """
+    stats = ReplayStats()
+    stream = TimedInput(log.commands, stats)
+
+    start = perf_counter()
+    with rendering(NullRenderer()), reading(stream):
+        try:
+            asyncio.run(game_factory(GameRandom(log.seed)).play())
+        except EOFError:
+            pass
+        stream.done()
+    stats.seconds = perf_counter() - start
+    return stats
+
+
+def _replay_file(path: str, game_factory) -> ReplayStats:
+    return replay(ReplayLog.load(path), game_factory)
+
+
+def replay_files(paths: list, workers: int = None, game_factory=new_game) -> ReplayStats:
+    """
+    Replay many recordings, spread over processes
+    :param paths: list of str, recording files
+    :param workers: int, number of processes, 1 runs in this process, None uses every CPU
+    :param game_factory: callable taking a GameRandom and returning an object with a play() coroutine,
+    must be picklable to use processes
+    :return: ReplayStats, of all the recordings together. seconds adds up the time of every replay
+    """
+    stats = ReplayStats()
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            stats.merge(_replay_file(path, game_factory))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_stats in executor.map(_replay_file, paths, [game_factory] * len(paths)):
+                stats.merge(file_stats)
+    return stats
+
+
+def print_histogram(stats: ReplayStats) -> None:
+    for bucket, count in enumerate(stats.histogram):
+        if count:
+            print(f'< {2 ** bucket / 1000:>12,.1f} us  {count:>10}  {count / stats.commands:7.2%}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Record and replay game sessions')
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help='play at the console and record the session')
+    record_parser.add_argument('out_file')
+    record_parser.add_argument('--seed', default=str(randbits(32)))
+    run_parser = commands.add_parser('run', help='replay recorded sessions')
+    run_parser.add_argument('files', nargs='+')
+    run_parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from src.db import init_db
+    load_dotenv()
+    init_db()
+
+    if args.command == 'record':
+        asyncio.run(record(args.seed)).save(args.out_file)
+    else:
+        total = replay_files(args.files, args.workers)
+        print(total)
+        print_histogram(total)
@@ -0,0 +1,52 @@
+"""
+Random number generators for game sessions. Every Game owns a GameRandom and hands substreams of it to its levels,
+mazes and player, so nothing draws from the module-level random state: a seed replays the same game, and games
+sharing a process don't interfere with each other
+"""
+import random
+from secrets import randbits
+
+# Byte values below 128 are tails, the rest heads
+_COIN = bytes(value >> 7 for value in range(256))
+
+
+def coins(rng, n: int) -> bytes:
+    """
+    Flip n fair coins at once
+    :param rng: random.Random instance or the random module
+    :param n: int, number of coins
+    :return: bytes, 0 or 1 for every coin
+    """
+    return rng.randbytes(n).translate(_COIN)
+
+
+class GameRandom(random.Random):
+    def __init__(self, seed=None) -> None:
+        # The seed is kept to spawn substreams from, a random one is picked if there is none
+        self.initial_seed = seed if seed is not None else randbits(64)
+        super().__init__(self.initial_seed)
+
+    def __reduce__(self):
+        # Keep the seed when sent to another process, spawn needs it
+        return self.__class__, (self.initial_seed,), self.getstate()
+
+    def spawn(self, *key):
+        """
+        An independent generator for a part of the session, like a level or a simulation chunk.
+        It only depends on the seed and the key, not on how much has been drawn from this generator
+        :param key: the name of the substream, like ('level', 3)
+        :return: GameRandom
+        """
+        return GameRandom(':'.join(map(str, (self.initial_seed, *key))))
+
+    def coins(self, n: int) -> bytes:
+        return coins(self, n)
+
+    def integers(self, n: int, stop: int) -> list[int]:
+        """
+        Draw n integers in range(stop) at once
+        :param n: int, number of integers
+        :param stop: int, the integers are below this
+        :return: list[int]
+        """
+        return self.choices(range(stop), k=n)
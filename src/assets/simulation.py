@@ -0,0 +1,156 @@
+"""
+Headless battle simulation for balancing the enemies. Fights follow the same rules as battle_round and battle_over,
+without any input, printing or sleeping, and can be spread over many processes.
+The player only rolls the dice, no items are used during the fights
+
+Results only depend on the seed: the fights are split into fixed size chunks and every chunk gets its own
+random number generator seeded from the seed and the chunk number, whatever process it runs in
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from src.assets.actor.enemy import Enemy
+from src.assets.actor.player import Dice
+from src.assets.battle import WON, battle_result, strike
+from src.assets.dice import roll_battles
+from src.assets.rng import GameRandom
+
+# Fights per chunk of work, and per random number generator
+CHUNK_SIZE = 10_000
+
+# Dice rounds rolled at a time
+ROLL_BATCH = 256
+
+
+class BattleStats:
+    """Aggregated results of simulated fights against one enemy"""
+    def __init__(self) -> None:
+        self.fights = 0
+        self.wins = 0
+        self.rounds = 0
+        self.health_points_lost = 0
+        self.unfinished = 0
+
+    def __repr__(self):
+        return (f'{self.fights} fights, win rate {self.win_rate:.2%}, {self.mean_rounds:.2f} rounds, '
+                f'{self.mean_health_points_lost:.2f} health points lost per fight')
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.fights if self.fights else 0.0
+
+    @property
+    def mean_rounds(self) -> float:
+        return self.rounds / self.fights if self.fights else 0.0
+
+    @property
+    def mean_health_points_lost(self) -> float:
+        return self.health_points_lost / self.fights if self.fights else 0.0
+
+    def merge(self, other):
+        self.fights += other.fights
+        self.wins += other.wins
+        self.rounds += other.rounds
+        self.health_points_lost += other.health_points_lost
+        self.unfinished += other.unfinished
+        return self
+
+
+def enemy_stats(enemy: dict, maze_level: int) -> tuple:
+    """
+    The attack and health points of an enemy from the enemies collection at a maze level
+    :param enemy: dict, enemy document
+    :param maze_level: int, the difficulty of the maze
+    :return: tuple, (attack points, health points)
+    """
+    enemy = Enemy(maze_level, **dict(enemy))
+    return enemy.attack_points, enemy.health_points
+
+
+def fight(player_health_points: int, enemy_attack_points: int, enemy_health_points: int, rolls,
+          max_rounds: int = 1000) -> tuple:
+    """
+    Fight one battle to the end, one battle_round at a time
+    :param player_health_points: int
+    :param enemy_attack_points: int
+    :param enemy_health_points: int
+    :param rolls: iterator of (attack points, defend points), the dice roll for every round
+    :param max_rounds: int, give up after this many rounds
+    :return: tuple, (outcome, rounds, player health points left), outcome is None if the fight didn't end
+    """
+    for rounds in range(1, max_rounds + 1):
+        attack_points, defend_points = next(rolls)
+        enemy_health_points = strike(enemy_health_points, attack_points)
+        outcome = battle_result(player_health_points, enemy_health_points)
+        if outcome:
+            return outcome, rounds, player_health_points
+        player_health_points = strike(player_health_points + defend_points, enemy_attack_points)
+
+    return None, max_rounds, player_health_points
+
+
+def _rolls(dices, sword: bool, shield: bool, rng):
+    while True:
+        yield from roll_battles(dices, ROLL_BATCH, sword, shield, rng)
+
+
+def _simulate_chunk(seed, chunk: int, fights: int, player_health_points: int, enemy_attack_points: int,
+                    enemy_health_points: int, dices: list, sword: bool, shield: bool) -> BattleStats:
+    rng = GameRandom(seed).spawn(chunk)
+    rolls = _rolls(dices, sword, shield, rng)
+    stats = BattleStats()
+
+    for _ in range(fights):
+        outcome, rounds, health_points = fight(player_health_points, enemy_attack_points, enemy_health_points,
+                                               rolls)
+        stats.fights += 1
+        stats.rounds += rounds
+        stats.wins += outcome == WON
+        stats.unfinished += outcome is None
+        stats.health_points_lost += max(player_health_points - health_points, 0)
+
+    return stats
+
+
+def simulate(enemy: dict, maze_level: int = 1, fights: int = 100_000, seed=0, player_health_points: int = 20,
+             dices: list = None, sword: bool = False, shield: bool = False, workers: int = None) -> BattleStats:
+    """
+    Simulate many fights between the player and an enemy
+    :param enemy: dict, enemy document from the enemies collection
+    :param maze_level: int, the difficulty of the maze, makes the enemy stronger
+    :param fights: int, number of fights
+    :param seed: int or str, the same seed gives the same result
+    :param player_health_points: int, player health points at the start of every fight
+    :param dices: list of Dice instances, eight new dice if None
+    :param sword: bool, the player has a sword
+    :param shield: bool, the player has a shield
+    :param workers: int, number of processes, 1 runs in this process, None uses every CPU
+    :return: BattleStats
+    """
+    enemy_attack_points, enemy_health_points = enemy_stats(enemy, maze_level)
+    dices = dices or [Dice() for _ in range(8)]
+    chunks = [(seed, chunk, min(CHUNK_SIZE, fights - start), player_health_points, enemy_attack_points,
+               enemy_health_points, dices, sword, shield)
+              for chunk, start in enumerate(range(0, fights, CHUNK_SIZE))]
+
+    stats = BattleStats()
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            stats.merge(_simulate_chunk(*chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_stats in executor.map(_simulate_chunk, *zip(*chunks)):
+                stats.merge(chunk_stats)
+
+    return stats
+
+
+def simulate_levels(enemy: dict, maze_levels, fights: int = 100_000, seed=0, **options) -> dict:
+    """
+    Simulate fights against an enemy at several difficulties
+    :param enemy: dict, enemy document from the enemies collection
+    :param maze_levels: iterable of int, the difficulties
+    :param fights: int, number of fights per difficulty
+    :param seed: int or str, the same seed gives the same result
+    :return: dict, maze level -> BattleStats
+    """
+    return {level: simulate(enemy, level, fights, f'{seed}:{level}', **options) for level in maze_levels}
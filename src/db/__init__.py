@@ -1,11 +1,14 @@
+"""
+Database session. init_db only reads the configuration and picks the storage backend: MongoDB, an embedded SQLite
+file or memory, see src.db.backends. Connections are opened on the first query and collections are looked up when
+they are used, so importing the models never needs a connection.
+A forked worker drops the connections it inherited and opens its own on its first query
+"""
+import os
 from os import environ
-from pymongo import MongoClient
 
-client = None
-db = None
 
-
-def add_db_user(mongo_client: MongoClient, username: str, password: str, database: str) -> None:
+def add_db_user(mongo_client, username: str, password: str, database: str) -> None:
     mongo_client.DiceGameDatabase.command(
         'createUser', username,
         pwd=password,
@@ -18,13 +21,82 @@ def add_db_user(mongo_client: MongoClient, username: str, password: str, databas
     )
 
 
-def init_db():
+class DatabaseSession:
+    """The storage backend the models read from and write to, see src.db.backends"""
+    def __init__(self) -> None:
+        self.backend = None
+
+    def use(self, backend) -> None:
+        """
+        Switch to another backend, closing the current one
+        :param backend: Backend instance
+        :return: None
+        """
+        self.close()
+        self.backend = backend
+
+    def configure(self, uri: str, database: str, client_class=None, **options) -> None:
+        """
+        Use MongoDB. Nothing connects until the first query
+        :param uri: str, MongoDB connection string
+        :param database: str, database name
+        :param client_class: class with the MongoClient interface, like mongomock.MongoClient, MongoClient if None
+        :param options: keyword arguments for MongoClient, like maxPoolSize or serverSelectionTimeoutMS
+        :return: None
+        """
+        from src.db.backends.mongo import MongoBackend
+        self.use(MongoBackend(uri, database, client_class, **options))
+
+    def collection(self, name: str):
+        if self.backend is None:
+            raise RuntimeError('The database is not configured, call init_db first')
+        return self.backend.collection(name)
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+
+    def after_fork(self) -> None:
+        if self.backend is not None:
+            self.backend.after_fork()
+
+
+session = DatabaseSession()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=session.after_fork)
+
+
+class LazyCollection:
+    """Class attribute resolving to a collection of the current session when it's accessed"""
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner):
+        return session.collection(self.name)
+
+
+def _int_setting(name: str, default):
+    value = environ.get(name)
+    return int(value) if value else default
+
+
+def init_db(**options):
     """
     Set environment variables for the database in .env file in the project root
-    folder.
+    folder. DB_BACKEND picks the storage: mongo (the default), sqlite, with the file in DB_PATH, or memory.
+    MongoDB pool size and timeouts can be set with DB_MAX_POOL_SIZE, DB_MIN_POOL_SIZE, DB_CONNECT_TIMEOUT_MS and
+    DB_SERVER_SELECTION_TIMEOUT_MS, or passed as MongoClient keyword arguments
     :return: None
     """
-    global client, db
+    from src.db.backends import get_backend
+
+    match environ.get('DB_BACKEND', 'mongo'):
+        case 'sqlite':
+            session.use(get_backend('sqlite', path=environ.get('DB_PATH', 'maze.db')))
+            return
+        case 'memory':
+            session.use(get_backend('memory'))
+            return
 
     database = environ.get('DB_NAME')
     username = environ.get('DB_USER')
@@ -32,5 +104,11 @@ def init_db():
     host = environ.get('DB_HOST')
     port = environ.get('DB_PORT')
 
-    client = MongoClient(f'mongodb://{username}:{password}@{host}:{port}')
-    db = client[database]
+    settings = {
+        'maxPoolSize': _int_setting('DB_MAX_POOL_SIZE', 100),
+        'minPoolSize': _int_setting('DB_MIN_POOL_SIZE', 0),
+        'connectTimeoutMS': _int_setting('DB_CONNECT_TIMEOUT_MS', 5000),
+        'serverSelectionTimeoutMS': _int_setting('DB_SERVER_SELECTION_TIMEOUT_MS', 5000),
+    }
+    settings.update(options)
+    session.configure(f'mongodb://{username}:{password}@{host}:{port}', database, **settings)
@@ -0,0 +1,125 @@
+"""
+Storage backends for the database session. Every backend hands out collections with the part of the pymongo
+Collection interface the models use: find, insert_one, replace_one, update_one, delete_many and create_index.
+The embedded backends only support queries on equal fields, like find({'type': 'key item'}), which is all the
+game asks for
+
+    mongo   MongoDB through pymongo, see src.db.backends.mongo
+    sqlite  an embedded SQLite file, type and label are indexed columns, see src.db.backends.sqlite
+    memory  plain dicts in the process, for simulations and tests, see src.db.backends.memory
+"""
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+InsertOneResult = namedtuple('InsertOneResult', ['inserted_id'])
+UpdateResult = namedtuple('UpdateResult', ['matched_count', 'modified_count', 'upserted_id'])
+DeleteResult = namedtuple('DeleteResult', ['deleted_count'])
+
+
+class EmbeddedCollection(ABC):
+    """
+    Base class for the collections of the embedded backends. They have no round-trips to save, so Document.bulk_save
+    hands them every document at once through their bulk_save, instead of batching pymongo bulk_write requests
+    """
+    @abstractmethod
+    def bulk_save(self, items: list, key: str = None):
+        """
+        Save many documents, see Document.bulk_save
+        :param items: list of dicts, documents with an _id, or a key, replace the stored document
+        :param key: str, upsert by this field
+        :return: BulkSaved
+        """
+
+
+class Backend(ABC):
+    """Base class for the places documents can be stored"""
+    @abstractmethod
+    def collection(self, name: str):
+        """
+        :param name: str, name of the collection
+        :return: collection with the part of the pymongo Collection interface the models use
+        """
+
+    def close(self) -> None:
+        pass
+
+    def after_fork(self) -> None:
+        """Called in a forked child, before it uses the backend"""
+        pass
+
+
+def matches(document: dict, query: dict) -> bool:
+    return all(document.get(field) == value for field, value in query.items())
+
+
+def project(document: dict, projection) -> dict:
+    """
+    Copy the fields of a document a projection asks for, the way MongoDB does
+    :param document: dict
+    :param projection: list of fields to include, dict of fields to include or exclude, or None for every field
+    :return: dict
+    """
+    if projection is None:
+        return dict(document)
+    if not isinstance(projection, dict):
+        projection = dict.fromkeys(projection, True)
+
+    included = {field for field, include in projection.items() if include and field != '_id'}
+    if included:
+        fields = included | ({'_id'} if projection.get('_id', True) else set())
+        return {field: value for field, value in document.items() if field in fields}
+    return {field: value for field, value in document.items() if projection.get(field, True)}
+
+
+def apply_update(document: dict, update: dict) -> dict:
+    """
+    Apply the $set and $unset operators of an update to a copy of a document
+    :param document: dict
+    :param update: dict, like {'$unset': {'bonus': ''}}
+    :return: dict
+    """
+    updated = dict(document)
+    updated.update(update.get('$set', {}))
+    for field in update.get('$unset', {}):
+        updated.pop(field, None)
+    return updated
+
+
+def copy_collections(source: Backend, target: Backend, names=('enemies', 'items')) -> int:
+    """
+    Copy collections from one backend to another, replacing what the target had, like the catalogs from MongoDB
+    into an SQLite file for a local game
+    :param source: Backend to read from
+    :param target: Backend to write to, an embedded one
+    :param names: iterable of str, the collections to copy
+    :return: int, number of documents copied
+    """
+    copied = 0
+    for name in names:
+        documents = list(source.collection(name).find({}, {'_id': False}))
+        collection = target.collection(name)
+        collection.delete_many({})
+        collection.bulk_save(documents)
+        copied += len(documents)
+    return copied
+
+
+def get_backend(name: str, **options) -> Backend:
+    """
+    Create a backend by name
+    :param name: str, 'mongo', 'sqlite' or 'memory'
+    :param options: keyword arguments for the backend
+    :return: Backend
+    """
+    match name:
+        case 'mongo':
+            from src.db.backends.mongo import MongoBackend
+            return MongoBackend(**options)
+        case 'sqlite':
+            from src.db.backends.sqlite import SqliteBackend
+            return SqliteBackend(**options)
+        case 'memory':
+            from src.db.backends.memory import MemoryBackend
+            return MemoryBackend()
+        case _:
+            raise ValueError(f'Unknown storage backend: {name}')
@@ -0,0 +1,87 @@
+from itertools import count
+
+from src.db.backends import (Backend, DeleteResult, EmbeddedCollection, InsertOneResult, UpdateResult, apply_update,
+                             matches, project)
+from src.db.model import BulkSaved
+
+
+class MemoryCollection(EmbeddedCollection):
+    """Documents in a dict by _id, queries scan the whole collection"""
+    def __init__(self) -> None:
+        self.documents = {}
+        self.ids = count(1)
+
+    def find(self, query: dict = None, projection=None, batch_size: int = 0):
+        query = query or {}
+        if '_id' in query:
+            candidates = [self.documents[query['_id']]] if query['_id'] in self.documents else []
+        else:
+            candidates = list(self.documents.values())
+        return (project(document, projection) for document in candidates if matches(document, query))
+
+    def find_one(self, query: dict = None, projection=None):
+        return next(self.find(query, projection), None)
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        if '_id' not in document:
+            document['_id'] = next(self.ids)
+        self.documents[document['_id']] = dict(document)
+        return InsertOneResult(document['_id'])
+
+    def replace_one(self, query: dict, replacement: dict, upsert: bool = False) -> UpdateResult:
+        found = self.find_one(query, ['_id'])
+        if found is None:
+            if not upsert:
+                return UpdateResult(0, 0, None)
+            return UpdateResult(0, 0, self.insert_one({**query, **replacement}).inserted_id)
+
+        self.documents[found['_id']] = {**replacement, '_id': found['_id']}
+        return UpdateResult(1, 1, None)
+
+    def update_one(self, query: dict, update: dict) -> UpdateResult:
+        found = self.find_one(query, ['_id'])
+        if found is None:
+            return UpdateResult(0, 0, None)
+        self.documents[found['_id']] = apply_update(self.documents[found['_id']], update)
+        return UpdateResult(1, 1, None)
+
+    def delete_many(self, query: dict) -> DeleteResult:
+        deleted = [document['_id'] for document in self.find(query, ['_id'])]
+        for _id in deleted:
+            del self.documents[_id]
+        return DeleteResult(len(deleted))
+
+    def create_index(self, field: str) -> None:
+        pass
+
+    def bulk_save(self, items: list, key: str = None) -> BulkSaved:
+        """
+        Save many documents, see Document.bulk_save. There are no round-trips to save, so no batches either
+        :param items: list of dicts, documents with an _id, or a key, replace the stored document
+        :param key: str, upsert by this field
+        :return: BulkSaved
+        """
+        inserted = matched = upserted = 0
+        for document in items:
+            if key is not None:
+                result = self.replace_one({key: document[key]}, document, upsert=True)
+            elif '_id' in document:
+                result = self.replace_one({'_id': document['_id']}, document)
+            else:
+                self.insert_one(document)
+                inserted += 1
+                continue
+            matched += result.matched_count
+            upserted += result.upserted_id is not None
+        return BulkSaved(inserted, matched, matched, upserted)
+
+
+class MemoryBackend(Backend):
+    """Every collection lives in this process only, for simulations and tests"""
+    def __init__(self) -> None:
+        self.collections = {}
+
+    def collection(self, name: str) -> MemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection()
+        return self.collections[name]
@@ -0,0 +1,68 @@
+import os
+
+from src.db.backends import Backend
+
+
+def create_indexes(database) -> None:
+    """
+    Index type, for the catalog queries by type, and label, for lookups and upserts by label.
+    Creating an index that already exists does nothing
+    :param database: Database instance
+    :return: None
+    """
+    for collection in (database.enemies, database.items):
+        collection.create_index('type')
+        collection.create_index('label')
+    # Saves are upserted by name, concurrent upserts must not create a second document with the same name
+    database.savedgames.create_index('name', unique=True)
+
+
+class MongoBackend(Backend):
+    """
+    MongoDB through pymongo. The client is created on the first query, and created again in a forked worker
+    """
+    def __init__(self, uri: str, database: str, client_class=None, **options) -> None:
+        """
+        :param uri: str, MongoDB connection string
+        :param database: str, database name
+        :param client_class: class with the MongoClient interface, like mongomock.MongoClient, MongoClient if None
+        :param options: keyword arguments for MongoClient, like maxPoolSize or serverSelectionTimeoutMS
+        """
+        self.uri = uri
+        self.database = database
+        self.client_class = client_class
+        self.options = options
+        self._client = None
+        self._pid = None
+        self._indexed = False
+
+    @property
+    def client(self):
+        if self._client is None or self._pid != os.getpid():
+            if self.client_class is None:
+                from pymongo import MongoClient
+                self.client_class = MongoClient
+
+            self._client = self.client_class(self.uri, **self.options)
+            self._pid = os.getpid()
+        return self._client
+
+    @property
+    def db(self):
+        db = self.client[self.database]
+        if not self._indexed:
+            create_indexes(db)
+            self._indexed = True
+        return db
+
+    def collection(self, name: str):
+        return self.db[name]
+
+    def close(self) -> None:
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
+        self._client = None
+
+    def after_fork(self) -> None:
+        # Sockets of the parent's pool must not be used in the child, leave the old client alone
+        self._client = None
@@ -0,0 +1,184 @@
+"""
+Embedded SQLite storage. Every collection is a table of JSON documents, with the type and label of the documents
+copied into indexed columns, so the catalog queries are answered by an index instead of a scan
+
+Copy the catalogs from the MongoDB in .env into a file: python -m src.db.backends.sqlite maze.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from threading import RLock
+
+from src.db.backends import (Backend, DeleteResult, EmbeddedCollection, InsertOneResult, UpdateResult, apply_update,
+                             copy_collections, matches, project)
+from src.db.model import BulkSaved
+
+# Fields with a column and an index of their own, queries on other fields are filtered after decoding
+INDEXED_FIELDS = ('_id', 'type', 'label')
+
+
+class SqliteCollection(EmbeddedCollection):
+    def __init__(self, backend, name: str) -> None:
+        self.backend = backend
+        self.table = '"' + name.replace('"', '""') + '"'
+        with self.transaction():
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {self.table} '
+                                    f'(_id INTEGER PRIMARY KEY, type TEXT, label TEXT, body TEXT NOT NULL)')
+            for field in INDEXED_FIELDS[1:]:
+                self.create_index(field)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self.backend.connection
+
+    @contextmanager
+    def transaction(self):
+        # The connection is shared with the WriteQueue threads, a commit or rollback must only cover its own writes
+        with self.backend.lock, self.connection:
+            yield
+
+    @staticmethod
+    def _row(document: dict) -> tuple:
+        body = {field: value for field, value in document.items() if field != '_id'}
+        return document.get('type'), document.get('label'), json.dumps(body)
+
+    def _select(self, query: dict, batch_size: int):
+        indexed = [field for field in INDEXED_FIELDS if field in query]
+        where = ' AND '.join(f'{field} = ?' for field in indexed) or '1'
+        cursor = self.connection.execute(f'SELECT _id, body FROM {self.table} WHERE {where}',
+                                         [query[field] for field in indexed])
+        rest = {field: value for field, value in query.items() if field not in INDEXED_FIELDS}
+        while rows := cursor.fetchmany(batch_size or 1000):
+            for _id, body in rows:
+                document = {'_id': _id, **json.loads(body)}
+                if matches(document, rest):
+                    yield document
+
+    def find(self, query: dict = None, projection=None, batch_size: int = 0):
+        return (project(document, projection) for document in self._select(query or {}, batch_size))
+
+    def find_one(self, query: dict = None, projection=None):
+        return next(self.find(query, projection), None)
+
+    def _insert(self, document: dict):
+        cursor = self.connection.execute(f'INSERT INTO {self.table} (_id, type, label, body) VALUES (?, ?, ?, ?)',
+                                         (document.get('_id'), *self._row(document)))
+        document['_id'] = cursor.lastrowid
+        return cursor.lastrowid
+
+    def _replace(self, _id: int, document: dict) -> None:
+        self.connection.execute(f'UPDATE {self.table} SET type = ?, label = ?, body = ? WHERE _id = ?',
+                                (*self._row(document), _id))
+
+    def insert_one(self, document: dict) -> InsertOneResult:
+        with self.transaction():
+            return InsertOneResult(self._insert(document))
+
+    def _replace_one(self, query: dict, replacement: dict, upsert: bool) -> UpdateResult:
+        found = self.find_one(query, ['_id'])
+        if found is None:
+            if not upsert:
+                return UpdateResult(0, 0, None)
+            return UpdateResult(0, 0, self._insert({**query, **replacement}))
+
+        self._replace(found['_id'], replacement)
+        return UpdateResult(1, 1, None)
+
+    def replace_one(self, query: dict, replacement: dict, upsert: bool = False) -> UpdateResult:
+        with self.transaction():
+            return self._replace_one(query, replacement, upsert)
+
+    def update_one(self, query: dict, update: dict) -> UpdateResult:
+        with self.transaction():
+            found = self.find_one(query)
+            if found is None:
+                return UpdateResult(0, 0, None)
+            self._replace(found['_id'], apply_update(found, update))
+            return UpdateResult(1, 1, None)
+
+    def delete_many(self, query: dict) -> DeleteResult:
+        with self.transaction():
+            deleted = [(document['_id'],) for document in self.find(query, ['_id'])]
+            self.connection.executemany(f'DELETE FROM {self.table} WHERE _id = ?', deleted)
+            return DeleteResult(len(deleted))
+
+    def create_index(self, field: str) -> None:
+        # Only the fields with a column of their own can be indexed
+        if field in INDEXED_FIELDS[1:]:
+            index = '"' + f'{self.table[1:-1]}_{field}'.replace('"', '""') + '"'
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {self.table} ({field})')
+
+    def bulk_save(self, items: list, key: str = None) -> BulkSaved:
+        """
+        Save many documents in one transaction, see Document.bulk_save
+        :param items: list of dicts, documents with an _id, or a key, replace the stored document
+        :param key: str, upsert by this field
+        :return: BulkSaved
+        """
+        inserted = matched = upserted = 0
+        with self.transaction():
+            for document in items:
+                if key is not None:
+                    result = self._replace_one({key: document[key]}, document, upsert=True)
+                elif '_id' in document:
+                    result = self._replace_one({'_id': document['_id']}, document, upsert=False)
+                else:
+                    self._insert(document)
+                    inserted += 1
+                    continue
+                matched += result.matched_count
+                upserted += result.upserted_id is not None
+        return BulkSaved(inserted, matched, matched, upserted)
+
+
+class SqliteBackend(Backend):
+    """Collections in an SQLite file, ':memory:' keeps them in the process"""
+    def __init__(self, path: str = 'maze.db') -> None:
+        self.path = path
+        self.collections = {}
+        self._connection = None
+        self._pid = None
+        # Held for every transaction, the threads of a process share one connection
+        self.lock = RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections can't be shared with a forked child, every process opens its own
+        with self.lock:
+            if self._connection is None or self._pid != os.getpid():
+                self._connection = sqlite3.connect(self.path, check_same_thread=False)
+                self._pid = os.getpid()
+            return self._connection
+
+    def collection(self, name: str) -> SqliteCollection:
+        if name not in self.collections:
+            self.collections[name] = SqliteCollection(self, name)
+        return self.collections[name]
+
+    def close(self) -> None:
+        with self.lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def after_fork(self) -> None:
+        # The lock may have been held by another thread of the parent when it forked
+        self.lock = RLock()
+        self._connection = None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Copy the catalogs from MongoDB into an SQLite file')
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from src.db import init_db, session
+    load_dotenv()
+    init_db()
+
+    target = SqliteBackend(args.path)
+    print(f'Copied {copy_collections(session.backend, target)} documents to {args.path}')
+    target.close()
@@ -1,33 +1,51 @@
 import src.db.repository as repo
+from src.db.controller.catalog import Catalog
+
+
+# The enemies and items rarely change, they are read from the cached catalogs. Lookups by type are queried by type
+# until the whole collection is needed
+ENEMIES = Catalog(repo.get_enemy_catalog, repo.get_enemies_of_type)
+ITEMS = Catalog(repo.get_item_catalog, repo.get_items_of_type)
+
+
+def invalidate_catalogs() -> None:
+    ENEMIES.invalidate()
+    ITEMS.invalidate()
+
+
+def watch_catalogs() -> None:
+    """
+    Invalidate the catalogs as soon as their collections change, instead of waiting for them to expire.
+    Change streams need MongoDB to run as a replica set
+    :return: None
+    """
+    ENEMIES.follow(repo.watch_enemies())
+    ITEMS.follow(repo.watch_items())
 
 
 def get_enemy(**kwargs):
+    if kwargs.keys() == {'label'}:
+        return ENEMIES.by_label(kwargs['label'])
     return repo.get_enemy(**kwargs).__dict__
 
 
 def get_all_enemies():
-    enemies = [enemy.__dict__ for enemy in repo.get_all_enemies()]
-    for enemy in enemies:
-        del enemy['_id']
-
-    return enemies
+    return ENEMIES.all()
 
 
 def get_all_enemies_from_type(t: str):
-    return [enemy for enemy in get_all_enemies() if enemy['type'] == t]
+    return ENEMIES.of_type(t)
 
 
 def get_item(**kwargs):
+    if kwargs.keys() == {'label'}:
+        return ITEMS.by_label(kwargs['label'])
     return repo.get_item(**kwargs).__dict__
 
 
 def get_all_items():
-    items = [item.__dict__ for item in repo.get_all_items()]
-    for item in items:
-        del item['_id']
-
-    return items
+    return ITEMS.all()
 
 
 def get_all_items_from_type(t: str):
-    return [item for item in get_all_items() if item['type'] == t]
+    return ITEMS.of_type(t)
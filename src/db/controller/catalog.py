@@ -0,0 +1,101 @@
+"""
+In-process cache of the read-mostly collections, the enemy and item catalogs. A catalog loads its collection once,
+indexes it by type and by label, and loads it again once it's older than its time to live or has been invalidated,
+by hand or by a change stream. A catalog with a query per type answers lookups by type with a query filtered on
+the server, cached per type, until something needs the whole collection. The cached documents are shared by every caller, they must not be modified
+"""
+from threading import Lock, Thread
+from time import monotonic
+
+# Seconds before a catalog is loaded again
+DEFAULT_TTL = 300.0
+
+
+class Catalog:
+    def __init__(self, load, load_type=None, ttl: float = DEFAULT_TTL, clock=monotonic) -> None:
+        """
+        :param load: callable returning a list of dicts, the whole collection
+        :param load_type: callable taking a type and returning a list of dicts, the documents of that type.
+        If None, lookups by type load the whole collection
+        :param ttl: float, seconds before the catalog is loaded again, None keeps it until it's invalidated
+        :param clock: callable returning the time in seconds
+        """
+        self.load = load
+        self.load_type = load_type
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = Lock()
+        self.loaded_at = None
+        self.entries = []
+        self.types = {}
+        self.labels = {}
+        # Documents of a type queried on their own, type -> (time loaded, list of dicts)
+        self.type_loads = {}
+
+    def _expired(self, loaded_at) -> bool:
+        return loaded_at is None or (self.ttl is not None and self.clock() - loaded_at >= self.ttl)
+
+    def stale(self) -> bool:
+        return self._expired(self.loaded_at)
+
+    def refresh(self) -> None:
+        """
+        Load the collection again and rebuild the indexes
+        :return: None
+        """
+        entries = self.load()
+        types, labels = {}, {}
+        for entry in entries:
+            types.setdefault(entry.get('type'), []).append(entry)
+            labels.setdefault(entry.get('label'), entry)
+
+        with self.lock:
+            self.entries, self.types, self.labels = entries, types, labels
+            self.loaded_at = self.clock()
+
+    def invalidate(self) -> None:
+        """
+        Load the collection again on the next lookup, after it has been written to
+        :return: None
+        """
+        with self.lock:
+            self.loaded_at = None
+            self.type_loads = {}
+
+    def follow(self, changes) -> Thread:
+        """
+        Invalidate the catalog on every change of a change stream, in a background thread
+        :param changes: iterable of change events, like the change stream from collection.watch()
+        :return: Thread
+        """
+        def invalidate_on_change():
+            for _ in changes:
+                self.invalidate()
+
+        thread = Thread(target=invalidate_on_change, daemon=True)
+        thread.start()
+        return thread
+
+    def _ensure_loaded(self) -> None:
+        if self.stale():
+            self.refresh()
+
+    def all(self) -> list[dict]:
+        self._ensure_loaded()
+        return self.entries
+
+    def of_type(self, t: str) -> list[dict]:
+        if self.load_type is None or not self.stale():
+            self._ensure_loaded()
+            return self.types.get(t, [])
+
+        loaded_at, entries = self.type_loads.get(t, (None, None))
+        if self._expired(loaded_at):
+            entries = self.load_type(t)
+            with self.lock:
+                self.type_loads[t] = (self.clock(), entries)
+        return entries
+
+    def by_label(self, label: str):
+        self._ensure_loaded()
+        return self.labels.get(label)
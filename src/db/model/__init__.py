@@ -1,4 +1,13 @@
 from abc import ABC
+from collections import namedtuple
+
+from src.db.backends import EmbeddedCollection
+
+# Documents fetched or written per round-trip
+DEFAULT_BATCH_SIZE = 1000
+
+# Counts of a bulk_save, summed over its batches
+BulkSaved = namedtuple('BulkSaved', ['inserted', 'matched', 'modified', 'upserted'])
 
 
 class Result(list):
@@ -33,16 +42,84 @@ class Document(dict, ABC):
 
     @classmethod
     def insert_many(cls, items):
+        return cls.bulk_save(items)
+
+    @classmethod
+    def bulk_save(cls, items, key: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> BulkSaved:
+        """
+        Save many documents with one bulk_write per batch. Batches are unordered, so the server can apply them
+        in any order and a failing document doesn't stop the rest of the batch
+        :param items: iterable of Document instances or dicts
+        :param key: str, upsert by this field, like 'label', replacing the document with the same value.
+        If None, documents with an _id replace the stored document and the others are inserted, like save()
+        :param batch_size: int, documents per round-trip
+        :return: BulkSaved
+        """
+        collection = cls.collection
+        # Not hasattr(collection, 'bulk_save'), a pymongo Collection answers every attribute with a sub-collection
+        if isinstance(collection, EmbeddedCollection):
+            documents = [item.__dict__ if isinstance(item, Document) else dict(item) for item in items]
+            for data in documents:
+                if not data.get('_id'):
+                    data.pop('_id', None)
+            return collection.bulk_save(documents, key)
+
+        from pymongo import InsertOne, ReplaceOne
+
+        saved = BulkSaved(0, 0, 0, 0)
+        batch = []
         for item in items:
-            cls(item).save()
+            data = item.__dict__ if isinstance(item, Document) else dict(item)
+            if not data.get('_id'):
+                data.pop('_id', None)
+
+            if key is not None:
+                batch.append(ReplaceOne({key: data[key]}, data, upsert=True))
+            elif '_id' in data:
+                batch.append(ReplaceOne({'_id': data['_id']}, data))
+            else:
+                batch.append(InsertOne(data))
+
+            if len(batch) >= batch_size:
+                saved = cls._bulk_write(batch, saved)
+                batch = []
+
+        return cls._bulk_write(batch, saved) if batch else saved
+
+    @classmethod
+    def _bulk_write(cls, batch: list, saved: BulkSaved) -> BulkSaved:
+        result = cls.collection.bulk_write(batch, ordered=False)
+        return BulkSaved(saved.inserted + result.inserted_count, saved.matched + result.matched_count,
+                         saved.modified + result.modified_count, saved.upserted + result.upserted_count)
 
     @classmethod
-    def all(cls):
-        return [cls(item) for item in cls.collection.find({})]
+    def all(cls, projection=None):
+        return Result(cls.iterate({}, projection))
 
     @classmethod
     def find(cls, **kwargs):
-        return Result(cls(item) for item in cls.collection.find(kwargs))
+        # Every keyword is a field of the query, use iterate or raw for a projection
+        return Result(cls.iterate(kwargs))
+
+    @classmethod
+    def iterate(cls, query: dict = None, projection=None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Iterate over the matching documents, fetched from the server in batches
+        :param query: dict, filter for the query, evaluated by the server
+        :param projection: list or dict, the fields to fetch, every field if None
+        :param batch_size: int, documents per round-trip
+        :return: generator of Document instances
+        """
+        for item in cls.raw(query, projection, batch_size):
+            yield cls(item)
+
+    @classmethod
+    def raw(cls, query: dict = None, projection=None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Like iterate, but the documents come as plain dicts, without building a Document for each
+        :return: Cursor of dict
+        """
+        return cls.collection.find(query or {}, projection, batch_size=batch_size)
 
     @classmethod
     def delete(cls, **kwargs):
@@ -1,23 +1,23 @@
-from src.db import db
+from src.db import LazyCollection
 from src.db.model import Document
 
 
 class EnemyCollection(Document):
-    collection = db.enemies
+    collection = LazyCollection('enemies')
 
 
 class ItemCollection(Document):
-    collection = db.items
+    collection = LazyCollection('items')
 
 
 class SavedGame(Document):
-    collection = db.savedgames
+    collection = LazyCollection('savedgames')
 
 
 class HighScore(Document):
-    collection = db.highscores
+    collection = LazyCollection('highscores')
 
 
 class Weapon(Document):
-    collection = db.weapons
+    collection = LazyCollection('weapons')
 
@@ -0,0 +1,110 @@
+"""
+Write-behind queue for write-heavy collections like the high scores and saved games. The game hands documents to
+the queue and moves on, a background thread saves them with Document.bulk_save once a batch is full or the oldest
+document has waited long enough
+"""
+from queue import Empty, Queue
+from threading import Thread
+from time import monotonic
+
+from src.db.model import DEFAULT_BATCH_SIZE, Document
+
+# Markers in the queue, write the batch now, and write it and stop
+_FLUSH, _CLOSE = object(), object()
+
+
+class WriteQueue:
+    def __init__(self, document_class, key: str = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = 1.0) -> None:
+        """
+        :param document_class: Document subclass to save with
+        :param key: str, upsert by this field, see Document.bulk_save
+        :param batch_size: int, documents per bulk write
+        :param flush_interval: float, seconds a document may wait for its batch to fill up
+        """
+        self.document_class = document_class
+        self.key = key
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = Queue()
+        # The error of the last failed write, raised by the next flush or close. The documents of a failed batch are
+        # not retried
+        self.error = None
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, document) -> None:
+        """
+        Queue a document to be saved, returns without waiting for the database
+        :param document: Document instance or dict
+        :return: None
+        """
+        self.queue.put(document)
+
+    def flush(self) -> None:
+        """
+        Write the queued documents now, and wait until they have been written. Raises the error of a write that
+        failed since the last flush or close
+        :return: None
+        """
+        self.queue.put(_FLUSH)
+        self.queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """
+        Write what's left in the queue and stop the background thread. Raises the error of a write that failed since
+        the last flush or close
+        :return: None
+        """
+        self.queue.put(_CLOSE)
+        self.thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def _write(self, batch: list) -> None:
+        documents = batch
+        if self.key is not None:
+            # Only the latest document per key is written. The bulk writes are unordered, an older upsert of the
+            # same key in the batch could otherwise be applied last
+            latest = {}
+            for document in batch:
+                data = document.__dict__ if isinstance(document, Document) else document
+                latest[data[self.key]] = document
+            documents = list(latest.values())
+        try:
+            self.document_class.bulk_save(documents, key=self.key, batch_size=self.batch_size)
+        except Exception as error:
+            self.error = error
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+    def _run(self) -> None:
+        batch, deadline = [], None
+        while True:
+            timeout = None if deadline is None else max(deadline - monotonic(), 0)
+            try:
+                document = self.queue.get(timeout=timeout)
+            except Empty:
+                document = None
+
+            if document is _FLUSH or document is _CLOSE:
+                if batch:
+                    self._write(batch)
+                    batch, deadline = [], None
+                self.queue.task_done()
+                if document is _CLOSE:
+                    return
+                continue
+
+            if document is not None:
+                batch.append(document)
+                deadline = deadline or monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.batch_size or monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
@@ -13,10 +13,27 @@ def get_all_enemies() -> list[dict]:
     return EnemyCollection.all()
 
 
+def get_enemies_of_type(t: str, projection=None) -> list[dict]:
+    """
+    :param t: str, the type, filtered by the server with the type index
+    :param projection: list or dict, the fields to fetch, every field but _id if None
+    :return: list[dict]
+    """
+    return list(EnemyCollection.raw({'type': t}, projection or {'_id': False}))
+
+
+def get_enemy_catalog() -> list[dict]:
+    return list(EnemyCollection.raw(projection={'_id': False}))
+
+
 def update_enemy(enemy) -> None:
     EnemyCollection.save(enemy)
 
 
+def watch_enemies():
+    return EnemyCollection.collection.watch()
+
+
 def add_item(item) -> None:
     ItemCollection(item).save()
 
@@ -29,5 +46,22 @@ def get_all_items() -> list[dict]:
     return ItemCollection.all()
 
 
+def get_items_of_type(t: str, projection=None) -> list[dict]:
+    """
+    :param t: str, the type, filtered by the server with the type index
+    :param projection: list or dict, the fields to fetch, every field but _id if None
+    :return: list[dict]
+    """
+    return list(ItemCollection.raw({'type': t}, projection or {'_id': False}))
+
+
+def get_item_catalog() -> list[dict]:
+    return list(ItemCollection.raw(projection={'_id': False}))
+
+
 def update_item(item) -> None:
     ItemCollection.save(item)
+
+
+def watch_items():
+    return ItemCollection.collection.watch()
@@ -1,10 +1,34 @@
+import argparse
+
 from src.db import init_db
 from dotenv import load_dotenv
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='A-Maze-Ing Dice Game')
+    parser.add_argument('--pacing', type=float, default=1.0,
+                        help='scale the pauses in the battles, 0 turns them off')
+    parser.add_argument('--seed', default=None,
+                        help='seed of the random number generator, the same seed plays the same game')
+    parser.add_argument('--save', default=None,
+                        help='save the game under this name after every command, and carry on from that save')
+    args = parser.parse_args()
+
     load_dotenv()
     init_db()
 
+    from src.assets.output import InteractiveRenderer, set_renderer
+    set_renderer(InteractiveRenderer(args.pacing))
+
     from src.assets.game import Game
-    Game().run()
+    from src.assets.rng import GameRandom
+    if args.save is None:
+        Game(rng=GameRandom(args.seed)).run()
+    else:
+        from src.assets.game.snapshot import Autosave
+        autosave = Autosave(args.save)
+        game = autosave.load() or Game(rng=GameRandom(args.seed), autosave=autosave)
+        try:
+            game.run()
+        finally:
+            autosave.close()
@@ -0,0 +1,62 @@
+"""
+Host many games in one process over TCP, every connection plays its own game. Connect with telnet or netcat:
+
+    python -m src.server --port 2323
+    telnet localhost 2323
+"""
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+from src.db import init_db
+
+
+async def play_session(reader, writer, timeout: float = None) -> None:
+    """
+    Play one game over a connection. Every connection is handled in its own asyncio task, the renderer and
+    input stream set here only apply to that task
+    :param reader: asyncio.StreamReader
+    :param writer: asyncio.StreamWriter
+    :param timeout: float, seconds to wait for a command before dropping the connection, None waits forever
+    :return: None
+    """
+    from src.assets.game import Game
+    from src.assets.output import StreamRenderer, set_renderer
+    from src.assets.prompt import StreamInput, set_input
+
+    set_renderer(StreamRenderer(writer))
+    set_input(StreamInput(reader, writer, timeout))
+    try:
+        await Game().play()
+        await writer.drain()
+    except (EOFError, ConnectionError, asyncio.TimeoutError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 2323, timeout: float = None) -> None:
+    """
+    Accept connections until cancelled
+    :param host: str, address to listen on
+    :param port: int, port to listen on
+    :param timeout: float, seconds a player may stay idle, None for no limit
+    :return: None
+    """
+    server = await asyncio.start_server(lambda reader, writer: play_session(reader, writer, timeout), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='A-Maze-Ing Dice Game server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2323)
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='seconds a player may stay idle before the connection is dropped')
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_db()
+    asyncio.run(serve(args.host, args.port, args.timeout))
@@ -0,0 +1,149 @@
+import importlib.util
+import threading
+import unittest
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+from src.db import session
+from src.db.backends import Backend
+from src.db.backends.memory import MemoryBackend
+from src.db.backends.sqlite import SqliteBackend
+from src.db.model.collections import ItemCollection
+
+ITEMS = [{'label': 'potion', 'type': 'usable item', 'actions': ['get', 'drop']},
+         {'label': 'lantern', 'type': 'usable item', 'actions': ['get']},
+         {'label': 'door', 'type': 'key item', 'actions': ['open'], 'bonus': 'a way out'}]
+
+
+class BackendTests(ABC):
+    @abstractmethod
+    def make_backend(self):
+        pass
+
+    def setUp(self):
+        session.use(self.make_backend())
+        ItemCollection.bulk_save(ITEMS)
+
+    def tearDown(self):
+        session.close()
+        session.backend = None
+
+    def test_find_by_type_with_projection(self):
+        found = ItemCollection.raw({'type': 'usable item'}, {'_id': False, 'label': True})
+        self.assertEqual(list(found), [{'label': 'potion'}, {'label': 'lantern'}])
+        self.assertEqual(ItemCollection.find(label='door', actions=['open']).first_or_none().bonus, 'a way out')
+
+    def test_find_by_a_field_named_projection(self):
+        ItemCollection.bulk_save([{'label': 'map', 'type': 'usable item', 'projection': 'mercator'}])
+        self.assertEqual([item.label for item in ItemCollection.find(projection='mercator')], ['map'])
+
+    def test_save_and_update(self):
+        door = ItemCollection.find(label='door').first_or_none()
+        door.description = 'a heavy door'
+        door.save()
+        door.delete_field('bonus')
+
+        stored = ItemCollection.find(label='door').first_or_none()
+        self.assertEqual(stored.description, 'a heavy door')
+        self.assertFalse(hasattr(stored, 'bonus'))
+        self.assertEqual(len(ItemCollection.all()), 3)
+
+    def test_upsert_by_label(self):
+        saved = ItemCollection.bulk_save([{'label': 'potion', 'type': 'usable item', 'actions': []},
+                                          {'label': 'key', 'type': 'key item', 'actions': ['get']}], key='label')
+        self.assertEqual((saved.matched, saved.upserted), (1, 1))
+        self.assertEqual(ItemCollection.find(label='potion').first_or_none().actions, [])
+        self.assertEqual(len(ItemCollection.find(type='key item')), 2)
+
+        ItemCollection.delete(type='key item')
+        self.assertEqual([item.label for item in ItemCollection.all()], ['potion', 'lantern'])
+
+
+class TestMemoryBackend(BackendTests, unittest.TestCase):
+    def make_backend(self):
+        return MemoryBackend()
+
+
+class TestSqliteBackend(BackendTests, unittest.TestCase):
+    def make_backend(self):
+        return SqliteBackend(':memory:')
+
+    def test_type_queries_use_the_index(self):
+        plan = session.backend.connection.execute('EXPLAIN QUERY PLAN SELECT _id, body FROM "items" WHERE type = ?',
+                                                  ['key item']).fetchall()
+        self.assertIn('USING INDEX', ' '.join(str(row) for row in plan))
+
+    def test_transactions_from_many_threads(self):
+        collection = session.backend.collection('items')
+
+        def insert(thread):
+            for i in range(100):
+                collection.insert_one({'label': f'item {thread} {i}', 'type': 'usable item'})
+
+        def fail():
+            # The document that can't be stored rolls back this batch only, not the inserts of the other threads
+            for _ in range(20):
+                with self.assertRaises(TypeError):
+                    collection.bulk_save([{'label': 'b'}, {'label': 'c', 'bonus': object()}])
+
+        threads = [threading.Thread(target=insert, args=(thread,)) for thread in range(4)]
+        threads.append(threading.Thread(target=fail))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(list(collection.find({'type': 'usable item'}))), 2 + 400)
+        self.assertIsNone(collection.find_one({'label': 'b'}))
+
+
+BulkWriteResult = namedtuple('BulkWriteResult', ['inserted_count', 'matched_count', 'modified_count',
+                                                 'upserted_count'])
+
+
+class MongoLikeCollection:
+    """Answers any attribute with a sub-collection that can't be called, like a pymongo Collection"""
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.requests = []
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return MongoLikeCollection(f'{self.name}.{name}')
+
+    def __call__(self, *args, **kwargs):
+        raise TypeError(f"'Collection' object is not callable. If you meant to call the '{self.name}' method on a "
+                        f"'Collection' object it is failing because no such method exists.")
+
+    def bulk_write(self, requests, ordered=True):
+        self.requests.append((list(requests), ordered))
+        inserted = sum(type(request).__name__ == 'InsertOne' for request in requests)
+        return BulkWriteResult(inserted, len(requests) - inserted, len(requests) - inserted, 0)
+
+
+class MongoLikeBackend(Backend):
+    def __init__(self) -> None:
+        self.items = MongoLikeCollection('items')
+
+    def collection(self, name: str):
+        return self.items
+
+
+@unittest.skipUnless(importlib.util.find_spec('pymongo'), 'pymongo is not installed')
+class TestMongoBulkSave(unittest.TestCase):
+    def setUp(self):
+        session.use(MongoLikeBackend())
+
+    def tearDown(self):
+        session.backend = None
+
+    def test_batches_go_through_bulk_write(self):
+        saved = ItemCollection.bulk_save(ITEMS + [{'_id': 7, 'label': 'sword'}], batch_size=3)
+        batches = session.backend.items.requests
+        self.assertEqual([(len(requests), ordered) for requests, ordered in batches], [(3, False), (1, False)])
+        self.assertEqual((saved.inserted, saved.matched), (3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
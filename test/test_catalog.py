@@ -0,0 +1,80 @@
+import unittest
+
+from src.db.controller.catalog import Catalog
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.loads = 0
+        self.clock = Clock()
+        self.catalog = Catalog(self.load, ttl=60, clock=self.clock)
+
+    def load(self):
+        self.loads += 1
+        return [{'label': 'sword', 'type': 'key item'},
+                {'label': 'potion', 'type': 'usable item'},
+                {'label': 'pill', 'type': 'usable item'}]
+
+    def test_indexes(self):
+        self.assertEqual([item['label'] for item in self.catalog.of_type('usable item')], ['potion', 'pill'])
+        self.assertEqual(self.catalog.by_label('sword')['type'], 'key item')
+        self.assertIsNone(self.catalog.by_label('lantern'))
+        self.assertEqual(self.catalog.of_type('door'), [])
+        self.assertEqual(len(self.catalog.all()), 3)
+        self.assertEqual(self.loads, 1)
+
+    def test_ttl_and_invalidation(self):
+        self.catalog.all()
+        self.clock.now = 59
+        self.catalog.all()
+        self.assertEqual(self.loads, 1)
+
+        self.clock.now = 60
+        self.catalog.all()
+        self.assertEqual(self.loads, 2)
+
+        self.catalog.invalidate()
+        self.catalog.all()
+        self.assertEqual(self.loads, 3)
+
+    def test_queries_by_type(self):
+        queries = []
+
+        def load_type(t):
+            queries.append(t)
+            return [item for item in self.load() if item['type'] == t]
+
+        catalog = Catalog(self.load, load_type, ttl=60, clock=self.clock)
+        self.assertEqual([item['label'] for item in catalog.of_type('usable item')], ['potion', 'pill'])
+        catalog.of_type('usable item')
+        self.assertEqual(queries, ['usable item'])
+
+        self.clock.now = 60
+        catalog.of_type('usable item')
+        self.assertEqual(queries, ['usable item', 'usable item'])
+
+        # Once the whole collection is loaded, types are looked up in it
+        catalog.by_label('sword')
+        self.assertEqual(catalog.of_type('key item')[0]['label'], 'sword')
+        self.assertEqual(queries, ['usable item', 'usable item'])
+
+        catalog.invalidate()
+        catalog.of_type('key item')
+        self.assertEqual(queries[-1], 'key item')
+
+    def test_follow_change_stream(self):
+        self.catalog.all()
+        self.catalog.follow(iter([{'operationType': 'update'}])).join()
+        self.assertTrue(self.catalog.stale())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from src.assets.actor.player import Player
+from src.assets.battle import battle
+from src.assets.commands import CommandTable, tokenize
+from src.assets.output import NullRenderer, rendering
+from src.assets.prompt import ScriptedInput, reading
+
+
+class Enemy:
+    def __init__(self) -> None:
+        self.name = 'skeleton'
+        self.attack_points = 3
+        self.health_points = 10
+
+
+class Location:
+    def __init__(self) -> None:
+        self.enemy = Enemy()
+
+
+class TestCommandTable(unittest.TestCase):
+    def setUp(self):
+        self.table = CommandTable()
+        calls = self.calls = []
+
+        @self.table.command('run', 'run away', 'escape')
+        async def run():
+            calls.append('run')
+
+        @self.table.command('run', 'run to', arguments=1)
+        async def run_to(place):
+            calls.append(f'run to {place}')
+
+        @self.table.fallback
+        async def unknown(command):
+            calls.append(f'unknown {command}')
+
+    def dispatch(self, *commands):
+        for command in commands:
+            asyncio.run(self.table.dispatch(command))
+        return self.calls
+
+    def test_aliases(self):
+        self.assertEqual(self.dispatch('run', 'Run  Away', 'ESCAPE'), ['run'] * 3)
+
+    def test_arguments(self):
+        self.assertEqual(self.dispatch('run to exit', 'run north', 'run a b', 'dance'),
+                         ['run to exit', 'run to north', 'unknown run a b', 'unknown dance'])
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('  Go   NORTH '), ('go', 'north'))
+
+
+class TestBattleCommands(unittest.TestCase):
+    def test_escape(self):
+        player, location = Player(), Location()
+        player.position = (1, 1)
+
+        with rendering(NullRenderer()) as renderer, reading(ScriptedInput(['dance', 'run away'])):
+            asyncio.run(battle(location, 'east', player))
+
+        self.assertEqual(player.position, (0, 1))
+        self.assertEqual([event.text for event in renderer.events],
+                         ['I don\'t understand!', 'You escaped back west'])
+
+
+if __name__ == '__main__':
+    unittest.main()
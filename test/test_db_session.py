@@ -0,0 +1,35 @@
+import os
+import unittest
+
+from src.db import DatabaseSession
+from src.db.backends.memory import MemoryBackend
+from src.db.backends.mongo import MongoBackend
+
+
+class TestDatabaseSession(unittest.TestCase):
+    def test_import_without_connection(self):
+        from src.db.model.collections import EnemyCollection
+        self.assertTrue(hasattr(EnemyCollection, 'find'))
+
+    def test_unconfigured(self):
+        with self.assertRaises(RuntimeError):
+            DatabaseSession().collection('enemies')
+
+    def test_use_backend(self):
+        session = DatabaseSession()
+        session.use(MemoryBackend())
+        self.assertIs(session.collection('enemies'), session.collection('enemies'))
+
+    def test_forked_worker_drops_client(self):
+        session = DatabaseSession()
+        session.configure('mongodb://localhost:27017', 'game', maxPoolSize=4)
+        self.assertEqual(session.backend.options, {'maxPoolSize': 4})
+
+        session.backend._client, session.backend._pid = object(), os.getpid()
+        session.after_fork()
+        self.assertIsNone(session.backend._client)
+        self.assertIsInstance(session.backend, MongoBackend)
+
+
+if __name__ == '__main__':
+    unittest.main()
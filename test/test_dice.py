@@ -0,0 +1,31 @@
+import random
+import unittest
+
+from src.assets.actor.player import Dice
+from src.assets.dice import DOUBLE_SHIELD, DOUBLE_SWORD, SHIELD, SWORD, battle_points, roll_battles, roll_faces
+
+
+class TestDice(unittest.TestCase):
+    def test_battle_points(self):
+        faces = [SWORD, DOUBLE_SWORD, SHIELD, DOUBLE_SHIELD, DOUBLE_SWORD]
+        self.assertEqual(battle_points(faces), (5, 3))
+        self.assertEqual(battle_points(faces, sword=True), (10, 3))
+        self.assertEqual(battle_points(faces, shield=True), (5, 6))
+
+    def test_roll_battles_with_sword(self):
+        dices = [Dice() for _ in range(8)]
+        rounds = roll_battles(dices, 1000, sword=True, rng=random.Random(4))
+
+        self.assertEqual(len(rounds), 1000)
+        for attack, defend in rounds:
+            self.assertEqual(attack % 2, 0)
+            self.assertLessEqual(attack + 2 * defend, 2 * 2 * 8)
+
+    def test_mixed_dice(self):
+        dices = [Dice((SWORD,)), Dice((DOUBLE_SHIELD,))]
+        self.assertEqual(roll_faces(dices), [SWORD, DOUBLE_SHIELD])
+        self.assertEqual(roll_battles(dices, 3), [(1, 2)] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from src.assets import high_score
+from src.assets.high_score import CollectionScores, HighScoreBoard, ScoreIndex, ScoreLog
+from src.db import session
+from src.db.backends.memory import MemoryBackend
+
+
+class TestScoreIndex(unittest.TestCase):
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(1)
+        index, expected = ScoreIndex(), []
+        for entry in range(5000):
+            key = (-rng.randrange(100), entry)
+            index.add(key)
+            expected.append(key)
+        for key in rng.sample(expected, 2000):
+            index.remove(key)
+            expected.remove(key)
+        expected.sort()
+
+        self.assertEqual(len(index), len(expected))
+        self.assertEqual(list(index), expected)
+        for position in rng.sample(range(len(expected)), 100):
+            self.assertEqual(index[position], expected[position])
+            self.assertEqual(index.position(expected[position]), position)
+        self.assertEqual(index[-1], expected[-1])
+
+
+class TestHighScoreBoard(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'high_score.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ranks_and_reload(self):
+        board = HighScoreBoard(ScoreLog(self.path))
+        self.assertEqual(board.update_high_score('ann', 30), 1)
+        self.assertEqual(board.update_high_score('bob', 50), 1)
+        self.assertEqual(board.update_high_score('cid', 30), 3)
+        self.assertEqual(board.rank(40), 2)
+        board.close()
+
+        loaded = HighScoreBoard(ScoreLog(self.path))
+        loaded.load_high_score()
+        self.assertEqual(loaded.top(), [('bob', 50), ('ann', 30), ('cid', 30)])
+        self.assertEqual(loaded.top(1, start=1), [('ann', 30)])
+
+    def test_capacity_and_compaction(self):
+        board = HighScoreBoard(ScoreLog(self.path), capacity=3)
+        for score in range(10):
+            board.update_high_score(f'player {score}', score)
+        self.assertIsNone(board.update_high_score('late', 0))
+        self.assertEqual(board.top(), [('player 9', 9), ('player 8', 8), ('player 7', 7)])
+        board.close()
+
+        self.assertEqual(list(ScoreLog(self.path).load()), [('player 9', 9), ('player 8', 8), ('player 7', 7)])
+
+    def test_truncated_log(self):
+        log = ScoreLog(self.path)
+        log.append('ann', 10)
+        log.append('bob', 20)
+        log.close()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 1)
+
+        self.assertEqual(list(ScoreLog(self.path).load()), [('ann', 10)])
+
+    def test_compacts_while_playing(self):
+        original = high_score.COMPACT_AFTER
+        high_score.COMPACT_AFTER = 5
+        try:
+            board = HighScoreBoard(ScoreLog(self.path), capacity=2)
+            for score in range(20):
+                board.update_high_score('player', score)
+            board.store.flush()
+            self.assertLess(len(list(ScoreLog(self.path).load())), 10)
+            board.close()
+        finally:
+            high_score.COMPACT_AFTER = original
+
+
+class TestCollectionScores(unittest.TestCase):
+    def setUp(self):
+        session.use(MemoryBackend())
+
+    def tearDown(self):
+        session.close()
+        session.backend = None
+
+    def test_scores_in_the_collection(self):
+        board = HighScoreBoard(CollectionScores(flush_interval=60), capacity=2)
+        for name, score in (('ann', 10), ('bob', 30), ('cid', 20)):
+            board.update_high_score(name, score)
+        board.close()
+
+        loaded = HighScoreBoard(CollectionScores())
+        loaded.load_high_score()
+        self.assertEqual(loaded.top(), [('bob', 30), ('cid', 20)])
+        loaded.close()
+
+    def test_ties_keep_their_order(self):
+        board = HighScoreBoard(CollectionScores(flush_interval=60))
+        for name in ('ann', 'bob', 'cid', 'dan'):
+            board.update_high_score(name, 10)
+        board.close()
+
+        # Documents come back from the collection in any order
+        documents = list(session.backend.collection('highscores').documents.items())
+        session.backend.collection('highscores').documents = dict(reversed(documents))
+
+        loaded = HighScoreBoard(CollectionScores())
+        loaded.load_high_score()
+        self.assertEqual([name for name, _ in loaded.top()], ['ann', 'bob', 'cid', 'dan'])
+        loaded.close()
+
+    def test_interrupted_compaction(self):
+        store = CollectionScores(flush_interval=60)
+        board = HighScoreBoard(store, capacity=2)
+        for name, score in (('ann', 10), ('bob', 30), ('cid', 20)):
+            board.update_high_score(name, score)
+        with mock.patch.object(store.collection, 'delete', side_effect=ConnectionError('no server')):
+            with self.assertRaises(ConnectionError):
+                board.compact()
+        store.close()
+
+        # The compacted generation was written before the old one was to be deleted
+        loaded = HighScoreBoard(CollectionScores())
+        loaded.load_high_score()
+        self.assertEqual(loaded.top(), [('bob', 30), ('cid', 20)])
+        loaded.update_high_score('dan', 25)
+        loaded.compact()
+        self.assertEqual(sorted(document['name'] for document in session.backend.collection('highscores').find()),
+                         ['bob', 'cid', 'dan'])
+        loaded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
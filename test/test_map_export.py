@@ -0,0 +1,141 @@
+import gzip
+import os
+import random
+import re
+import tempfile
+import unittest
+
+from src.assets.map.exporter import MazeFile, PNG_SIGNATURE, write_binary, write_png
+from src.assets.map.maze import Maze
+from src.assets.map.pack import LevelPack, generate_pack, write_pack
+from src.assets.map.stream import stream_maze
+
+
+class TestStreamMaze(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out_file = os.path.join(self.directory.name, 'maze')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_text_rows(self):
+        stream_maze(6, 40, self.out_file, 'eller', 'txt', random.Random(1))
+        with open(self.out_file + '.txt') as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 1 + 2 * 40)
+        self.assertEqual(lines[0], lines[-1])
+        self.assertTrue(all(len(line) == 1 + 4 * 6 for line in lines))
+
+    def test_svg_is_closed(self):
+        stream_maze(6, 40, self.out_file, 'sidewinder', cell_size=10)
+        with open(self.out_file + '.svg') as f:
+            svg = f.read()
+
+        self.assertTrue(svg.startswith('<?xml'))
+        self.assertTrue(svg.endswith('</svg>\n'))
+
+
+class TestWriteMap(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out_file = os.path.join(self.directory.name, 'maze')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_paths_cover_walls(self):
+        maze = Maze(5, 5, [], [])
+        maze.export_map(self.out_file)
+        with open(self.out_file + '.svg') as f:
+            svg = f.read()
+
+        drawn = set()
+        for x, y, axis, end in re.findall(r'M(\d+) (\d+)([HV])(\d+)', svg):
+            x, y, end = int(x) // 100, int(y) // 100, int(end) // 100
+            if axis == 'H':
+                drawn.update(('south', i, y - 1) for i in range(min(x, end), max(x, end)))
+            else:
+                drawn.update(('east', x - 1, i) for i in range(min(y, end), max(y, end)))
+
+        walls = {(direction, x, y) for x in range(5) for y in range(5) for direction in ('south', 'east')
+                 if maze.get_cell(x, y).walls[direction]}
+        self.assertEqual({wall for wall in drawn if wall[1] >= 0 and wall[2] >= 0}, walls)
+
+    def test_background_compressed_export(self):
+        maze = Maze(8, 4, [], [])
+        maze.export_map(self.out_file, compress=True, background=True).result()
+        with gzip.open(self.out_file + '.svgz', 'rt') as f:
+            self.assertTrue(f.read().endswith('</svg>\n'))
+
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.out_file = os.path.join(self.directory.name, 'maze')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_binary_round_trip(self):
+        maze = Maze(7, 5, [], [])
+        write_binary(maze, self.out_file)
+
+        with MazeFile(self.out_file + '.maze') as maze_file:
+            self.assertEqual((maze_file.num_of_cells_x, maze_file.num_of_cells_y), (7, 5))
+            for x in range(7):
+                for y in range(5):
+                    self.assertEqual(maze_file.get_walls(x, y), maze.get_walls(maze.cell_index(x, y)))
+
+    def test_png_signature(self):
+        write_png(Maze(3, 3, [], []), self.out_file)
+        with open(self.out_file + '.png', 'rb') as f:
+            self.assertEqual(f.read(8), PNG_SIGNATURE)
+
+
+class TestLevelPack(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'levels.pack')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_levels(self):
+        mazes = [Maze(5, 5, [], []), Maze(7, 3, [], [])]
+        self.assertEqual(write_pack(self.path, mazes), 2)
+
+        with LevelPack(self.path) as pack:
+            self.assertEqual(len(pack), 2)
+            for level, maze in enumerate(mazes):
+                loaded = pack.load(level, [], [])
+                self.assertEqual((loaded.num_of_cells_x, loaded.num_of_cells_y),
+                                 (maze.num_of_cells_x, maze.num_of_cells_y))
+                self.assertEqual(bytes(loaded.walls), bytes(maze.walls))
+                self.assertEqual(dict(loaded.get_cell(1, 1).walls), dict(maze.get_cell(1, 1).walls))
+        self.assertTrue(pack.map.closed)
+        # The walls of the loaded mazes were released with the pack
+        with self.assertRaises(ValueError):
+            bytes(loaded.walls)
+
+    def test_generated_pack(self):
+        generate_pack(self.path, 10, 6, 4, 'kruskal', random.Random(3))
+        with LevelPack(self.path) as pack:
+            self.assertEqual(len(pack), 10)
+            self.assertRaises(IndexError, pack.load, 10, [], [])
+            pack.load(9, [], [])
+        self.assertTrue(pack.map.closed)
+
+    def test_maze_from_file(self):
+        maze = Maze(6, 6, [], [])
+        write_binary(maze, os.path.join(self.directory.name, 'maze'))
+        with Maze.from_file(os.path.join(self.directory.name, 'maze.maze'), [], []) as loaded:
+            self.assertEqual(bytes(loaded.walls), bytes(maze.walls))
+            maze_file = loaded.maze_file
+        self.assertIsNone(loaded.maze_file)
+        self.assertTrue(maze_file.map.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
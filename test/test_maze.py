@@ -0,0 +1,140 @@
+import random
+import unittest
+
+from src.assets.map.directions import DIRECTIONS, OPPOSITE_DIRECTIONS
+from src.assets.map.generators import GENERATORS, ROW_GENERATORS, pack_walls
+from src.assets.map.maze import Maze
+from src.assets.map.pathfinding import distance_field, hint, path_down_field, shortest_path
+
+
+class Item:
+    def __init__(self, label: str) -> None:
+        self.label = label
+
+
+def count_passages(maze: Maze) -> int:
+    passages = 0
+    for x in range(maze.num_of_cells_x):
+        for y in range(maze.num_of_cells_y):
+            walls = maze.get_cell(x, y).walls
+            passages += (not walls['south']) + (not walls['east'])
+    return passages
+
+
+class TestMaze(unittest.TestCase):
+    def test_perfect_maze(self):
+        maze = Maze(7, 5, [], [])
+        self.assertEqual(count_passages(maze), 7 * 5 - 1)
+
+        for x in range(maze.num_of_cells_x):
+            for y in range(maze.num_of_cells_y):
+                cell = maze.get_cell(x, y)
+                self.assertFalse(cell.surrounded_by_walls())
+                for direction, (dx, dy) in DIRECTIONS.items():
+                    if not cell.walls[direction]:
+                        neighbour = maze.get_cell(x + dx, y + dy)
+                        self.assertFalse(neighbour.walls[OPPOSITE_DIRECTIONS[direction]])
+
+    def test_walls_share_bytes(self):
+        maze = Maze(3, 3, [], [])
+        first, second = maze.get_cell(0, 0), maze.get_cell(1, 0)
+        second_walls = dict(second.walls)
+
+        first.walls['north'] = False
+        self.assertFalse(first.walls['north'])
+        self.assertEqual(dict(second.walls), second_walls)
+
+    def test_items_and_enemies(self):
+        items = [Item('door'), Item('chest')]
+        maze = Maze(5, 5, items, [])
+
+        self.assertIs(maze.get_cell(*maze.maze_end).item, items[0])
+        self.assertTrue(maze.get_cell(*items[1].position).got_item)
+
+        cell = maze.get_cell(*items[1].position)
+        cell.item = None
+        self.assertFalse(cell.got_item)
+        self.assertEqual(len(maze.cell_items), 1)
+
+    def test_placement_without_replacement(self):
+        items = [Item('chest') for _ in range(20)]
+        maze = Maze(6, 4, items, [])
+
+        self.assertEqual(len(maze.cell_items), 20)
+        self.assertNotIn(maze.cell_index(0, 0), maze.cell_items)
+        self.assertNotIn(maze.cell_index(*maze.maze_end), maze.cell_items)
+        self.assertRaises(ValueError, Maze, 6, 4, items + [Item('chest') for _ in range(3)], [])
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def test_nearest_matches_scan(self):
+        maze = Maze(40, 30, [Item('chest') for _ in range(25)], [])
+        for _ in range(50):
+            x, y = random.randrange(40), random.randrange(30)
+            distances = sorted(abs(index % 40 - x) + abs(index // 40 - y) for index in maze.cell_items)
+
+            self.assertEqual(maze.spatial.nearest('item', x, y)[0], distances[0])
+            self.assertEqual(len(maze.spatial.within('item', x, y, 6)), len([d for d in distances if d <= 6]))
+
+    def test_index_follows_cells(self):
+        maze = Maze(10, 10, [], [])
+        cell = maze.get_cell(4, 4)
+
+        cell.enemy = Item('skeleton')
+        self.assertEqual(maze.spatial.nearest('enemy', 0, 0)[1:3], (4, 4))
+        cell.enemy = None
+        self.assertIsNone(maze.spatial.nearest('enemy', 0, 0))
+        self.assertEqual(maze.spatial.in_region('enemy', 0, 0, 9, 9), [])
+
+
+class TestPathfinding(unittest.TestCase):
+    def test_paths_agree(self):
+        maze = Maze(15, 10, [], [], algorithm='kruskal')
+        field = maze.distance_to_exit
+        self.assertEqual(field[maze.cell_index(*maze.maze_end)], 0)
+
+        for start in [(0, 0), (7, 3), (14, 0)]:
+            path = shortest_path(maze, start, maze.maze_end)
+            self.assertEqual(len(path) - 1, field[maze.cell_index(*start)])
+            self.assertEqual(path, path_down_field(maze, field, *start))
+
+    def test_hint_leads_to_exit(self):
+        maze = Maze(8, 8, [], [])
+        x, y, steps = 0, 0, 0
+        while (direction := hint(maze, x, y)) is not None:
+            dx, dy = DIRECTIONS[direction]
+            self.assertFalse(maze.get_cell(x, y).walls[direction])
+            x, y, steps = x + dx, y + dy, steps + 1
+
+        self.assertEqual((x, y), maze.maze_end)
+        self.assertEqual(steps, distance_field(maze, 0, 0)[maze.cell_index(*maze.maze_end)])
+
+
+class TestGenerators(unittest.TestCase):
+    def test_perfect_mazes(self):
+        for name, generate in GENERATORS.items():
+            with self.subTest(algorithm=name):
+                maze = Maze.__new__(Maze)
+                maze.num_of_cells_x, maze.num_of_cells_y = 9, 6
+                maze.walls = pack_walls(generate(9, 6))
+                self.assertEqual(count_passages(maze), 9 * 6 - 1)
+
+                reached, stack = {(0, 0)}, [(0, 0)]
+                while stack:
+                    x, y = stack.pop()
+                    for direction, (dx, dy) in DIRECTIONS.items():
+                        if not maze.get_cell(x, y).walls[direction] and (x + dx, y + dy) not in reached:
+                            reached.add((x + dx, y + dy))
+                            stack.append((x + dx, y + dy))
+                self.assertEqual(len(reached), 9 * 6)
+
+    def test_row_generators(self):
+        for name, rows in ROW_GENERATORS.items():
+            with self.subTest(algorithm=name):
+                generated = list(rows(4, 200))
+                self.assertEqual(len(generated), 200)
+                self.assertTrue(all(len(row) == 4 for row in generated))
+
+
+if __name__ == '__main__':
+    unittest.main()
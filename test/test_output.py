@@ -0,0 +1,49 @@
+import io
+import time
+import unittest
+
+from src.assets.actor.player import Player
+from src.assets.battle import battle_round, print_battle_stats
+from src.assets.output import FastRenderer, NullRenderer, rendering, say
+
+
+class Enemy:
+    def __init__(self) -> None:
+        self.name = 'skeleton'
+        self.attack_points = 3
+        self.health_points = 10
+        self.level = 1
+
+
+class Location:
+    def __init__(self) -> None:
+        self.enemy = Enemy()
+
+
+class TestRenderers(unittest.TestCase):
+    def test_null_renderer_collects_events(self):
+        player, location = Player(), Location()
+        player.attack_points, player.defend_points = 4, 1
+
+        with rendering(NullRenderer()) as renderer:
+            start = time.perf_counter()
+            print_battle_stats(location, player)
+            battle_round(location, player)
+            self.assertLess(time.perf_counter() - start, 1)
+
+        kinds = [event.kind for event in renderer.events]
+        self.assertEqual(kinds[:2], ['battle_stats', 'strike'])
+        self.assertEqual(renderer.events[1].data['enemy_health_points'], 6)
+        self.assertEqual(renderer.events[-1].data['health_points'], 18)
+
+    def test_fast_renderer_prints(self):
+        out = io.StringIO()
+        with rendering(FastRenderer(out)):
+            say('You go further in the maze!')
+            say('no newline', end='')
+
+        self.assertEqual(out.getvalue(), 'You go further in the maze!\nno newline')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.assets.actor.player import Player
+from src.assets.input import process_user_input
+from src.assets.map.maze import Maze
+from src.assets.output import NullRenderer, rendering
+from src.assets.prompt import ScriptedInput
+from src.assets.replay import ReplayLog, ReplayStats, record, replay, replay_files
+
+
+class Game:
+    """One level of a game, without the database"""
+    def __init__(self, rng) -> None:
+        self.maze = Maze(4, 4, [], [], rng=rng)
+        self.player = Player(rng)
+        self.complete = False
+
+    def print_maze_info(self, came_from=None) -> None:
+        pass
+
+    async def play(self) -> None:
+        while not self.complete and self.player.alive:
+            await process_user_input(self)
+
+
+COMMANDS = ['inventory', 'go north', 'dance', 'check lantern', 'quit']
+
+
+class TestReplay(unittest.TestCase):
+    def test_record_and_replay(self):
+        with rendering(NullRenderer()):
+            log = asyncio.run(record(7, ScriptedInput(COMMANDS), Game))
+        self.assertEqual((log.seed, log.commands), ('7', COMMANDS))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'session.replay')
+            log.save(path)
+            loaded = ReplayLog.load(path)
+            self.assertEqual((loaded.seed, loaded.commands), ('7', COMMANDS))
+
+            stats = replay(loaded, Game)
+            self.assertEqual(stats.commands, len(COMMANDS))
+            self.assertEqual(sum(stats.histogram), len(COMMANDS))
+
+            total = replay_files([path, path, path], workers=2, game_factory=Game)
+            self.assertEqual(total.commands, 3 * len(COMMANDS))
+
+    def test_recording_ends_early(self):
+        stats = replay(ReplayLog(1, ['inventory']), Game)
+        self.assertEqual(stats.commands, 1)
+
+    def test_percentile(self):
+        stats = ReplayStats()
+        for nanoseconds in [100] * 90 + [5000] * 10:
+            stats.add(nanoseconds)
+        self.assertEqual(stats.percentile(50), 128)
+        self.assertEqual(stats.percentile(99), 8192)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import pickle
+import unittest
+
+from src.assets.actor.player import Player
+from src.assets.map.maze import Maze
+from src.assets.rng import GameRandom
+
+
+class Enemy:
+    pass
+
+
+class TestGameRandom(unittest.TestCase):
+    def test_spawn_only_depends_on_seed_and_key(self):
+        first, second = GameRandom(7), GameRandom(7)
+        second.random()
+        self.assertEqual(first.spawn('level', 2).random(), second.spawn('level', 2).random())
+        self.assertNotEqual(first.spawn('level', 2).random(), first.spawn('level', 3).random())
+
+    def test_pickle_keeps_seed_and_state(self):
+        rng = GameRandom('session')
+        rng.random()
+        copy = pickle.loads(pickle.dumps(rng))
+        self.assertEqual(copy.initial_seed, 'session')
+        self.assertEqual(copy.random(), rng.random())
+        self.assertEqual(copy.spawn(1).random(), rng.spawn(1).random())
+
+    def test_bulk_draws(self):
+        rng = GameRandom(1)
+        flips = rng.coins(10_000)
+        self.assertEqual(set(flips), {0, 1})
+        self.assertAlmostEqual(sum(flips) / len(flips), 0.5, delta=0.05)
+        self.assertTrue(all(0 <= value < 6 for value in rng.integers(1000, 6)))
+
+    def test_seeded_session_is_reproducible(self):
+        def session(seed):
+            rng = GameRandom(seed)
+            maze = Maze(6, 6, [], [Enemy(), Enemy()], algorithm='sidewinder', rng=rng.spawn('maze'))
+            player = Player(rng.spawn('player'))
+            return bytes(maze.walls), sorted(maze.cell_enemies), [dice.roll() for dice in player.dices]
+
+        self.assertEqual(session(3), session(3))
+        self.assertNotEqual(session(3), session(4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+
+from src.assets.actor.player import Player
+from src.assets.input import process_user_input
+from src.assets.map.maze import Maze
+from src.assets.output import NullRenderer, StreamRenderer, say, set_renderer
+from src.assets.prompt import ScriptedInput, StreamInput, ask, set_input
+
+
+class Level:
+    def __init__(self) -> None:
+        self.maze = Maze(4, 4, [], [])
+        self.player = Player()
+        self.complete = False
+
+    def print_maze_info(self, came_from=None) -> None:
+        pass
+
+
+async def play(commands: list) -> tuple:
+    renderer = NullRenderer()
+    set_renderer(renderer)
+    set_input(ScriptedInput(commands))
+
+    level = Level()
+    while not level.complete and level.player.alive:
+        await process_user_input(level)
+    return level, renderer
+
+
+class TestSessions(unittest.TestCase):
+    def test_concurrent_sessions_are_isolated(self):
+        async def main():
+            return await asyncio.gather(*(play(['dance'] * i + ['quit']) for i in range(50)))
+
+        for i, (level, renderer) in enumerate(asyncio.run(main())):
+            self.assertFalse(level.player.alive)
+            self.assertEqual(len(renderer.events), i)
+            self.assertTrue(all(event.text == 'I don\'t understand dance...' for event in renderer.events))
+
+    def test_out_of_commands(self):
+        with self.assertRaises(EOFError):
+            asyncio.run(play(['inventory']))
+
+    def test_stream_session(self):
+        async def session(reader, writer):
+            set_renderer(StreamRenderer(writer))
+            set_input(StreamInput(reader, writer))
+            name = await ask('name? ')
+            say(f'hello {name}')
+            await writer.drain()
+            writer.close()
+
+        async def main():
+            server = await asyncio.start_server(session, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(b'maze runner\r\n')
+                received = await reader.read()
+                writer.close()
+            return received
+
+        self.assertEqual(asyncio.run(main()), b'name? hello maze runner\r\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
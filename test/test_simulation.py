@@ -0,0 +1,51 @@
+import unittest
+
+from src.assets.actor.player import Dice
+from src.assets.battle import LOST, WON
+from src.assets.dice import DOUBLE_SWORD, SHIELD, SWORD
+from src.assets.odds import battle_odds, enemy_odds, loadout, roll_distribution
+from src.assets.simulation import fight, simulate
+
+SKELETON = {'name': 'skeleton', 'attack_points': 6, 'defend_points': 0, 'health_points': 14, 'level': 1,
+            'type': 'undead'}
+
+
+class TestSimulation(unittest.TestCase):
+    def test_fight_rules(self):
+        # The enemy is struck first, so a player without health points can still win
+        self.assertEqual(fight(0, 5, 4, iter([(4, 0)])), (WON, 1, 0))
+        self.assertEqual(fight(5, 5, 10, iter([(1, 0), (1, 0)])), (LOST, 2, 0))
+        self.assertEqual(fight(5, 5, 10, iter([(1, 3), (9, 0)])), (WON, 2, 3))
+
+    def test_reproducible(self):
+        serial = simulate(SKELETON, 3, 25_000, seed=7, workers=1)
+        parallel = simulate(SKELETON, 3, 25_000, seed=7, workers=2)
+
+        self.assertEqual(serial.fights, 25_000)
+        self.assertEqual((serial.wins, serial.rounds, serial.health_points_lost),
+                         (parallel.wins, parallel.rounds, parallel.health_points_lost))
+
+
+class TestOdds(unittest.TestCase):
+    def test_roll_distribution(self):
+        rolls = roll_distribution(loadout([Dice((SWORD, SHIELD)), Dice((DOUBLE_SWORD,))]), sword=True)
+        self.assertEqual(rolls, ((4, 1, 0.5), (6, 0, 0.5)))
+
+    def test_certain_fights(self):
+        dices = loadout([Dice((SWORD,))])
+        self.assertEqual(battle_odds(5, 1, 3, dices).win, 1.0)
+        self.assertEqual(battle_odds(5, 1, 3, dices).rounds, 3.0)
+        self.assertEqual(battle_odds(2, 1, 3, dices).win, 1.0)
+        self.assertEqual(battle_odds(2, 1, 4, dices).loss, 1.0)
+
+    def test_matches_simulation(self):
+        odds = enemy_odds(SKELETON, 3)
+        simulated = simulate(SKELETON, 3, 20_000, seed=1, workers=1)
+
+        self.assertAlmostEqual(odds.win + odds.loss, 1.0)
+        self.assertAlmostEqual(odds.win, simulated.win_rate, delta=0.02)
+        self.assertAlmostEqual(odds.rounds, simulated.mean_rounds, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
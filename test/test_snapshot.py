@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+from time import perf_counter
+
+from src.assets.game import Game
+from src.assets.game.level import GameLevel
+from src.assets.game.snapshot import DELTA, HEADER, Autosave, Snapshot, encode
+from src.assets.output import NullRenderer, rendering
+from src.assets.prompt import ScriptedInput, reading
+from src.assets.rng import GameRandom
+from src.db import session
+from src.db.backends.memory import MemoryBackend
+from src.db.controller import invalidate_catalogs
+from src.db.model.collections import EnemyCollection, ItemCollection, SavedGame
+from src.db.model.write_queue import WriteQueue
+
+ENEMIES = [{'name': 'troll', 'type': 'monster', 'attack_points': 2, 'defend_points': 1, 'health_points': 4,
+            'level': 1},
+           {'name': 'bat', 'type': 'monster', 'attack_points': 1, 'defend_points': 0, 'health_points': 2,
+            'level': 1}]
+ITEMS = [{'label': 'potion', 'type': 'usable item', 'description': 'a potion', 'actions': ['get'],
+          'storage': 'pouch'},
+         {'label': 'sword', 'type': 'usable item', 'description': 'a sword', 'actions': ['get'], 'storage': 'hand'},
+         {'label': 'door', 'type': 'key item', 'description': 'a door', 'actions': ['open'], 'storage': None}]
+
+
+def new_game(seed='snapshot'):
+    game = Game(rng=GameRandom(seed))
+    game.difficulty_level = 1
+    game.game_level = GameLevel(1, game.player, rng=game.rng.spawn('level', 1))
+    return game
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        session.use(MemoryBackend())
+        EnemyCollection.bulk_save(ENEMIES)
+        ItemCollection.bulk_save(ITEMS)
+        invalidate_catalogs()
+
+    def tearDown(self):
+        session.close()
+        session.backend = None
+        invalidate_catalogs()
+
+    def assertSameGame(self, game, loaded):
+        maze, loaded_maze = game.game_level.maze, loaded.game_level.maze
+        self.assertEqual(bytes(loaded_maze.walls), bytes(maze.walls))
+        self.assertEqual({index: item.label for index, item in loaded_maze.cell_items.items()},
+                         {index: item.label for index, item in maze.cell_items.items()})
+        enemies = [{index: (enemy.name, enemy.health_points) for index, enemy in cells.items()}
+                   for cells in (loaded_maze.cell_enemies, maze.cell_enemies)]
+        self.assertEqual(*enemies)
+        for attribute in ('position', 'health_points', 'score', 'level', 'alive'):
+            self.assertEqual(getattr(loaded.player, attribute), getattr(game.player, attribute))
+        self.assertEqual(loaded.player.inventory.pouch, game.player.inventory.pouch)
+        self.assertEqual(loaded.rng.spawn('level', 1).random(), game.rng.spawn('level', 1).random())
+
+    def test_full_snapshot(self):
+        game = new_game()
+        game.player.position = (1, 0)
+        game.player.score = 120
+        game.player.inventory.pouch.append({field: value for field, value in ITEMS[0].items() if field != 'type'})
+
+        loaded = Snapshot(encode(game, 1)).restore()
+        self.assertSameGame(game, loaded)
+        self.assertEqual(loaded.difficulty_level, 1)
+
+    def test_random_seed(self):
+        for rng in (None, GameRandom(42)):
+            game = Game(rng=rng)
+            game.game_level = GameLevel(1, game.player, rng=game.rng.spawn('level', 1))
+            self.assertSameGame(game, Snapshot(encode(game, 1)).restore())
+
+    def test_long_strings(self):
+        game = new_game('seed' * 100)
+        self.assertSameGame(game, Snapshot(encode(game, 1)).restore())
+        with self.assertRaises(ValueError):
+            encode(new_game('seed' * 20000), 1)
+
+    def test_delta(self):
+        game = new_game()
+        base = encode(game, 1)
+        maze = game.game_level.maze
+        index, enemy = next(iter(maze.cell_enemies.items()))
+        enemy.health_points = 1
+        maze.place('enemy', maze.cell_index(*maze.maze_end) - 1, None)
+        maze.set_walls(0, 0)
+
+        delta = encode(game, 2, base)
+        self.assertEqual(HEADER.unpack_from(delta)[2:], (DELTA, 2, 1))
+        self.assertLess(len(delta), len(base) + 16)
+        self.assertSameGame(game, Snapshot(delta, base).restore())
+        with self.assertRaises(ValueError):
+            Snapshot(delta)
+
+    def test_autosave_and_load(self):
+        autosave = Autosave('slot', WriteQueue(SavedGame, key='name', flush_interval=60))
+        game = new_game()
+        game.autosave = autosave
+        autosave.save(game)
+        game.player.score = 50
+        autosave.save(game)
+        autosave.queue.flush()
+        self.assertEqual(len(SavedGame.all()), 2)
+
+        loaded = Autosave('slot', autosave.queue).load()
+        self.assertSameGame(game, loaded)
+        self.assertEqual(loaded.player.score, 50)
+        self.assertIsNone(Autosave('other', autosave.queue).load())
+        autosave.close()
+
+    def test_autosave_while_playing(self):
+        autosave = Autosave('slot', WriteQueue(SavedGame, key='name', flush_interval=60))
+        game = Game(rng=GameRandom('played'), autosave=autosave)
+        with rendering(NullRenderer()), reading(ScriptedInput(['inventory', 'quit'])):
+            asyncio.run(game.play())
+        autosave.queue.flush()
+
+        self.assertEqual(sorted(document['name'] for document in SavedGame.raw()), ['slot', 'slot/delta'])
+        # The player quit, the save is over
+        self.assertIsNone(Autosave('slot', autosave.queue).load())
+        autosave.close()
+
+    def test_autosave_is_fast(self):
+        autosave = Autosave('slot', WriteQueue(SavedGame, key='name', flush_interval=60))
+        game = new_game()
+        autosave.save(game)
+        start = perf_counter()
+        for _ in range(100):
+            autosave.save(game)
+        self.assertLess((perf_counter() - start) / 100, 0.001)
+        autosave.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import time
+import unittest
+
+from src.db.model.write_queue import WriteQueue
+
+
+class Collection:
+    batches = []
+
+    @classmethod
+    def bulk_save(cls, items, key=None, batch_size=None):
+        cls.batches.append((key, [item['score'] for item in items]))
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        Collection.batches = []
+
+    def test_full_batches_and_flush(self):
+        queue = WriteQueue(Collection, key='name', batch_size=3, flush_interval=60)
+        for score in range(7):
+            queue.put({'name': f'player {score}', 'score': score})
+        queue.flush()
+        queue.close()
+
+        self.assertEqual(Collection.batches, [('name', [0, 1, 2]), ('name', [3, 4, 5]), ('name', [6])])
+
+    def test_latest_document_per_key(self):
+        queue = WriteQueue(Collection, key='name', batch_size=10, flush_interval=60)
+        for name, score in (('ann', 1), ('bob', 2), ('ann', 3), ('ann', 4)):
+            queue.put({'name': name, 'score': score})
+        queue.close()
+
+        self.assertEqual(Collection.batches, [('name', [4, 2])])
+
+    def test_failed_writes_are_raised(self):
+        class Failing:
+            @classmethod
+            def bulk_save(cls, items, key=None, batch_size=None):
+                raise ConnectionError('no server')
+
+        queue = WriteQueue(Failing, flush_interval=60)
+        queue.put({'score': 1})
+        with self.assertRaises(ConnectionError):
+            queue.flush()
+        queue.flush()
+
+        queue.put({'score': 2})
+        with self.assertRaises(ConnectionError):
+            queue.close()
+
+    def test_flush_interval(self):
+        queue = WriteQueue(Collection, batch_size=100, flush_interval=0.01)
+        queue.put({'score': 1})
+        time.sleep(0.2)
+        self.assertEqual(Collection.batches, [(None, [1])])
+        queue.close()
+
+
+if __name__ == '__main__':
+    unittest.main()